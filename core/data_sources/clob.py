@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import os
+import threading
 import time
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
@@ -44,15 +45,38 @@ class CLOBDataSource:
                            "polkadex", "coinbase_advanced_trade", "kraken", "dydx_v4_perpetual", "hitbtc",
                            "hyperliquid", "dexalot", "vertex"]
 
+    # Connectors are created on first use and shared by every CLOBDataSource using the same event loop, since
+    # their sessions and tasks are bound to the loop they were created in. Connectors hold their loop, so entries
+    # are keyed by id(loop) and those of closed loops are dropped when a new one is added.
+    _connectors: Dict[int, Tuple[asyncio.AbstractEventLoop, Dict[str, Any]]] = {}
+    _connectors_lock = threading.Lock()
+
     def __init__(self):
-        logger.info("Initializing ClobDataSource")
+        start = time.perf_counter()
         self.candles_factory = CandlesFactory()
         self.trades_feeds = {"binance_perpetual": BinancePerpetualTradesFeed()}
         self.conn_settings = AllConnectorSettings.get_connector_settings()
-        self.connectors = {name: self.get_connector(name) for name, settings in self.conn_settings.items()
-                           if settings.type in self.CONNECTOR_TYPES and name not in self.EXCLUDED_CONNECTORS and
-                           "testnet" not in name}
         self._candles_cache: Dict[Tuple[str, str, str], pd.DataFrame] = {}
+        logger.info(f"Initialized ClobDataSource in {time.perf_counter() - start:.3f}s")
+
+    @property
+    def supported_connectors(self) -> List[str]:
+        return [name for name, settings in self.conn_settings.items()
+                if settings.type in self.CONNECTOR_TYPES and name not in self.EXCLUDED_CONNECTORS and
+                "testnet" not in name]
+
+    @property
+    def connectors(self) -> Dict[str, Any]:
+        """Connectors instantiated so far for the current event loop."""
+        loop = self._current_loop()
+        return dict(self._connectors.get(id(loop), (loop, {}))[1])
+
+    @staticmethod
+    def _current_loop() -> asyncio.AbstractEventLoop:
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.get_event_loop_policy().get_event_loop()
 
     @staticmethod
     def get_connector_config_map(connector_name: str):
@@ -160,6 +184,25 @@ class CLOBDataSource:
         start_time = end_time - days * 24 * 60 * 60
         return await self.get_candles(connector_name, trading_pair, interval, start_time, end_time, from_trades)
 
+    def get_candles_rate_limit(self, connector_name: str, interval: str = "1m") -> Dict[str, float]:
+        """
+        Request weight budget of the candles endpoint of a connector, taken from its candles feed rate limits:
+        the pool the endpoint is linked to (limit per time_interval), the weight of one request and the number
+        of candles returned per request.
+        """
+        candle = self.candles_factory.get_candle(CandlesConfig(connector=connector_name, trading_pair="BTC-USDT",
+                                                               interval=interval))
+        rate_limits = {rate_limit.limit_id: rate_limit for rate_limit in candle.rate_limits}
+        endpoint_limit = rate_limits.get(candle.candles_endpoint)
+        pool, weight = endpoint_limit, getattr(endpoint_limit, "weight", 1)
+        if endpoint_limit is not None and endpoint_limit.linked_limits:
+            linked = endpoint_limit.linked_limits[0]
+            pool, weight = rate_limits.get(linked.limit_id, endpoint_limit), linked.weight
+        if pool is None:
+            pool = min(rate_limits.values(), key=lambda rate_limit: rate_limit.limit / rate_limit.time_interval)
+        return {"limit": pool.limit, "time_interval": pool.time_interval, "weight": weight,
+                "max_results_per_request": candle.candles_max_result_per_rest_request}
+
     async def get_candles_batch_last_days(self, connector_name: str, trading_pairs: List, interval: str,
                                           days: int, batch_size: int = 10, sleep_time: float = 2.0):
         number_of_calls = (len(trading_pairs) // batch_size) + 1
@@ -189,6 +232,25 @@ class CLOBDataSource:
         return all_candles
 
     def get_connector(self, connector_name: str):
+        loop = self._current_loop()
+        connector = self._connectors.get(id(loop), (loop, {}))[1].get(connector_name)
+        if connector is None:
+            with self._connectors_lock:
+                if id(loop) not in self._connectors:
+                    for key, (other_loop, _) in list(self._connectors.items()):
+                        if other_loop.is_closed():
+                            del self._connectors[key]
+                    self._connectors[id(loop)] = (loop, {})
+                loop_connectors = self._connectors[id(loop)][1]
+                connector = loop_connectors.get(connector_name)
+                if connector is None:
+                    start = time.perf_counter()
+                    connector = self.create_connector(connector_name)
+                    loop_connectors[connector_name] = connector
+                    logger.info(f"Created connector {connector_name} in {time.perf_counter() - start:.3f}s")
+        return connector
+
+    def create_connector(self, connector_name: str):
         conn_setting = self.conn_settings.get(connector_name)
         if conn_setting is None:
             logger.error(f"Connector {connector_name} not found")
@@ -208,7 +270,7 @@ class CLOBDataSource:
     # TODO: ADD ORDER BOOK SNAPSHOT METHOD
 
     async def get_trading_rules(self, connector_name: str):
-        connector = self.connectors.get(connector_name)
+        connector = self.get_connector(connector_name)
         await connector._update_trading_rules()
         return TradingRules(list(connector.trading_rules.values()))
 
@@ -269,7 +331,7 @@ class CLOBDataSource:
                                      end_time: Optional[int] = None,
                                      limit: int = 1000) -> pd.DataFrame:
         """Get historical funding rates for a symbol"""
-        connector = self.connectors.get("binance_perpetual")
+        connector = self.get_connector("binance_perpetual")
         params = {"symbol": symbol, "limit": limit}
         
         if start_time:
@@ -294,7 +356,7 @@ class CLOBDataSource:
 
     async def get_current_funding_info(self, symbol: Optional[str] = None) -> Dict[str, Any]:
         """Get current funding rate info for a symbol or all symbols"""
-        connector = self.connectors.get("binance_perpetual")
+        connector = self.get_connector("binance_perpetual")
         response = await connector._orderbook_ds.get_funding_info(symbol)
         return response
 
@@ -1,7 +1,10 @@
 import json
 import os
+import pathlib
 import sqlite3
+from typing import Any, Dict, List, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 
 from core.data_structures.controller_performance import ControllerPerformance
@@ -9,15 +12,37 @@ from hummingbot.connector.connector_base import TradeType
 
 
 class HummingbotDatabase:
-    def __init__(self, db_name: str, root_path: str = "", instance_name: str = None, load_cache_data: bool = False):
+    INDEXES = [
+        ("Executors", ["controller_id", "timestamp"]),
+        ("Executors", ["timestamp"]),
+        ("Controllers", ["timestamp"]),
+        ("TradeFill", ["config_file_path", "timestamp"]),
+        ("TradeFill", ["timestamp"]),
+        ("Order", ["config_file_path", "creation_timestamp"]),
+        ("Order", ["creation_timestamp"]),
+        ("OrderStatus", ["order_id"]),
+    ]
+
+    def __init__(self, db_name: str, root_path: str = "", instance_name: str = None, load_cache_data: bool = False,
+                 create_indexes: bool = False):
+        """
+        The database is opened read-only, so reading a synced bot database never changes it (or its mtime).
+        With `create_indexes` it is opened read-write and the query indexes are created.
+        """
         self.db_path = os.path.join(root_path, "data", "live_bot_databases", db_name)
         self.root_path = root_path
         self.db_name = db_name
         self.instance_name = instance_name
         self.load_cache_data = load_cache_data
+        self.read_only = not create_indexes
         self.connection = self._connect_to_db()
+        self._columns: Dict[str, List[str]] = {}
+        if create_indexes:
+            self.ensure_indexes()
 
     def _connect_to_db(self):
+        if self.read_only:
+            return sqlite3.connect(f"{pathlib.Path(os.path.abspath(self.db_path)).as_uri()}?mode=ro", uri=True)
         return sqlite3.connect(self.db_path)
 
     @staticmethod
@@ -47,25 +72,97 @@ class HummingbotDatabase:
                   }
         return status
 
-    def get_orders(self, config_file_path=None, start_date=None, end_date=None):
-        query = "SELECT * FROM 'Order'"
-        orders = pd.read_sql_query(query, self.connection)
-        orders["market"] = orders["market"]
-        orders["amount"] = orders["amount"] / 1e6
-        orders["price"] = orders["price"] / 1e6
-        orders['creation_timestamp'] = pd.to_datetime(orders['creation_timestamp'], unit="ms")
-        orders['last_update_timestamp'] = pd.to_datetime(orders['last_update_timestamp'], unit="ms")
+    def ensure_indexes(self):
+        """Create the indexes behind the time range and controller filters. Skipped if the file is not writable."""
+        self._create_indexes(self.connection)
+
+    @classmethod
+    def index_database(cls, db_path: str):
+        """Create the query indexes in a database file, once per sync, so later reads can stay read-only."""
+        connection = sqlite3.connect(db_path)
+        try:
+            cls._create_indexes(connection)
+        finally:
+            connection.close()
+
+    @classmethod
+    def _create_indexes(cls, connection: sqlite3.Connection):
+        try:
+            with connection:
+                for table, columns in cls.INDEXES:
+                    if connection.execute(f'PRAGMA table_info("{table}")').fetchone():
+                        connection.execute(
+                            f'CREATE INDEX IF NOT EXISTS "idx_{table.lower()}_{"_".join(columns)}" '
+                            f'ON "{table}" ({", ".join(columns)})')
+        except sqlite3.OperationalError:
+            pass
+
+    def _table_columns(self, table: str) -> List[str]:
+        if table not in self._columns:
+            self._columns[table] = [row[1] for row in self.connection.execute(f'PRAGMA table_info("{table}")')]
+        return self._columns[table]
+
+    @staticmethod
+    def _to_seconds(value) -> Optional[float]:
+        """Seconds since epoch of a date filter given as a number of seconds, datetime or string (naive is UTC)."""
+        if value is None:
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        return pd.Timestamp(value).timestamp()
+
+    def _query(self, table: str, columns: Optional[List[str]] = None, time_column: Optional[str] = None,
+               start_date=None, end_date=None, time_scale: float = 1, filters: Optional[Dict[str, Any]] = None,
+               required_columns: Sequence[str] = ()) -> pd.DataFrame:
+        """
+        SELECT with the filters bound as parameters. `filters` maps a column to a value or a list of values;
+        the time range is applied on `time_column`, stored in seconds times `time_scale`.
+        """
+        table_columns = self._table_columns(table)
+        if columns is None:
+            select = "*"
+        else:
+            unknown = set(columns) - set(table_columns)
+            if unknown:
+                raise ValueError(f"Unknown columns {sorted(unknown)} for table {table}")
+            selected = list(dict.fromkeys([*columns, *required_columns]))
+            select = ", ".join(f'"{column}"' for column in selected)
+        conditions, params = [], []
+        for column, value in (filters or {}).items():
+            if value is None:
+                continue
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            conditions.append(f'"{column}" IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+        for value, operator in [(start_date, ">="), (end_date, "<=")]:
+            seconds = self._to_seconds(value)
+            if seconds is not None:
+                conditions.append(f'"{time_column}" {operator} ?')
+                params.append(seconds * time_scale)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return pd.read_sql_query(f'SELECT {select} FROM "{table}"{where}', self.connection, params=params)
+
+    def get_orders(self, config_file_path=None, start_date=None, end_date=None, columns: Optional[List[str]] = None):
+        orders = self._query("Order", columns, "creation_timestamp", start_date, end_date, time_scale=1e3,
+                             filters={"config_file_path": config_file_path})
+        for column in ["amount", "price"]:
+            if column in orders:
+                orders[column] = orders[column] / 1e6
+        for column in ["creation_timestamp", "last_update_timestamp"]:
+            if column in orders:
+                orders[column] = pd.to_datetime(orders[column], unit="ms")
         return orders
 
-    def get_trade_fills(self, config_file_path=None, start_date=None, end_date=None):
+    def get_trade_fills(self, config_file_path=None, start_date=None, end_date=None,
+                        columns: Optional[List[str]] = None):
         groupers = ["config_file_path", "market", "symbol"]
         float_cols = ["amount", "price", "trade_fee_in_quote"]
-        query = "SELECT * FROM TradeFill"
-        trade_fills = pd.read_sql_query(query, self.connection)
+        trade_fills = self._query("TradeFill", columns, "timestamp", start_date, end_date, time_scale=1e3,
+                                  filters={"config_file_path": config_file_path},
+                                  required_columns=groupers + float_cols + ["trade_type", "timestamp"])
         trade_fills[float_cols] = trade_fills[float_cols] / 1e6
         trade_fills["cum_fees_in_quote"] = trade_fills.groupby(groupers)["trade_fee_in_quote"].cumsum()
-        trade_fills["net_amount"] = trade_fills['amount'] * trade_fills['trade_type'].apply(
-            lambda x: 1 if x == 'BUY' else -1)
+        trade_fills["net_amount"] = trade_fills['amount'] * np.where(trade_fills['trade_type'] == 'BUY', 1, -1)
         trade_fills["net_amount_quote"] = trade_fills['net_amount'] * trade_fills['price']
         trade_fills["cum_net_amount"] = trade_fills.groupby(groupers)["net_amount"].cumsum()
         trade_fills["unrealized_trade_pnl"] = -1 * trade_fills.groupby(groupers)["net_amount_quote"].cumsum()
@@ -76,39 +173,44 @@ class HummingbotDatabase:
         trade_fills["gross_pnl"] = trade_fills.groupby(groupers)["realized_trade_pnl"].diff()
         trade_fills["trade_fee"] = trade_fills.groupby(groupers)["cum_fees_in_quote"].diff()
         trade_fills["timestamp"] = pd.to_datetime(trade_fills["timestamp"], unit="ms")
-        trade_fills["market"] = trade_fills["market"]
         trade_fills["quote_volume"] = trade_fills["price"] * trade_fills["amount"]
         return trade_fills
 
-    def get_order_status(self, order_ids=None, start_date=None, end_date=None):
-        query = "SELECT * FROM OrderStatus"
-        order_status = pd.read_sql_query(query, self.connection)
-        return order_status
+    def get_order_status(self, order_ids=None, start_date=None, end_date=None, columns: Optional[List[str]] = None):
+        return self._query("OrderStatus", columns, "timestamp", start_date, end_date, time_scale=1e3,
+                           filters={"order_id": order_ids})
 
-    def get_executors_data(self, start_date=None, end_date=None) -> pd.DataFrame:
-        query = "SELECT * FROM Executors"
-        executors = pd.read_sql_query(query, self.connection)
-        executors["custom_info"] = executors["custom_info"].apply(lambda x: json.loads(x) if isinstance(x, str) else x)
-        executors["config"] = executors["config"].apply(lambda x: json.loads(x) if isinstance(x, str) else x)
-        return executors
+    @staticmethod
+    def _decode_json_columns(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        for column in columns:
+            if column in df:
+                df[column] = [json.loads(value) if isinstance(value, str) else value for value in df[column]]
+        return df
+
+    def get_executors_data(self, start_date=None, end_date=None, controller_ids=None,
+                           columns: Optional[List[str]] = None) -> pd.DataFrame:
+        executors = self._query("Executors", columns, "timestamp", start_date, end_date,
+                                filters={"controller_id": controller_ids})
+        return self._decode_json_columns(executors, ["custom_info", "config"])
+
+    def get_controller_data(self, start_date=None, end_date=None, controller_ids=None,
+                            columns: Optional[List[str]] = None) -> pd.DataFrame:
+        controllers = self._query("Controllers", columns, "timestamp", start_date, end_date,
+                                  filters={"id": controller_ids})
+        return self._decode_json_columns(controllers, ["config"])
 
-    def get_controller_data(self, start_date=None, end_date=None) -> pd.DataFrame:
-        query = "SELECT * FROM Controllers"
-        controllers = pd.read_sql_query(query, self.connection)
-        controllers["config"] = controllers["config"].apply(lambda x: json.loads(x) if isinstance(x, str) else x)
-        return controllers
-
-    def get_executors_from_controller_id(self, controller_id: str, start_date=None, end_date=None) -> pd.DataFrame:
-        query = f"SELECT * FROM Executors WHERE controller_id = '{controller_id}'"
-        executors = pd.read_sql_query(query, self.connection)
-        executors["custom_info"] = executors["custom_info"].apply(lambda x: json.loads(x) if isinstance(x, str) else x)
-        executors["config"] = executors["config"].apply(lambda x: json.loads(x) if isinstance(x, str) else x)
-        for i, executor in executors.iterrows():
-            executor["custom_info"]["side"] = TradeType(executor["custom_info"]["side"])
+    def get_executors_from_controller_id(self, controller_id: str, start_date=None, end_date=None,
+                                         columns: Optional[List[str]] = None) -> pd.DataFrame:
+        executors = self.get_executors_data(start_date, end_date, controller_ids=[controller_id], columns=columns)
+        if "custom_info" in executors:
+            for custom_info in executors["custom_info"]:
+                custom_info["side"] = TradeType(custom_info["side"])
         return executors
 
     def get_controller_performance(self, controller_id: str, start_date=None, end_date=None) -> ControllerPerformance:
-        executors = self.get_executors_from_controller_id(controller_id)
-        controllers_data = self.get_controller_data()
-        controller_config = json.loads(controllers_data[controllers_data["id"] == controller_id]["config"].values[0])
+        executors = self.get_executors_from_controller_id(controller_id, start_date, end_date)
+        controller_configs = self.get_controller_data(controller_ids=[controller_id], columns=["config"])["config"]
+        if controller_configs.empty:
+            raise ValueError(f"Controller {controller_id} not found in {self.db_name}")
+        controller_config = controller_configs.iloc[0]
         return ControllerPerformance(executors, controller_config, self.root_path, self.load_cache_data)
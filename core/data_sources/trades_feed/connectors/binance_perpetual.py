@@ -3,10 +3,10 @@ import logging
 from time import time
 from typing import Dict, Optional
 
-import aiohttp
 import pandas as pd
 
 from core.data_sources.trades_feed.trades_feed_base import TradesFeedBase
+from core.services.http_transport import HttpError
 
 
 class BinancePerpetualTradesFeed(TradesFeedBase):
@@ -75,11 +75,13 @@ class BinancePerpetualTradesFeed(TradesFeedBase):
     async def _get_historical_trades_request(self, params: Dict):
         try:
             url = f"{self._base_url}{self._endpoints['historical_agg_trades']}"
-            async with self._session.get(url, params=params) as response:
-                response.raise_for_status()
-                self._record_request()  # Record the timestamp of this request
-                return await response.json()
-        except aiohttp.ClientResponseError as e:
+            # Rate limit statuses are handled below, with the sleeps Binance requires
+            response = await self._transport.request("GET", url, endpoint="binance_perpetual/aggTrades",
+                                                     params=params, retries=0)
+            self._record_request()  # Record the timestamp of this request
+            response.raise_for_status()
+            return response.json()
+        except HttpError as e:
             self.logger().error(f"Error fetching historical trades for {params}: {e}")
             if e.status == 429:
                 await asyncio.sleep(1)  # Sleep to respect rate limits
@@ -2,12 +2,13 @@ import time
 from abc import ABC, abstractmethod
 from typing import Optional
 
-import aiohttp
+from core.services.http_transport import HttpTransport, get_transport
 
 
 class TradesFeedBase(ABC):
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
-        self._session = session or aiohttp.ClientSession()
+    def __init__(self, transport: Optional[HttpTransport] = None):
+        # The transport opens its session lazily in the running loop, so feeds can be built outside of one
+        self._transport = transport or get_transport()
 
     @abstractmethod
     def get_exchange_trading_pair(self, trading_pair: str) -> str:
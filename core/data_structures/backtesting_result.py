@@ -3,13 +3,15 @@ from typing import Dict, Optional
 
 import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 
 from core.data_structures.data_structure_base import DataStructureBase
+from core.lazy_imports import lazy_import
 from hummingbot.connector.connector_base import TradeType
 from hummingbot.strategy_v2.controllers import ControllerConfigBase
 
+go = lazy_import("plotly.graph_objects")
+plotly_subplots = lazy_import("plotly.subplots")
+
 
 class BacktestingResult(DataStructureBase):
     def __init__(self, backtesting_result: Dict, controller_config: ControllerConfigBase):
@@ -122,7 +124,7 @@ Close Types: Take Profit: {take_profit} | Stop Loss: {stop_loss} | Time Limit: {
 
     def get_backtesting_figure(self):
         # Create subplots
-        fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+        fig = plotly_subplots.make_subplots(rows=2, cols=1, shared_xaxes=True,
                             vertical_spacing=0.02, subplot_titles=('Candlestick', 'PNL Quote'),
                             row_heights=[0.7, 0.3])
 
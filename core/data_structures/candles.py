@@ -1,9 +1,11 @@
 import pandas as pd
-import plotly.graph_objects as go
 
 from core import theme
+from core.lazy_imports import lazy_import
 from core.data_structures.data_structure_base import DataStructureBase
 
+go = lazy_import("plotly.graph_objects")
+
 
 class Candles(DataStructureBase):
     def __init__(self, candles_df: pd.DataFrame, connector_name: str, trading_pair: str, interval: str):
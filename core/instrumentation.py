@@ -0,0 +1,166 @@
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Task whose execute() is running in the current context, used to label the spans and counters it produces.
+current_task: ContextVar[Optional[str]] = ContextVar("current_task", default=None)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters, timers and gauges. Timers keep count, sum and max of the observed durations.
+    Everything is labelled with the current task, so per-task hot paths can be compared across runs.
+    Collectors are called before each snapshot to refresh gauges computed elsewhere, such as latency percentiles.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.timers: Dict[Tuple[str, Labels], list] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self.collectors: List[Callable[["MetricsRegistry"], None]] = []
+
+    @staticmethod
+    def labels(**labels: str) -> Labels:
+        labels.setdefault("task", current_task.get() or "none")
+        return tuple(sorted(labels.items()))
+
+    def count(self, name: str, value: float = 1, **labels: str):
+        key = (name, self.labels(**labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str):
+        key = (name, self.labels(**labels))
+        with self._lock:
+            timer = self.timers.setdefault(key, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def set_gauge(self, name: str, value: float, **labels: str):
+        key = (name, self.labels(**labels))
+        with self._lock:
+            self.gauges[key] = value
+
+    def register_collector(self, collector: Callable[["MetricsRegistry"], None]):
+        self.collectors.append(collector)
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        for collector in self.collectors:
+            collector(self)
+        with self._lock:
+            snapshot = {"counters": dict(self.counters), "timers": {key: list(value)
+                                                                    for key, value in self.timers.items()},
+                        "gauges": dict(self.gauges)}
+            if reset:
+                self.counters.clear()
+                self.timers.clear()
+                self.gauges.clear()
+        return snapshot
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """Add the snapshot of another process (a subprocess-placed task) to this registry."""
+        with self._lock:
+            for key, value in snapshot["counters"].items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, (count, total, maximum) in snapshot["timers"].items():
+                timer = self.timers.setdefault(key, [0, 0.0, 0.0])
+                timer[0] += count
+                timer[1] += total
+                timer[2] = max(timer[2], maximum)
+            self.gauges.update(snapshot.get("gauges", {}))
+
+    def render_prometheus(self) -> str:
+        def label_text(labels: Labels) -> str:
+            return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+        lines = []
+        snapshot = self.snapshot()
+        for (name, labels), value in sorted(snapshot["counters"].items()):
+            lines.append(f"quants_lab_{name}_total{label_text(labels)} {value}")
+        for (name, labels), (count, total, maximum) in sorted(snapshot["timers"].items()):
+            lines.append(f"quants_lab_{name}_seconds_count{label_text(labels)} {count}")
+            lines.append(f"quants_lab_{name}_seconds_sum{label_text(labels)} {total}")
+            lines.append(f"quants_lab_{name}_seconds_max{label_text(labels)} {maximum}")
+        for (name, labels), value in sorted(snapshot["gauges"].items()):
+            lines.append(f"quants_lab_{name}{label_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self, path: str):
+        """Write the textfile-collector format atomically, so a scraper never reads a partial file."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+    def export_sqlite(self, path: str):
+        """Append the current totals to a local SQLite file, one row per metric and label set."""
+        snapshot = self.snapshot()
+        now = time.time()
+        rows = [(now, name, json.dumps(dict(labels)), "counter", value, None, None)
+                for (name, labels), value in snapshot["counters"].items()]
+        rows += [(now, name, json.dumps(dict(labels)), "timer", count, total, maximum)
+                 for (name, labels), (count, total, maximum) in snapshot["timers"].items()]
+        rows += [(now, name, json.dumps(dict(labels)), "gauge", value, None, None)
+                 for (name, labels), value in snapshot["gauges"].items()]
+        with sqlite3.connect(path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS metrics (
+                    timestamp REAL, name TEXT, labels TEXT, kind TEXT, value REAL, total_seconds REAL,
+                    max_seconds REAL)
+            """)
+            conn.executemany("INSERT INTO metrics VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def export(self, export_format: str, path: str):
+        if export_format == "prometheus":
+            self.export_prometheus(path)
+        elif export_format == "sqlite":
+            self.export_sqlite(path)
+        else:
+            raise ValueError(f"Unknown metrics format {export_format}, expected prometheus or sqlite")
+
+
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def span(kind: str, operation: str):
+    """Time a DB or HTTP call and count it, labelled with the current task, kind and operation."""
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        metrics.observe("span", time.perf_counter() - start, kind=kind, operation=operation)
+        metrics.count("calls", kind=kind, operation=operation, status=status)
+
+
+def instrument(kind: str):
+    """Class decorator wrapping every public coroutine method of a client in a span named Class.method."""
+    def decorator(cls):
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.iscoroutinefunction(method):
+                continue
+            setattr(cls, name, _traced(method, kind, name))
+        return cls
+    return decorator
+
+
+def _traced(method, kind: str, name: str):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        with span(kind, f"{type(self).__name__}.{name}"):
+            return await method(self, *args, **kwargs)
+    return wrapper
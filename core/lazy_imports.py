@@ -0,0 +1,27 @@
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """Placeholder for a module that is imported, parent packages included, on first attribute access."""
+    def __getattr__(self, attribute: str):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attribute)
+
+
+def lazy_import(module_name: str) -> ModuleType:
+    """
+    Return a module whose code only runs on first attribute access. Used for the plotting and analytics libraries
+    (plotly, statsmodels, sklearn...) so importing a task module does not pay for code paths that never run.
+    Only the top-level package is looked up eagerly, which does not execute it, so a missing library still fails
+    at import time.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    top_level = module_name.partition(".")[0]
+    if importlib.util.find_spec(top_level) is None:
+        raise ModuleNotFoundError(f"No module named '{top_level}'", name=top_level)
+    return LazyModule(module_name)
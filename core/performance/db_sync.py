@@ -0,0 +1,133 @@
+import json
+import logging
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from core.data_sources.hummingbot_database import HummingbotDatabase
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".sync_manifest.json"
+EXCLUDED_DATABASES = ["v2_with_controllers.sqlite"]
+
+
+class RemoteDatabaseSync:
+    """
+    Mirrors the bot SQLite databases of a backend server into a local directory.
+    All ssh calls share one master connection (ControlMaster), the remote files are listed with their size and mtime
+    in a single call, and only files that changed since the last sync, according to the local manifest, are
+    transferred. rsync is used when available so changed databases are sent as deltas; scp is the fallback.
+    Each downloaded database gets the HummingbotDatabase query indexes, since the report opens it read-only.
+    """
+    def __init__(self, host: str, user: str, data_path: str, local_path: str, max_workers: int = 4):
+        self.host = host
+        self.user = user
+        self.data_path = data_path
+        self.local_path = local_path
+        self.max_workers = max_workers
+        self.manifest_path = os.path.join(local_path, MANIFEST_NAME)
+        self._control_dir = None
+
+    @property
+    def destination(self) -> str:
+        return f"{self.user}@{self.host}"
+
+    @property
+    def ssh_options(self) -> List[str]:
+        return ["-o", "ControlMaster=auto", "-o", f"ControlPath={self._control_dir}/%C", "-o", "ControlPersist=60",
+                "-o", "BatchMode=yes"]
+
+    def __enter__(self):
+        self._control_dir = tempfile.mkdtemp(prefix="ssh-sync-")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        subprocess.run(["ssh", *self.ssh_options, "-O", "exit", self.destination], capture_output=True)
+        shutil.rmtree(self._control_dir, ignore_errors=True)
+
+    def list_remote(self) -> Dict[str, Dict]:
+        """Size and mtime of every remote database, keyed by file name, from one ssh call."""
+        excluded = " ".join(f"! -name {shlex.quote(name)}" for name in EXCLUDED_DATABASES)
+        command = (f"find {self.data_path}/*/data -type f -name '*.sqlite' {excluded} "
+                   f"-printf '%s %T@ %p\\n' 2>/dev/null; true")
+        result = subprocess.run(["ssh", *self.ssh_options, self.destination, command],
+                                capture_output=True, text=True, check=True)
+        remote_files = {}
+        for line in result.stdout.splitlines():
+            size, mtime, path = line.split(" ", 2)
+            name = os.path.basename(path)
+            if name in remote_files:
+                logger.warning(f"Duplicate database name {name}: keeping {remote_files[name]['path']}, skipping {path}")
+                continue
+            remote_files[name] = {"path": path, "size": int(size), "mtime": float(mtime)}
+        return remote_files
+
+    def load_manifest(self) -> Dict[str, Dict]:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_manifest(self, manifest: Dict[str, Dict]):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def changed_files(self, remote_files: Dict[str, Dict], manifest: Dict[str, Dict]) -> List[str]:
+        return [name for name, remote in remote_files.items()
+                if manifest.get(name) != remote or not os.path.exists(os.path.join(self.local_path, name))]
+
+    def transfer(self, name: str, remote_path: str):
+        local_file = os.path.join(self.local_path, name)
+        source = f"{self.destination}:{shlex.quote(remote_path)}"
+        if shutil.which("rsync"):
+            ssh_command = " ".join(["ssh", *map(shlex.quote, self.ssh_options)])
+            subprocess.run(["rsync", "--times", "--compress", "-e", ssh_command, source, local_file],
+                           capture_output=True, text=True, check=True)
+        else:
+            partial_file = f"{local_file}.part"
+            subprocess.run(["scp", "-q", *self.ssh_options, source, partial_file],
+                           capture_output=True, text=True, check=True)
+            os.replace(partial_file, local_file)
+        HummingbotDatabase.index_database(local_file)
+
+    def sync(self) -> Dict[str, List[str]]:
+        """Transfer the new and changed databases. Returns the names downloaded, skipped and failed."""
+        os.makedirs(self.local_path, exist_ok=True)
+        remote_files = self.list_remote()
+        manifest = self.load_manifest()
+        changed = self.changed_files(remote_files, manifest)
+        summary = {"downloaded": [], "unchanged": sorted(set(remote_files) - set(changed)), "failed": []}
+        logger.info(f"{len(remote_files)} remote databases, {len(changed)} new or changed")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.transfer, name, remote_files[name]["path"]): name for name in changed}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    future.result()
+                except subprocess.CalledProcessError as e:
+                    logger.error(f"Failed to fetch {remote_files[name]['path']}: {e.stderr}")
+                    summary["failed"].append(name)
+                    continue
+                manifest[name] = remote_files[name]
+                self.save_manifest(manifest)
+                summary["downloaded"].append(name)
+                logger.info(f"Downloaded: {remote_files[name]['path']}")
+        return summary
+
+
+def sync_databases(host: str, user: str, data_path: str, local_path: str,
+                   max_workers: int = 4) -> Optional[Dict[str, List[str]]]:
+    try:
+        with RemoteDatabaseSync(host, user, data_path, local_path, max_workers) as syncer:
+            return syncer.sync()
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Error listing remote databases: {e.stderr}")
+        return None
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+FILL_COLUMNS = ["db_name", "controller_id", "side", "trading_pair", "order_type", "trade_type",
+                "cumulative_fee_paid_quote", "position_action", "timestamp", "price", "base_amount", "quote_amount",
+                "position_multiplier"]
+
+
+def timestamps_in_seconds(timestamps: pd.Series) -> np.ndarray:
+    values = np.floor(pd.to_numeric(timestamps).to_numpy(dtype=float))
+    if (values < 1e9).any():
+        raise ValueError(
+            "Timestamp is not in a recognized format. Must be in seconds, milliseconds, microseconds or nanoseconds.")
+    return values / np.select([values >= 1e18, values >= 1e15, values >= 1e12], [1e9, 1e6, 1e3], 1.0)
+
+
+def extract_fills(executors_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per order fill of the executors, flattened with json_normalize instead of per-fill dicts.
+    The filled orders are not flattened (max_level=0) so each keeps its order_fills dict, keyed by fill id.
+    Module level so it can run in worker processes.
+    """
+    orders = pd.json_normalize(
+        [{"db_name": db_name, "controller_id": controller_id, "side": config["side"],
+          "filled_orders": custom_info["filled_orders"]}
+         for db_name, controller_id, config, custom_info in zip(
+            executors_df["db_name"], executors_df["controller_id"], executors_df["config"],
+            executors_df["custom_info"])],
+        record_path="filled_orders", meta=["db_name", "controller_id", "side"], meta_prefix="executor.",
+        max_level=0)
+    if orders.empty:
+        return pd.DataFrame(columns=FILL_COLUMNS)
+    orders["order_fills"] = orders["order_fills"].map(lambda order_fills: list(order_fills.values()))
+    orders = orders.explode("order_fills", ignore_index=True).dropna(subset=["order_fills"]).reset_index(drop=True)
+    if orders.empty:
+        return pd.DataFrame(columns=FILL_COLUMNS)
+    fills = pd.json_normalize(orders["order_fills"].tolist())
+
+    # this will be only valid when percent_token = USDT
+    flat_fees = fills["fee.flat_fees"].explode() if "fee.flat_fees" in fills else pd.Series(dtype=object)
+    flat_fees = flat_fees.dropna()
+    fee_amounts = pd.to_numeric(pd.json_normalize(flat_fees.tolist())["amount"]) if len(flat_fees) else \
+        pd.Series(dtype=float)
+    cumulative_fee_paid_quote = fee_amounts.groupby(flat_fees.index.to_numpy()).sum() \
+        .reindex(fills.index, fill_value=0.0)
+
+    trade_type = orders["trade_type"]
+    position_action = orders["position"]
+    opens_long = ((trade_type == "BUY") & (position_action == "OPEN")) | \
+                 ((trade_type == "SELL") & (position_action == "CLOSE"))
+    return pd.DataFrame({
+        "db_name": orders["executor.db_name"],
+        "controller_id": orders["executor.controller_id"],
+        "side": orders["executor.side"],
+        "trading_pair": orders["trading_pair"],
+        "order_type": orders["order_type"],
+        "trade_type": trade_type,
+        "cumulative_fee_paid_quote": cumulative_fee_paid_quote.to_numpy(dtype=float),
+        "position_action": position_action,
+        "timestamp": timestamps_in_seconds(fills["fill_timestamp"]),
+        "price": pd.to_numeric(fills["fill_price"]).to_numpy(dtype=float),
+        "base_amount": pd.to_numeric(fills["fill_base_amount"]).to_numpy(dtype=float),
+        "quote_amount": pd.to_numeric(fills["fill_quote_amount"]).to_numpy(dtype=float),
+        "position_multiplier": np.where(opens_long, 1, -1),
+    })
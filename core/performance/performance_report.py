@@ -1,27 +1,62 @@
+import asyncio
+import json
 import logging
 import os
-import subprocess
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
-from plotly.subplots import make_subplots
-import plotly.figure_factory as ff
-import plotly.express as px
-
-import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
 
 from core.data_sources import CLOBDataSource
 from core.data_sources.hummingbot_database import HummingbotDatabase
 from core.data_structures.candles import Candles
+from core.lazy_imports import lazy_import
+from core.performance.db_sync import sync_databases
+from core.performance.fills import FILL_COLUMNS, extract_fills, timestamps_in_seconds
 from core.performance.models import TradingSession
+from core.performance.pnl import PNL_KEYS, PnLEngine
+from core.performance.session_store import TradingSessionStore
 from core.services.mongodb_client import MongoClient
 
 logging.getLogger("asyncio").setLevel(logging.CRITICAL)
 warnings.filterwarnings("ignore")
 
+go = lazy_import("plotly.graph_objects")
+ff = lazy_import("plotly.figure_factory")
+px = lazy_import("plotly.express")
+plotly_subplots = lazy_import("plotly.subplots")
+
+# Executor columns read by the fills extraction and the reports.
+EXECUTOR_COLUMNS = ["id", "timestamp", "controller_id", "config", "custom_info", "net_pnl_quote",
+                    "filled_amount_quote"]
+
+
+def get_valid_controllers(db: HummingbotDatabase, controller_name: str) -> List[Dict[str, Any]]:
+    valid_controllers = []
+    controllers = db.get_controller_data().to_dict(orient="records")
+    for controller in controllers:
+        if controller["config"]["controller_name"] == controller_name:
+            controller["db_name"] = db.db_name
+            controller["session_id"] = f"{db.db_name}_{controller['id']}"
+            valid_controllers.append(controller)
+    return valid_controllers
+
+
+def load_database(root_path: str, db_name: str, controller_name: str) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Executors and controllers of one bot database for the given controller. Module level for process pools."""
+    db = HummingbotDatabase(db_name=db_name, root_path=root_path)
+    try:
+        valid_controllers = get_valid_controllers(db, controller_name)
+        valid_controllers_ids = [controller["id"] for controller in valid_controllers]
+        executors_df = db.get_executors_data(controller_ids=valid_controllers_ids, columns=EXECUTOR_COLUMNS)
+        executors_df["db_name"] = db_name
+        return executors_df, valid_controllers
+    finally:
+        db.connection.close()
+
 
 class PerformanceReport:
     def __init__(self, mongo_uri: str, database: str, from_timestamp: float, to_timestamp: float,
@@ -40,6 +75,8 @@ class PerformanceReport:
         self.all_executors_df = pd.DataFrame()
         self.all_configs = {}
         self.all_trades_df = pd.DataFrame()
+        self.pnl_engine = PnLEngine()
+        self.session_store = TradingSessionStore(self.mongo_client)
         self.trading_sessions = []
         self.trading_pairs = []
 
@@ -60,121 +97,130 @@ class PerformanceReport:
     def controller_name(self):
         raise NotImplementedError
 
-    async def load_data(self):
-        all_controllers = []
-        all_executors = pd.DataFrame()
+    async def load_data(self, max_workers: Optional[int] = None):
+        """
+        Load the executors and controllers of every database. Unchanged databases come from the per-database cache;
+        the others are parsed concurrently in a process pool awaited from the event loop. Everything is
+        concatenated once.
+        """
+        loop = asyncio.get_running_loop()
         self.dbs = self.list_dbs()
+        results: Dict[str, Tuple[pd.DataFrame, List[Dict[str, Any]]]] = {}
+        to_parse = []
         for db_name in self.dbs:
-            try:
-                db = HummingbotDatabase(db_name=db_name, root_path=self.root_path)
-                executors_df = db.get_executors_data()
-                executors_df["db_name"] = db_name
-                valid_controllers = self.get_all_controllers(db)
-                valid_controllers_ids = [controller["id"] for controller in valid_controllers]
-                all_executors = pd.concat(
-                    [all_executors, executors_df[executors_df["controller_id"].isin(valid_controllers_ids)]])
-                all_controllers.extend(valid_controllers)
-            except Exception as e:
-                print(e)
-                continue
-        all_configs = {controller["id"]: controller for controller in all_controllers}
-
-        self.all_configs = all_configs
+            cached = self.load_cached_database(db_name)
+            if cached is not None:
+                results[db_name] = cached
+            else:
+                to_parse.append(db_name)
+
+        if to_parse:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                parsed = await asyncio.gather(*[
+                    loop.run_in_executor(executor, load_database, self.root_path, db_name, self.controller_name)
+                    for db_name in to_parse], return_exceptions=True)
+            for db_name, result in zip(to_parse, parsed):
+                if isinstance(result, Exception):
+                    logging.error(f"Error loading {db_name}: {result}")
+                    continue
+                results[db_name] = result
+                self.store_cached_database(db_name, result)
+        logging.info(f"Loaded {len(results)} databases ({len(to_parse)} parsed, "
+                     f"{len(self.dbs) - len(to_parse)} cached)")
+
+        all_controllers = [controller for db_name in self.dbs if db_name in results
+                           for controller in results[db_name][1]]
+        executors = [results[db_name][0] for db_name in self.dbs if db_name in results]
+        self.all_configs = {controller["id"]: controller for controller in all_controllers}
         self.all_controllers = all_controllers
-        self.all_executors_df = all_executors
-        self.all_trades_df = self.get_all_trades_df()
+        self.all_executors_df = pd.concat(executors, ignore_index=True) if executors else pd.DataFrame()
+        self.all_trades_df = await loop.run_in_executor(None, self.get_all_trades_df, max_workers)
         self.trading_pairs = list(self.all_trades_df["trading_pair"].unique())
 
+    def database_cache_path(self, db_name: str, extension: str) -> str:
+        return os.path.join(self.root_path, "data", "performance_cache", f"{db_name}.{extension}")
+
+    def database_cache_key(self, db_name: str) -> List[Any]:
+        stat = os.stat(os.path.join(self.root_path, "data", "live_bot_databases", db_name))
+        return [stat.st_mtime_ns, stat.st_size, self.controller_name]
+
+    def load_cached_database(self, db_name: str) -> Optional[Tuple[pd.DataFrame, List[Dict[str, Any]]]]:
+        """
+        Cached executors and controllers of a database, None if it changed (mtime or size) since caching.
+        The executors are a parquet file whose dict columns hold JSON text, listed in the JSON sidecar that also
+        stores the cache key and the controllers.
+        """
+        try:
+            with open(self.database_cache_path(db_name, "json")) as f:
+                sidecar = json.load(f)
+            if sidecar["key"] != self.database_cache_key(db_name):
+                return None
+            executors_df = pd.read_parquet(self.database_cache_path(db_name, "parquet"))
+        except Exception:
+            return None
+        for column in sidecar["json_columns"]:
+            executors_df[column] = [json.loads(value) for value in executors_df[column]]
+        return executors_df, sidecar["controllers"]
+
+    def store_cached_database(self, db_name: str, result: Tuple[pd.DataFrame, List[Dict[str, Any]]]):
+        executors_df, controllers = result
+        os.makedirs(os.path.dirname(self.database_cache_path(db_name, "json")), exist_ok=True)
+        json_columns = [column for column in executors_df.columns if executors_df[column].dtype == object and
+                        executors_df[column].map(lambda value: isinstance(value, (dict, list))).any()]
+        try:
+            executors_df = executors_df.assign(**{column: executors_df[column].map(json.dumps)
+                                                  for column in json_columns})
+            sidecar = json.dumps({"key": self.database_cache_key(db_name), "json_columns": json_columns,
+                                  "controllers": controllers})
+            # The sidecar is replaced last, so an interrupted write leaves no valid key for a partial parquet file
+            if os.path.exists(self.database_cache_path(db_name, "json")):
+                os.remove(self.database_cache_path(db_name, "json"))
+            executors_df.to_parquet(self.database_cache_path(db_name, "parquet"), index=False)
+            with open(self.database_cache_path(db_name, "json"), "w") as f:
+                f.write(sidecar)
+        except Exception as e:
+            logging.warning(f"Could not cache {db_name}: {e}")
+
     def get_all_controllers(self, db: HummingbotDatabase) -> List[Dict[str, Any]]:
-        valid_controllers = []
-        controllers = db.get_controller_data().to_dict(orient="records")
-        for controller in controllers:
-            if controller["config"]["controller_name"] == self.controller_name:
-                controller["db_name"] = db.db_name
-                controller["session_id"] = f"{db.db_name}_{controller['id']}"
-                valid_controllers.append(controller)
-        return valid_controllers
+        return get_valid_controllers(db, self.controller_name)
 
     def list_dbs(self) -> List[str]:
         return [db_path for db_path in os.listdir(os.path.join(self.root_path, "data", "live_bot_databases"))
                 if db_path != ".gitignore"]
 
-    def get_all_trades_df(self):
-        all_trades = []
-
-        for _, executor in self.all_executors_df.iterrows():
-            custom_info = executor["custom_info"]
-            for order_filled in custom_info["filled_orders"]:
-                for _, fill in order_filled["order_fills"].items():
-                    trade_type = order_filled["trade_type"]  # BUY or SELL
-                    position_action = order_filled["position"]  # OPEN or CLOSE
-
-                    position_multiplier = 1 if (trade_type == "BUY" and position_action == "OPEN") or (
-                                trade_type == "SELL" and position_action == "CLOSE") else -1
-                    fill_dict = {
-                        "db_name": executor["db_name"],
-                        "controller_id": executor["controller_id"],
-                        "side": executor["config"]["side"],
-                        "trading_pair": order_filled["trading_pair"],
-                        "order_type": order_filled["order_type"],
-                        "trade_type": trade_type,
-                        "cumulative_fee_paid_quote": sum(
-                            [float(flat_fee["amount"]) for flat_fee in fill["fee"]["flat_fees"]]),
-                        # this will be only valid when percent_token = USDT
-                        "position_action": order_filled["position"],
-                        "timestamp": self.ensure_timestamp_in_seconds(fill["fill_timestamp"]),
-                        "price": float(fill["fill_price"]),
-                        "base_amount": float(fill["fill_base_amount"]),
-                        "quote_amount": float(fill["fill_quote_amount"]),
-                        "position_multiplier": position_multiplier
-                    }
-                    all_trades.append(fill_dict)
-        all_trades_df = pd.DataFrame(all_trades)
-        return all_trades_df
+    def get_all_trades_df(self, max_workers: Optional[int] = None):
+        """Extract the fills of every database, in parallel processes when there are several databases."""
+        if self.all_executors_df.empty:
+            return pd.DataFrame(columns=FILL_COLUMNS)
+        executors_by_db = [executors_df for _, executors_df in self.all_executors_df.groupby("db_name", sort=False)]
+        if len(executors_by_db) == 1:
+            return extract_fills(executors_by_db[0])
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            fills = list(executor.map(extract_fills, executors_by_db))
+        return pd.concat(fills, ignore_index=True)
 
     async def build_trading_sessions(self) -> List[TradingSession]:
         raise NotImplementedError
 
+    def update_performance_fields(self, new_trades_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        PnL fields of every controller and side, computed in one pass over all_trades_df on the first call.
+        Later calls with the fills appended since then only compute those fills.
+        """
+        if new_trades_df is None:
+            self.pnl_engine = PnLEngine()
+            new_trades_df = self.all_trades_df
+        self.pnl_engine.update(new_trades_df)
+        return self.pnl_engine.performance_df
+
     @staticmethod
     def calculate_performance_fields(trades_df: pd.DataFrame, controller_id: str = None, side: int = 1):
-        performance_df = trades_df.copy()
+        """PnL fields of one side, for one controller or for all controllers combined."""
+        mask = trades_df["side"] == side
         if controller_id is not None:
-            performance_df = performance_df[performance_df["controller_id"] == controller_id]
-        performance_df.sort_values("timestamp", inplace=True)
-        performance_df = performance_df[performance_df["side"] == side]
-        performance_df["datetime"] = pd.to_datetime(performance_df["timestamp"], unit="s")
-
-        # Initialize columns
-        performance_df["base_amount_open"] = np.where(performance_df["position_action"] == "OPEN",
-                                                      performance_df["base_amount"], 0)
-        performance_df["base_amount_close"] = np.where(performance_df["position_action"] == "CLOSE",
-                                                       performance_df["base_amount"], 0)
-        performance_df["cum_base_open"] = performance_df["base_amount_open"].cumsum()
-        performance_df["cum_base_close"] = performance_df["base_amount_close"].cumsum()
-
-        performance_df["cum_quote_open"] = (performance_df["base_amount_open"] * performance_df["price"]).cumsum()
-        performance_df["cum_quote_close"] = (performance_df["base_amount_close"] * performance_df["price"]).cumsum()
-
-        # Break-even calculation
-        performance_df["break_even_open"] = performance_df["cum_quote_open"] / performance_df["cum_base_open"]
-        performance_df["break_even_close"] = performance_df["cum_quote_close"] / performance_df["cum_base_close"]
-
-        # PnL calculations
-        if side == 1:  # Long
-            performance_df["realized_pnl"] = (performance_df["break_even_close"] - performance_df["break_even_open"]) * \
-                                             performance_df["cum_base_close"]
-            performance_df["unrealized_pnl"] = (performance_df["price"] - performance_df["break_even_open"]) * (
-                        performance_df["cum_base_open"] - performance_df["cum_base_close"])
-        else:  # Short (side=2)
-            performance_df["realized_pnl"] = (performance_df["break_even_open"] - performance_df["break_even_close"]) * \
-                                             performance_df["cum_base_close"]
-            performance_df["unrealized_pnl"] = (performance_df["break_even_open"] - performance_df["price"]) * (
-                        performance_df["cum_base_open"] - performance_df["cum_base_close"])
-
-        # Global PnL
-        performance_df["global_pnl"] = (performance_df["realized_pnl"] + performance_df["unrealized_pnl"] -
-                                        performance_df["cumulative_fee_paid_quote"].cumsum())
-        return performance_df
+            mask &= trades_df["controller_id"] == controller_id
+        keys = PNL_KEYS if controller_id is not None else ["side"]
+        return PnLEngine(keys).compute(trades_df[mask])
 
     @staticmethod
     def summarize_performance_metrics(df: pd.DataFrame, controller_config: Dict[str, Any], side: int = 1):
@@ -201,7 +247,7 @@ class PerformanceReport:
     async def plot_candles_with_global_pnl_chart(candles: Candles, df: pd.DataFrame, side: int = 1):
         # Create a subplot with 2 rows
         side = "Long" if side == 1 else "Short"
-        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05,
+        fig = plotly_subplots.make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05,
                             subplot_titles=(f"{side} OHLC Chart with Break-Even Levels", "PnL and Fees Over Time"))
 
         # ---------------------- FIG 1: Candlestick Chart & Break Even ----------------------
@@ -327,7 +373,7 @@ class PerformanceReport:
         )
 
         # Create subplots with 3 rows
-        fig = make_subplots(
+        fig = plotly_subplots.make_subplots(
             rows=3, cols=1,
             row_heights=[0.5, 0.25, 0.25],  # 50%-25%-25%
             shared_xaxes=True,
@@ -408,44 +454,15 @@ class PerformanceReport:
         return fig
 
     @staticmethod
-    def fetch_dbs(root_path: str, host: str, user: str, data_path: str):
+    def fetch_dbs(root_path: str, host: str, user: str, data_path: str, max_workers: int = 4):
+        """Sync the remote bot databases into data/live_bot_databases, downloading only new or changed files."""
         local_path = os.path.join(root_path, "data/live_bot_databases")
+        return sync_databases(host, user, data_path, local_path, max_workers=max_workers)
 
-        # Ensure local directory exists
-        os.makedirs(local_path, exist_ok=True)
-        # Step 1: List directories in BACKEND_API_SERVER_DATA_PATH
-        list_dirs_cmd = f'ssh {user}@{host} "ls -d {data_path}/*/"'
-        try:
-            result = subprocess.run(list_dirs_cmd, shell=True, capture_output=True, text=True, check=True)
-            directories = result.stdout.strip().split("\n")
-        except subprocess.CalledProcessError as e:
-            print(f"Error fetching directories: {e.stderr}")
-            exit(1)
-
-        # Step 2: Iterate through directories and find SQLite files
-        for directory in directories:
-            sequence_dir = directory.strip()
-            data_folder = f"{sequence_dir}/data"
-
-            # Find SQLite files, excluding "v2_with_controllers.sqlite"
-            find_files_cmd = f'ssh {user}@{host} "find {data_folder} -type f -name \'*.sqlite\' ! -name \'v2_with_controllers.sqlite\'"'
-
-            try:
-                file_result = subprocess.run(find_files_cmd, shell=True, capture_output=True, text=True, check=True)
-                sqlite_files = file_result.stdout.strip().split("\n")
-            except subprocess.CalledProcessError as e:
-                print(f"Error fetching SQLite files in {data_folder}: {e.stderr}")
-                continue  # Skip this folder if there's an error
-
-            # Step 3: Transfer SQLite files using SCP
-            for remote_file in sqlite_files:
-                if remote_file:  # Ignore empty results
-                    scp_cmd = f"scp {user}@{host}:{remote_file} {local_path}/"
-                    try:
-                        subprocess.run(scp_cmd, shell=True, check=True)
-                        print(f"Downloaded: {remote_file}")
-                    except subprocess.CalledProcessError as e:
-                        print(f"Failed to fetch {remote_file}: {e.stderr}")
+    @staticmethod
+    def timestamps_in_seconds(timestamps: pd.Series) -> np.ndarray:
+        """Vectorized ensure_timestamp_in_seconds: detect the unit of each timestamp by magnitude."""
+        return timestamps_in_seconds(timestamps)
 
     @staticmethod
     def ensure_timestamp_in_seconds(timestamp: float) -> float:
@@ -0,0 +1,73 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+PNL_KEYS = ["controller_id", "side"]
+CUMULATIVE_COLUMNS = {
+    "cum_base_open": "base_amount_open",
+    "cum_base_close": "base_amount_close",
+    "cum_quote_open": "quote_amount_open",
+    "cum_quote_close": "quote_amount_close",
+    "cum_fees_quote": "cumulative_fee_paid_quote",
+}
+
+
+class PnLEngine:
+    """
+    Break-even, realized, unrealized and global PnL of every fill, for all groups (controller and side by default)
+    in one pass: the running sums are groupby cumsums and the PnL columns are computed on whole columns.
+    The engine keeps the last running sums of each group, so fills appended later are computed with `update`
+    without recomputing the history. Fills must be appended in time order within each group.
+    """
+    def __init__(self, keys: Sequence[str] = PNL_KEYS):
+        self.keys: List[str] = list(keys)
+        self.performance_df = pd.DataFrame()
+        self.last_totals: Optional[pd.DataFrame] = None
+
+    def compute(self, trades_df: pd.DataFrame, offsets: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """PnL fields of the fills, starting each group from `offsets` (the running sums before these fills)."""
+        df = trades_df.sort_values("timestamp", kind="stable")
+        df["datetime"] = pd.to_datetime(df["timestamp"], unit="s")
+        is_open = (df["position_action"] == "OPEN").to_numpy()
+        is_close = (df["position_action"] == "CLOSE").to_numpy()
+        base_amount = df["base_amount"].to_numpy(dtype=float)
+        price = df["price"].to_numpy(dtype=float)
+        df["base_amount_open"] = np.where(is_open, base_amount, 0)
+        df["base_amount_close"] = np.where(is_close, base_amount, 0)
+        df["quote_amount_open"] = df["base_amount_open"] * price
+        df["quote_amount_close"] = df["base_amount_close"] * price
+
+        sources = list(CUMULATIVE_COLUMNS.values())
+        totals = df.groupby(self.keys, sort=False)[sources].cumsum().to_numpy(dtype=float)
+        if offsets is not None and not offsets.empty:
+            totals += df[self.keys].merge(offsets.reset_index(), how="left", on=self.keys)[
+                list(CUMULATIVE_COLUMNS)].fillna(0).to_numpy()
+        for i, column in enumerate(CUMULATIVE_COLUMNS):
+            df[column] = totals[:, i]
+
+        df["break_even_open"] = df["cum_quote_open"] / df["cum_base_open"]
+        df["break_even_close"] = df["cum_quote_close"] / df["cum_base_close"]
+        # Long PnL formulas, negated for shorts (side=2)
+        direction = np.where(df["side"].to_numpy() == 1, 1, -1)
+        df["realized_pnl"] = direction * (df["break_even_close"] - df["break_even_open"]) * df["cum_base_close"]
+        df["unrealized_pnl"] = direction * (price - df["break_even_open"]) * (df["cum_base_open"] -
+                                                                               df["cum_base_close"])
+        df["global_pnl"] = df["realized_pnl"] + df["unrealized_pnl"] - df["cum_fees_quote"]
+        return df
+
+    def update(self, new_trades_df: pd.DataFrame) -> pd.DataFrame:
+        """Compute the new fills on top of the running sums of the previous ones and append them."""
+        if new_trades_df.empty:
+            return new_trades_df
+        new_df = self.compute(new_trades_df, self.last_totals)
+        last_totals = new_df.groupby(self.keys, sort=False)[list(CUMULATIVE_COLUMNS)].last()
+        self.last_totals = last_totals if self.last_totals is None else last_totals.combine_first(self.last_totals)
+        self.performance_df = new_df if self.performance_df.empty else pd.concat([self.performance_df, new_df])
+        return new_df
+
+    def groups(self):
+        """Performance frame of each group, keyed by the group key tuple. Empty until fills are added."""
+        if self.performance_df.empty:
+            return {}
+        return {key: df for key, df in self.performance_df.groupby(self.keys, sort=False)}
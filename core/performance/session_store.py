@@ -0,0 +1,132 @@
+import hashlib
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.services.mongodb_client import MongoClient
+
+FRAME_MARKER = "__frame__"
+ARRAY_MARKER = "__array__"
+
+
+def encode_array(values: np.ndarray) -> Any:
+    """Numeric and datetime arrays as raw little-endian bytes with their dtype, anything else as a list."""
+    if values.dtype.kind in "biuf":
+        dtype = values.dtype.newbyteorder("<")
+        return {ARRAY_MARKER: dtype.str, "data": np.ascontiguousarray(values, dtype=dtype).tobytes()}
+    if values.dtype.kind == "M":
+        return {ARRAY_MARKER: str(values.dtype), "data": values.astype("<i8").tobytes()}
+    return [encode_value(value) for value in values.tolist()]
+
+
+def decode_array(encoded: Dict[str, Any]) -> np.ndarray:
+    dtype = encoded[ARRAY_MARKER]
+    if dtype.startswith("datetime64"):
+        return np.frombuffer(bytes(encoded["data"]), dtype="<i8").astype(dtype)
+    return np.frombuffer(bytes(encoded["data"]), dtype=dtype)
+
+
+def encode_value(value: Any) -> Any:
+    """Make a session value storable: DataFrames become one binary array per column, numpy scalars plain values."""
+    if isinstance(value, pd.DataFrame):
+        return {FRAME_MARKER: list(map(str, value.columns)),
+                "columns": [encode_array(value[column].to_numpy()) for column in value.columns]}
+    if isinstance(value, pd.Series):
+        return encode_array(value.to_numpy())
+    if isinstance(value, np.ndarray):
+        return encode_array(value)
+    if isinstance(value, dict):
+        return {str(key): encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    if isinstance(value, pd.Timestamp):
+        return value.timestamp()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if FRAME_MARKER in value:
+            return pd.DataFrame({column: decode_array(encoded) if isinstance(encoded, dict) else encoded
+                                 for column, encoded in zip(value[FRAME_MARKER], value["columns"])})
+        if ARRAY_MARKER in value:
+            return decode_array(value)
+        return {key: decode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    return value
+
+
+def content_hash(value: Any) -> str:
+    """Stable hash of an encoded document, independent of dict key order."""
+    digest = hashlib.sha256()
+
+    def feed(item: Any):
+        if isinstance(item, dict):
+            digest.update(b"{")
+            for key in sorted(item):
+                digest.update(key.encode())
+                digest.update(b":")
+                feed(item[key])
+            digest.update(b"}")
+        elif isinstance(item, list):
+            digest.update(b"[")
+            for element in item:
+                feed(element)
+            digest.update(b"]")
+        elif isinstance(item, bytes):
+            digest.update(b"b")
+            digest.update(item)
+        else:
+            digest.update(f"{type(item).__name__}={item!r};".encode())
+
+    feed(value)
+    return digest.hexdigest()
+
+
+class TradingSessionStore:
+    """
+    Trading sessions in MongoDB, one document per session id. Only sessions whose content hash differs from the
+    stored one are written, and per-session frames such as the PnL curve are stored as binary column arrays.
+    """
+    def __init__(self, mongo_client: MongoClient, collection_name: str = "trading_sessions",
+                 db_name: Optional[str] = "quants_lab"):
+        self.mongo_client = mongo_client
+        self.collection_name = collection_name
+        self.db_name = db_name
+
+    async def get_hashes(self, session_ids: List[str]) -> Dict[str, str]:
+        documents = await self.mongo_client.get_documents(self.collection_name, query={"id": {"$in": session_ids}},
+                                                          db_name=self.db_name,
+                                                          projection={"_id": 0, "id": 1, "content_hash": 1},
+                                                          sort=None)
+        return {document["id"]: document.get("content_hash") for document in documents}
+
+    async def save(self, sessions: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Upsert the sessions (dicts with an `id` key) that changed since they were last saved."""
+        documents = []
+        for session in sessions:
+            document = encode_value(session)
+            document["content_hash"] = content_hash(document)
+            documents.append(document)
+        stored_hashes = await self.get_hashes([document["id"] for document in documents])
+        changed = [document for document in documents
+                   if stored_hashes.get(document["id"]) != document["content_hash"]]
+        now = time.time()
+        for document in changed:
+            document["updated_at"] = now
+        await self.mongo_client.upsert_documents(self.collection_name, changed, key_fields=["id"],
+                                                 db_name=self.db_name, index=[("id", 1)])
+        logging.info(f"Saved {len(changed)} of {len(documents)} trading sessions, {len(documents) - len(changed)} "
+                     f"unchanged.")
+        return {"written": len(changed), "unchanged": len(documents) - len(changed)}
+
+    async def load(self, query: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        documents = await self.mongo_client.get_documents(self.collection_name, query=query, db_name=self.db_name,
+                                                          projection={"_id": 0}, sort=None)
+        return [decode_value(document) for document in documents]
@@ -40,7 +40,7 @@ class BackendAPIClient(ClientBase):
     async def list_available_images(self, image_name: str):
         """List available images by name."""
         endpoint = f"available-images/{image_name}"
-        return await self.get(endpoint, auth=self.auth)
+        return await self.get(endpoint, auth=self.auth, route="available-images/{image_name}")
 
     async def list_active_containers(self):
         """List all active containers."""
@@ -63,17 +63,18 @@ class BackendAPIClient(ClientBase):
         params = {"archive_locally": archive_locally}
         if s3_bucket:
             params["s3_bucket"] = s3_bucket
-        return await self.post(endpoint, payload=json.dumps(params), auth=self.auth)
+        return await self.post(endpoint, payload=json.dumps(params), auth=self.auth,
+                               route="remove-container/{container_name}")
 
     async def stop_container(self, container_name: str):
         """Stop a specific container."""
         endpoint = f"stop-container/{container_name}"
-        return await self.post(endpoint, auth=self.auth)
+        return await self.post(endpoint, auth=self.auth, route="stop-container/{container_name}")
 
     async def start_container(self, container_name: str):
         """Start a specific container."""
         endpoint = f"start-container/{container_name}"
-        return await self.post(endpoint, auth=self.auth)
+        return await self.post(endpoint, auth=self.auth, route="start-container/{container_name}")
 
     async def create_hummingbot_instance(self, instance_config: dict):
         """Create a new Hummingbot instance."""
@@ -101,12 +102,12 @@ class BackendAPIClient(ClientBase):
     async def get_bot_status(self, bot_name: str):
         """Get the status of a bot."""
         endpoint = f"get-bot-status/{bot_name}"
-        return await self.get(endpoint, auth=self.auth)
+        return await self.get(endpoint, auth=self.auth, route="get-bot-status/{bot_name}")
 
     async def get_bot_history(self, bot_name: str):
         """Get the historical data of a bot."""
         endpoint = f"get-bot-history/{bot_name}"
-        return await self.get(endpoint, auth=self.auth)
+        return await self.get(endpoint, auth=self.auth, route="get-bot-history/{bot_name}")
 
     async def get_active_bots_status(self):
         """
@@ -124,7 +125,7 @@ class BackendAPIClient(ClientBase):
     async def get_available_images(self, image_name: str = "hummingbot"):
         """Get available images."""
         endpoint = f"available-images/{image_name}"
-        return await self.get(endpoint, auth=self.auth)["available_images"]
+        return await self.get(endpoint, auth=self.auth, route="available-images/{image_name}")["available_images"]
 
     async def add_script_config(self, script_config: dict):
         """Add a new script configuration."""
@@ -200,24 +201,26 @@ class BackendAPIClient(ClientBase):
     async def get_all_configs_from_bot(self, bot_name: str):
         """Get all configurations from a bot."""
         endpoint = f"all-controller-configs/bot/{bot_name}"
-        return await self.get(endpoint, auth=self.auth)
+        return await self.get(endpoint, auth=self.auth, route="all-controller-configs/bot/{bot_name}")
 
     async def stop_controller_from_bot(self, bot_name: str, controller_id: str):
         """Stop a controller from a bot."""
         endpoint = f"update-controller-config/bot/{bot_name}/{controller_id}"
         config = {"manual_kill_switch": True}
-        return await self.post(endpoint, payload=config, auth=self.auth)
+        return await self.post(endpoint, payload=config, auth=self.auth,
+                               route="update-controller-config/bot/{bot_name}/{controller_id}")
 
     async def start_controller_from_bot(self, bot_name: str, controller_id: str):
         """Start a controller from a bot."""
         endpoint = f"update-controller-config/bot/{bot_name}/{controller_id}"
         config = {"manual_kill_switch": False}
-        return await self.post(endpoint, payload=config, auth=self.auth)
+        return await self.post(endpoint, payload=config, auth=self.auth,
+                               route="update-controller-config/bot/{bot_name}/{controller_id}")
 
     async def get_connector_config_map(self, connector_name: str):
         """Get connector configuration map."""
         endpoint = f"connector-config-map/{connector_name}"
-        return await self.get(endpoint, auth=self.auth)
+        return await self.get(endpoint, auth=self.auth, route="connector-config-map/{connector_name}")
 
     async def get_all_connectors_config_map(self):
         """Get all connector configuration maps."""
@@ -237,12 +240,13 @@ class BackendAPIClient(ClientBase):
     async def delete_credential(self, account_name: str, connector_name: str):
         """Delete credentials."""
         endpoint = f"delete-credential/{account_name}/{connector_name}"
-        return await self.post(endpoint, auth=self.auth)
+        return await self.post(endpoint, auth=self.auth, route="delete-credential/{account_name}/{connector_name}")
 
     async def add_connector_keys(self, account_name: str, connector_name: str, connector_config: dict):
         """Add connector keys."""
         endpoint = f"add-connector-keys/{account_name}/{connector_name}"
-        return await self.post(endpoint, payload=connector_config, auth=self.auth)
+        return await self.post(endpoint, payload=connector_config, auth=self.auth,
+                               route="add-connector-keys/{account_name}/{connector_name}")
 
     async def get_accounts(self):
         """Get available credentials."""
@@ -252,7 +256,7 @@ class BackendAPIClient(ClientBase):
     async def get_credentials(self, account_name: str):
         """Get available credentials."""
         endpoint = f"list-credentials/{account_name}"
-        return await self.get(endpoint, auth=self.auth)
+        return await self.get(endpoint, auth=self.auth, route="list-credentials/{account_name}")
 
     async def get_accounts_state(self):
         """Get all balances."""
@@ -23,7 +23,7 @@ class GatewayClient(ClientBase):
         params = {
             "network": network,
         }
-        return await self.get(endpoint, params=params)
+        return await self.get(endpoint, params=params, route="{chain}/status")
 
     async def get_chain_tokens(
         self,
@@ -36,7 +36,7 @@ class GatewayClient(ClientBase):
         params = {"network": network}
         if tokenSymbols is not None:
             params["tokenSymbols"] = tokenSymbols
-        return await self.get(endpoint, params=params)
+        return await self.get(endpoint, params=params, route="{chain}/tokens")
 
     async def post_chain_balances(
         self,
@@ -53,7 +53,7 @@ class GatewayClient(ClientBase):
         }
         if address:
             body["address"] = address
-        return await self.post(endpoint, payload=body)
+        return await self.post(endpoint, payload=body, route="{chain}/balances")
     
     async def post_chain_poll(
         self,
@@ -67,5 +67,5 @@ class GatewayClient(ClientBase):
             "network": network,
             "txHash": txHash
         }
-        return await self.post(endpoint, payload=body)
+        return await self.post(endpoint, payload=body, route="{chain}/poll")
 
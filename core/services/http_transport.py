@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from core.instrumentation import MetricsRegistry, current_task, metrics
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, text: str, url: str):
+        super().__init__(f"HTTP {status} for {url}: {text[:200]}")
+        self.status = status
+        self.text = text
+        self.url = url
+
+
+@dataclass
+class HttpResponse:
+    """A fully read response, so the connection goes back to the pool before the caller processes it."""
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+    url: str
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HttpError(self.status, self.text(), self.url)
+
+
+class HttpTransport:
+    """
+    Keep-alive HTTP layer shared by the API clients and trades feeds.
+    Each event loop gets one aiohttp session whose connector pools connections per host and caches DNS lookups.
+    Requests have default timeouts (300s total like aiohttp, since backend calls such as creating an instance or
+    pulling an image are slow; pass `timeout` for tighter ones), retry connection errors and retryable statuses
+    with exponential backoff and full jitter (honouring Retry-After), and their latency is kept per task and
+    endpoint to report percentiles, which are also published as the http_latency_seconds gauges of the metrics
+    registry.
+    Non-idempotent methods are only retried when the caller passes retries explicitly.
+    HTTP/2 is not available: aiohttp only speaks HTTP/1.1, and pooled keep-alive connections already avoid the
+    per-request TCP and TLS setup.
+    """
+    def __init__(self, limit: int = 100, limit_per_host: int = 20, dns_cache_ttl: int = 300,
+                 keepalive_timeout: float = 30.0, total_timeout: float = 300.0, connect_timeout: float = 10.0,
+                 retries: int = 3, backoff_base: float = 0.25, backoff_max: float = 10.0, latency_window: int = 1000):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.latency_window = latency_window
+        # Sessions hold their loop, so they are keyed by id(loop) and those of closed loops are dropped on insert.
+        self._sessions: Dict[int, Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def session(self) -> aiohttp.ClientSession:
+        """Session of the running event loop, created on first use inside that loop."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(id(loop), (loop, None))[1]
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             ttl_dns_cache=self.dns_cache_ttl,
+                                             keepalive_timeout=self.keepalive_timeout)
+            session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            with self._lock:
+                for key, (other_loop, _) in list(self._sessions.items()):
+                    if other_loop.is_closed():
+                        del self._sessions[key]
+                self._sessions[id(loop)] = (loop, session)
+        return session
+
+    async def request(self, method: str, url: str, endpoint: Optional[str] = None, retries: Optional[int] = None,
+                      timeout: Optional[aiohttp.ClientTimeout] = None, **kwargs) -> HttpResponse:
+        """
+        Send a request and read its body. `endpoint` labels the latency stats and should be a route template
+        without ids or names, so the number of labels stays bounded; it defaults to host and path.
+        kwargs go to aiohttp (params, json, data, headers, auth).
+        """
+        method = method.upper()
+        if retries is None:
+            retries = self.retries if method in IDEMPOTENT_METHODS else 0
+        if endpoint is None:
+            parts = urlsplit(url)
+            endpoint = f"{parts.netloc}{parts.path}"
+        label = f"{method} {endpoint}"
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            retry_after = None
+            try:
+                async with self.session().request(method, url, timeout=timeout or self.timeout, **kwargs) as response:
+                    body = await response.read()
+                    result = HttpResponse(response.status, response.headers.copy(), body, str(response.url))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                self.record_latency(label, time.perf_counter() - start)
+                if attempt == retries:
+                    raise
+                logger.debug(f"{label} failed ({type(e).__name__}: {e}), retrying")
+            else:
+                self.record_latency(label, time.perf_counter() - start)
+                if result.status not in RETRY_STATUSES or attempt == retries:
+                    return result
+                retry_after = result.headers.get("Retry-After")
+            metrics.count("http_retries", endpoint=label)
+            await asyncio.sleep(self.backoff(attempt, retry_after))
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def record_latency(self, label: str, seconds: float):
+        key = (current_task.get() or "none", label)
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self.latency_window)).append(seconds)
+
+    def latency_percentiles(self, percentiles: Sequence[float] = (50, 90, 99)
+                            ) -> Dict[Tuple[str, str], Dict[str, float]]:
+        """Latency percentiles in seconds of the last `latency_window` requests, by task and endpoint."""
+        with self._lock:
+            samples = {key: sorted(latencies) for key, latencies in self._latencies.items()}
+        report = {}
+        for key, latencies in samples.items():
+            report[key] = {"count": len(latencies)}
+            for percentile in percentiles:
+                index = min(len(latencies) - 1, int(round(percentile / 100 * (len(latencies) - 1))))
+                report[key][f"p{percentile:g}"] = latencies[index]
+        return report
+
+    def publish_latency(self, registry: MetricsRegistry):
+        for (task, label), stats in self.latency_percentiles().items():
+            for key, value in stats.items():
+                if key != "count":
+                    registry.set_gauge("http_latency_seconds", value, task=task, endpoint=label,
+                                       quantile=str(float(key[1:]) / 100))
+
+    def log_latency_report(self):
+        for (task, label), stats in sorted(self.latency_percentiles().items()):
+            values = ", ".join(f"{key}={value * 1000:.1f}ms" for key, value in stats.items() if key != "count")
+            logger.info(f"[{task}] {label}: {stats['count']} requests, {values}")
+
+    async def close(self):
+        """Close the session of the running event loop."""
+        with self._lock:
+            _, session = self._sessions.pop(id(asyncio.get_running_loop()), (None, None))
+        if session is not None and not session.closed:
+            await session.close()
+
+
+_transport: Optional[HttpTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Process-wide transport, so every client shares the same connection pools."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport()
+            metrics.register_collector(_transport.publish_latency)
+    return _transport
+
+
+async def close_transport():
+    """Close the session the shared transport opened in the running loop, if any. Call before the loop ends."""
+    if _transport is not None:
+        await _transport.close()
@@ -25,12 +25,12 @@ class LarpClient(ClientBase):
         """Retrieve info about a Solana token by address."""
         endpoint = f"solana/token/{token_address}"
         params = {"useApi": use_api}
-        return await self.get(endpoint, params=params)
+        return await self.get(endpoint, params=params, route="solana/token/{token_address}")
 
     async def get_token_by_symbol(self, symbol: str):
         """Retrieve info about a Solana token by symbol from the stored token list."""
         endpoint = f"solana/symbol/{symbol}"
-        return await self.get(endpoint)
+        return await self.get(endpoint, route="solana/symbol/{symbol}")
 
     # Jupiter endpoints
     async def get_jupiter_quote_swap(self, input_token_symbol: str, output_token_symbol: str, amount: float,
@@ -76,17 +76,17 @@ class LarpClient(ClientBase):
     async def get_orca_position(self, position_address: str):
         """Retrieve info about an Orca position."""
         endpoint = f"orca/position/{position_address}"
-        return await self.get(endpoint)
+        return await self.get(endpoint, route="orca/position/{position_address}")
 
     async def get_orca_quote_fees(self, position_address: str):
         """Get the fees quote for an Orca position."""
         endpoint = f"orca/quote-fees/{position_address}"
-        return await self.get(endpoint)
+        return await self.get(endpoint, route="orca/quote-fees/{position_address}")
 
     async def get_pool_info(self, pool_address: str):
         """Retrieve info about a pool."""
         endpoint = f"orca/pool/{pool_address}"
-        return await self.get(endpoint)
+        return await self.get(endpoint, route="orca/pool/{pool_address}")
 
     async def get_orca_quote_swap(self, input_token_symbol: str, output_token_symbol: str, amount: float,
                                   slippage_pct: float = 1, tick_spacing: int = 64):
@@ -169,17 +169,17 @@ class LarpClient(ClientBase):
     async def collect_orca_fees(self, position_address: str):
         """Collect fees for an Orca position."""
         endpoint = f"orca/collect-fees/{position_address}"
-        return await self.post(endpoint)
+        return await self.post(endpoint, route="orca/collect-fees/{position_address}")
 
     async def get_orca_positions_in_bundle(self, position_bundle_address: str):
         """Retrieve info about all positions in an Orca position bundle."""
         endpoint = f"orca/positions-in-bundle/{position_bundle_address}"
-        return await self.get(endpoint)
+        return await self.get(endpoint, route="orca/positions-in-bundle/{position_bundle_address}")
 
     async def collect_orca_fee_rewards(self, position_address: str):
         """Collect fees and rewards for an Orca position."""
         endpoint = f"orca/collect-fee-rewards/{position_address}"
-        return await self.post(endpoint)
+        return await self.post(endpoint, route="orca/collect-fee-rewards/{position_address}")
 
     async def create_orca_position_bundle(self):
         """Create a new Orca position bundle."""
@@ -1,11 +1,15 @@
 import math
-from typing import List, Optional, Dict, Any, Union
+from typing import AsyncIterator, List, Optional, Dict, Any, Sequence, Set, Tuple, Union
 import pandas as pd
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 from datetime import datetime, timedelta
 
+from core.instrumentation import instrument
 
+
+@instrument("db")
 class MongoClient:
     def __init__(
             self,
@@ -14,6 +18,7 @@ class MongoClient:
     ):
         self.client = None
         self.db = None
+        self._created_indexes: Set[Tuple[str, str, Tuple]] = set()
 
         # Connection parameters with env fallbacks
         self.uri = uri
@@ -62,6 +67,16 @@ class MongoClient:
         await db[collection_name].drop()
         logging.info(f"Collection {collection_name} deleted from {db_name or self.db.name}.")
 
+    async def _ensure_index(self, db, collection_name: str, index: List):
+        """Create an index once per collection and process, skipping the round trip on later calls."""
+        if not index:
+            return
+        key = (db.name, collection_name, tuple(tuple(item) if isinstance(item, list) else item for item in index))
+        if key in self._created_indexes:
+            return
+        await db[collection_name].create_index(index)
+        self._created_indexes.add(key)
+
     async def insert_documents(self, collection_name: str, documents: Union[Dict[str, Any], List[Dict[str, Any]]],
                                db_name: Optional[str] = None, index: List[str] = []):
         """Insert one or multiple documents into a specified collection."""
@@ -70,27 +85,69 @@ class MongoClient:
 
         if isinstance(documents, dict):
             documents = [documents]
+        if not documents:
+            return
 
         try:
-            if index:
-                await collection.create_index(index)
-            result = await collection.insert_many(documents)
+            await self._ensure_index(db, collection_name, index)
+            result = await collection.insert_many(documents, ordered=False)
             logging.info(f"Inserted {len(result.inserted_ids)} documents into {collection_name}.")
         except Exception as e:
             logging.error(f"Error inserting documents into {collection_name}: {str(e)}")
             raise
 
-    async def get_documents(self, collection_name: str, query: Dict[str, Any] = None, db_name: Optional[str] = None,
-                            limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Retrieve documents from a collection with an optional query."""
+    async def upsert_documents(self, collection_name: str, documents: Union[Dict[str, Any], List[Dict[str, Any]]],
+                               key_fields: Sequence[str], db_name: Optional[str] = None, index: List = []):
+        """
+        Upsert documents with a single unordered bulk write.
+        :param collection_name: target collection.
+        :param documents: documents to write; each one must contain all the key fields.
+        :param key_fields: fields that identify a document, used as the upsert filter.
+        :param db_name: optional database, defaults to the client database.
+        :param index: optional index created once per collection, usually matching the key fields.
+        :return: the pymongo BulkWriteResult or None when there is nothing to write.
+        """
         db = self.client[db_name] if db_name else self.db
         collection = db[collection_name]
-        query = query or {}
 
+        if isinstance(documents, dict):
+            documents = [documents]
+        if not documents:
+            return None
+
+        operations = [
+            UpdateOne({field: document[field] for field in key_fields}, {"$set": document}, upsert=True)
+            for document in documents
+        ]
         try:
-            cursor = collection.find(query).sort("timestamp", -1)
-            if limit:
-                cursor = cursor.limit(limit)
+            await self._ensure_index(db, collection_name, index)
+            result = await collection.bulk_write(operations, ordered=False)
+            logging.info(f"Upserted {result.upserted_count} and modified {result.modified_count} documents "
+                          f"in {collection_name}.")
+            return result
+        except Exception as e:
+            logging.error(f"Error upserting documents into {collection_name}: {str(e)}")
+            raise
+
+    def _find(self, collection_name: str, query: Optional[Dict[str, Any]], db_name: Optional[str],
+              projection: Optional[Dict[str, Any]], sort: Optional[List[Tuple[str, int]]], limit: Optional[int],
+              batch_size: Optional[int] = None):
+        db = self.client[db_name] if db_name else self.db
+        cursor = db[collection_name].find(query or {}, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+        return cursor
+
+    async def get_documents(self, collection_name: str, query: Dict[str, Any] = None, db_name: Optional[str] = None,
+                            limit: Optional[int] = None, projection: Optional[Dict[str, Any]] = None,
+                            sort: Optional[List[Tuple[str, int]]] = [("timestamp", -1)]) -> List[Dict[str, Any]]:
+        """Retrieve documents from a collection with an optional query, projection and sort (None to skip)."""
+        try:
+            cursor = self._find(collection_name, query, db_name, projection, sort, limit)
             documents = await cursor.to_list(length=None)
             logging.info(f"Retrieved {len(documents)} documents from {collection_name}.")
             return documents
@@ -98,6 +155,41 @@ class MongoClient:
             logging.error(f"Error retrieving documents from {collection_name}: {str(e)}")
             raise
 
+    async def get_latest_value(self, collection_name: str, field: str = "timestamp",
+                               query: Dict[str, Any] = None, db_name: Optional[str] = None) -> Optional[Any]:
+        """Return the max value of a field using the index instead of loading the collection."""
+        documents = await self.get_documents(collection_name, query=query, db_name=db_name, limit=1,
+                                             projection={"_id": 0, field: 1}, sort=[(field, -1)])
+        return documents[0].get(field) if documents else None
+
+    async def iter_dataframes(self, collection_name: str, query: Dict[str, Any] = None, db_name: Optional[str] = None,
+                              projection: Optional[Dict[str, Any]] = None, batch_size: int = 10000,
+                              sort: Optional[List[Tuple[str, int]]] = None) -> AsyncIterator[pd.DataFrame]:
+        """
+        Stream a query result as DataFrames of at most batch_size rows, keeping only one batch in memory.
+        :param collection_name: source collection.
+        :param query: filter pushed down to MongoDB.
+        :param db_name: optional database, defaults to the client database.
+        :param projection: fields to fetch, pushed down to MongoDB.
+        :param batch_size: rows per yielded DataFrame and cursor batch size.
+        :param sort: optional sort specification, unsorted by default.
+        """
+        cursor = self._find(collection_name, query, db_name, projection, sort, limit=None, batch_size=batch_size)
+        total = 0
+        try:
+            while True:
+                documents = await cursor.to_list(length=batch_size)
+                if not documents:
+                    break
+                total += len(documents)
+                yield pd.DataFrame(documents)
+        except Exception as e:
+            logging.error(f"Error streaming documents from {collection_name}: {str(e)}")
+            raise
+        finally:
+            await cursor.close()
+        logging.info(f"Streamed {total} documents from {collection_name}.")
+
     async def delete_documents(self, collection_name: str, query: Dict[str, Any], db_name: Optional[str] = None):
         """Delete documents matching a query from a collection."""
         db = self.client[db_name] if db_name else self.db
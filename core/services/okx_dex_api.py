@@ -2,8 +2,9 @@ import base64
 import hmac
 import json
 from datetime import datetime
-import aiohttp
-from typing import Optional, Dict, List, Union
+import time
+from collections import deque
+from typing import Optional, Dict, List, Tuple, Union
 import urllib.parse
 from pydantic import BaseModel, Field
 from decimal import Decimal
@@ -11,11 +12,15 @@ from base58 import b58decode, b58encode
 from solders.hash import Hash
 from solders.keypair import Keypair
 from solders.message import MessageV0
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus
 from solders.transaction import VersionedTransaction
 from solana.rpc.async_api import AsyncClient
 from solana.rpc.types import TxOpts
 import asyncio
 
+from core.services.http_transport import HttpTransport, get_transport
+
 
 class Chain(BaseModel):
     chain_id: str = Field(..., alias="chainId")
@@ -228,6 +233,35 @@ class TransactionOrder(BaseModel):
 class TransactionOrdersResponse(OKXResponse):
     data: List[TransactionOrder]
 
+class RateLimiter:
+    """Sliding window limiter: at most `limit` acquisitions in any `interval` seconds."""
+    def __init__(self, limit: int, interval: float = 1.0):
+        self.limit = limit
+        self.interval = interval
+        self._timestamps = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._timestamps and self._timestamps[0] <= now - self.interval:
+                    self._timestamps.popleft()
+                if len(self._timestamps) < self.limit:
+                    self._timestamps.append(now)
+                    return
+                await asyncio.sleep(self._timestamps[0] + self.interval - now)
+
+
+COMMITMENT_LEVELS = {
+    "processed": TransactionConfirmationStatus.Processed,
+    "confirmed": TransactionConfirmationStatus.Confirmed,
+    "finalized": TransactionConfirmationStatus.Finalized,
+}
+COMMITMENT_ORDER = [TransactionConfirmationStatus.Processed, TransactionConfirmationStatus.Confirmed,
+                    TransactionConfirmationStatus.Finalized]
+
+
 class OKXDexAPI:
     """
     OKX DEX API client implementing REST authentication
@@ -253,6 +287,9 @@ class OKXDexAPI:
         solana_private_key: Optional[str] = None,
         base_url: str = "https://www.okx.com",
         solana_rpc_url: Optional[str] = None,
+        transport: Optional[HttpTransport] = None,
+        quote_rate_limit: int = 3,
+        quote_cache_ttl: float = 2.0,
     ):
         """
         Initialize the OKX DEX API client
@@ -263,6 +300,9 @@ class OKXDexAPI:
             passphrase: The passphrase specified when creating API key
             solana_private_key: Optional Solana private key
             base_url: Base API URL, defaults to production
+            transport: Optional HTTP transport, defaults to the shared keep-alive one
+            quote_rate_limit: Maximum quote requests per second sent to OKX
+            quote_cache_ttl: Seconds a quote is served from cache, 0 to disable caching
         """
         self.api_key = api_key
         self.secret_key = secret_key.encode()
@@ -274,6 +314,11 @@ class OKXDexAPI:
         self.chains: List[Chain] = []
         self.solana_client = AsyncClient(solana_rpc_url or self.SOLANA_RPC_URL)
         self.solana_private_key = solana_private_key
+        self.transport = transport or get_transport()
+        self.quote_limiter = RateLimiter(quote_rate_limit)
+        self.quote_cache_ttl = quote_cache_ttl
+        self._quote_cache: Dict[Tuple, Tuple[float, QuoteResponse]] = {}
+        self._quotes_in_flight: Dict[Tuple, asyncio.Future] = {}
 
 
     def _generate_signature(
@@ -361,20 +406,19 @@ class OKXDexAPI:
         url = f"{self.base_url}{request_path}"
         headers = self._get_headers("GET", request_path)
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        print(f"Error: {response.status} - {await response.text()}")
-                        return {
-                            "status": response.status,
-                            "error": await response.text()
-                        }
-            except Exception as e:
-                print(f"Request failed: {str(e)}")
-                return {"error": str(e)}
+        try:
+            response = await self.transport.request("GET", url, endpoint=f"okx/{path}", headers=headers)
+            if response.status == 200:
+                return response.json()
+            else:
+                print(f"Error: {response.status} - {response.text()}")
+                return {
+                    "status": response.status,
+                    "error": response.text()
+                }
+        except Exception as e:
+            print(f"Request failed: {str(e)}")
+            return {"error": str(e)}
 
     async def post(
         self,
@@ -398,20 +442,19 @@ class OKXDexAPI:
         body = json.dumps(data)
         headers = self._get_headers("POST", request_path, body)
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        print(f"Error: {response.status} - {await response.text()}")
-                        return {
-                            "status": response.status,
-                            "error": await response.text()
-                        }
-            except Exception as e:
-                print(f"Request failed: {str(e)}")
-                return {"error": str(e)}
+        try:
+            response = await self.transport.request("POST", url, endpoint=f"okx/{path}", headers=headers, data=body)
+            if response.status == 200:
+                return response.json()
+            else:
+                print(f"Error: {response.status} - {response.text()}")
+                return {
+                    "status": response.status,
+                    "error": response.text()
+                }
+        except Exception as e:
+            print(f"Request failed: {str(e)}")
+            return {"error": str(e)}
 
     async def get_supported_chains(self) -> ChainsResponse:
         """
@@ -491,7 +534,8 @@ class OKXDexAPI:
         fee_percent: Optional[str] = None
     ) -> QuoteResponse:
         """
-        Get quote for token swap
+        Get quote for token swap. Identical quotes requested while one is in flight share its request, and
+        successful quotes are served from cache for quote_cache_ttl seconds.
         
         Args:
             chain_id: Chain ID (e.g., "1" for Ethereum)
@@ -516,8 +560,44 @@ class OKXDexAPI:
         }
         if fee_percent:
             params["feePercent"] = fee_percent
-        response = await self.get(self.GET_QUOTE, params)
-        return QuoteResponse(**response)
+
+        key = tuple(sorted(params.items()))
+        cached = self._quote_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.quote_cache_ttl:
+            return cached[1]
+        in_flight = self._quotes_in_flight.get(key)
+        if in_flight is None:
+            in_flight = asyncio.ensure_future(self._fetch_quote(key, params))
+            self._quotes_in_flight[key] = in_flight
+            in_flight.add_done_callback(lambda _: self._quotes_in_flight.pop(key, None))
+        return await asyncio.shield(in_flight)
+
+    async def _fetch_quote(self, key: Tuple, params: Dict) -> QuoteResponse:
+        await self.quote_limiter.acquire()
+        quote = QuoteResponse(**await self.get(self.GET_QUOTE, params))
+        if self.quote_cache_ttl > 0 and quote.code == "0":
+            # Expired quotes are dropped on insert, so the cache only holds quotes younger than the TTL
+            self._evict_expired_quotes()
+            self._quote_cache[key] = (time.monotonic(), quote)
+        return quote
+
+    async def get_quotes(self, quote_requests: List[Dict]) -> List[Union[QuoteResponse, Exception]]:
+        """
+        Fetch many quotes concurrently under the quote rate limit.
+
+        Args:
+            quote_requests: get_quote keyword arguments, one dict per quote (e.g. several tokens and trade sizes)
+
+        Returns:
+            The quotes in request order, or the exception raised for a quote that failed
+        """
+        return await asyncio.gather(*[self.get_quote(**quote_request) for quote_request in quote_requests],
+                                    return_exceptions=True)
+
+    def _evict_expired_quotes(self):
+        now = time.monotonic()
+        self._quote_cache = {key: value for key, value in self._quote_cache.items()
+                             if now - value[0] < self.quote_cache_ttl}
 
     async def swap(
         self,
@@ -568,9 +648,24 @@ class OKXDexAPI:
         wallet_address: str,
         private_key: Optional[str] = None,
         poll_for_confirmation: bool = False,
-        poll_sleep_seconds: Optional[float] = None
+        poll_sleep_seconds: Optional[float] = None,
+        poll_timeout: float = 60.0
     ) -> str:
-        """Execute a Solana swap transaction following Solders documentation"""
+        """
+        Execute a Solana swap transaction following Solders documentation
+
+        Args:
+            poll_for_confirmation: Wait until the transaction is confirmed before returning
+            poll_sleep_seconds: Delay before the first status check, growing exponentially between checks
+            poll_timeout: Seconds to wait for the confirmation
+
+        Returns:
+            The transaction signature
+
+        Raises:
+            ValueError: If the transaction can't be built or sent. When polling, also if it fails on chain or is
+                not confirmed within poll_timeout seconds
+        """
         # Verify private key
         private_key = private_key or self.solana_private_key
         if not private_key:
@@ -621,19 +716,65 @@ class OKXDexAPI:
                 opts=opts
             )
             if poll_for_confirmation:
-                await self.poll_for_confirmation(result.value, poll_sleep_seconds)
+                await self.poll_for_confirmation(result.value, poll_sleep_seconds, poll_timeout)
             
             return result.value
 
         except Exception as e:
             raise ValueError(f"Transaction failed: {e}")
         
-    async def poll_for_confirmation(self, tx_sig: str, sleep_seconds: float = 0.5):
-        await self.solana_client.confirm_transaction(
-            tx_sig=tx_sig,
-            commitment="confirmed",
-            sleep_seconds=sleep_seconds
-        )
+    async def poll_for_confirmation(self, tx_sig: Union[str, Signature], sleep_seconds: Optional[float] = 0.5,
+                                    timeout: float = 60.0):
+        """Wait for one transaction. Raises ValueError if it fails on chain or is not confirmed within timeout."""
+        status = (await self.confirm_signatures([tx_sig], timeout=timeout,
+                                                initial_delay=sleep_seconds or 0.5))[str(tx_sig)]
+        if status != "confirmed":
+            raise ValueError(f"Transaction {tx_sig} {status}")
+
+    async def confirm_signatures(
+        self,
+        signatures: List[Union[str, Signature]],
+        commitment: str = "confirmed",
+        timeout: float = 60.0,
+        initial_delay: float = 0.5,
+        max_delay: float = 8.0,
+        backoff_factor: float = 2.0
+    ) -> Dict[str, str]:
+        """
+        Wait for many transactions at once: every round checks all pending signatures with one
+        getSignatureStatuses call, and the delay between rounds grows exponentially up to max_delay.
+
+        Returns:
+            Status of each signature: "confirmed" once it reaches the commitment, "failed" or "timeout"
+        """
+        target = COMMITMENT_ORDER.index(COMMITMENT_LEVELS[commitment])
+        pending = {str(signature): signature if isinstance(signature, Signature) else Signature.from_string(signature)
+                   for signature in signatures}
+        results = {}
+        deadline = time.monotonic() + timeout
+        delay = initial_delay
+        while pending:
+            await asyncio.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+            names = list(pending)
+            # getSignatureStatuses accepts up to 256 signatures per call
+            for start in range(0, len(names), 256):
+                batch = names[start:start + 256]
+                response = await self.solana_client.get_signature_statuses([pending[name] for name in batch])
+                for name, status in zip(batch, response.value):
+                    if status is None:
+                        continue
+                    if status.err is not None:
+                        results[name] = "failed"
+                        del pending[name]
+                    elif status.confirmation_status is not None and \
+                            COMMITMENT_ORDER.index(status.confirmation_status) >= target:
+                        results[name] = "confirmed"
+                        del pending[name]
+            if pending and time.monotonic() >= deadline:
+                results.update({name: "timeout" for name in pending})
+                break
+            delay = min(delay * backoff_factor, max_delay)
+        return results
 
     async def broadcast_transaction(
         self,
@@ -1,12 +1,15 @@
 import asyncio
+import logging
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Union, Any
 
 import asyncpg
+import numpy as np
 import pandas as pd
 
 from core.data_structures.candles import Candles
+from core.instrumentation import instrument, metrics
 
 INTERVAL_MAPPING = {
     '1s': 's',  # seconds
@@ -25,16 +28,45 @@ INTERVAL_MAPPING = {
     '1w': 'W'  # weeks
 }
 
+INTERVAL_SECONDS = {
+    '1s': 1,
+    '1m': 60,
+    '3m': 3 * 60,
+    '5m': 5 * 60,
+    '15m': 15 * 60,
+    '30m': 30 * 60,
+    '1h': 60 * 60,
+    '2h': 2 * 60 * 60,
+    '4h': 4 * 60 * 60,
+    '6h': 6 * 60 * 60,
+    '12h': 12 * 60 * 60,
+    '1d': 24 * 60 * 60,
+    '3d': 3 * 24 * 60 * 60,
+    '1w': 7 * 24 * 60 * 60
+}
+
+CANDLES_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume", "quote_asset_volume", "n_trades",
+                   "taker_buy_base_volume", "taker_buy_quote_volume"]
+
 
+@instrument("db")
 class TimescaleClient:
     def __init__(self, host: str = "localhost", port: int = 5432,
-                 user: str = "admin", password: str = "admin", database: str = "timescaledb"):
+                 user: str = "admin", password: str = "admin", database: str = "timescaledb",
+                 consolidated: bool = False):
+        """
+        :param consolidated: store every pair and interval in the shared market_candles/market_trades hypertables
+        instead of one table per pair and interval. Discovery then goes through the market_data_catalog table.
+        """
         self.host = host
         self.port = port
         self.user = user
         self.password = password
         self.database = database
+        self.consolidated = consolidated
         self.pool = None
+        self._hypertables = set()
+        self._catalog_ready = False
 
     async def connect(self):
         self.pool = await asyncpg.create_pool(
@@ -53,6 +85,42 @@ class TimescaleClient:
     def get_ohlc_table_name(connector_name: str, trading_pair: str, interval: str) -> str:
         return f"{connector_name}_{trading_pair.lower().replace('-', '_')}_{interval}"
 
+    @property
+    def candles_table_name(self):
+        return "market_candles"
+
+    @property
+    def trades_table_name(self):
+        return "market_trades"
+
+    @property
+    def catalog_table_name(self):
+        return "market_data_catalog"
+
+    def resolve_trades_table(self, connector_name: str, trading_pair: str) -> str:
+        return self.trades_table_name if self.consolidated else self.get_trades_table_name(connector_name, trading_pair)
+
+    def resolve_candles_table(self, connector_name: str, trading_pair: str, interval: str) -> str:
+        if self.consolidated:
+            return self.candles_table_name
+        return self.get_ohlc_table_name(connector_name, trading_pair, interval)
+
+    def candles_keys(self, connector_name: str, trading_pair: str, interval: str) -> Dict[str, str]:
+        """Columns identifying a candles series, empty in the per-pair layout where the table name does it."""
+        if not self.consolidated:
+            return {}
+        return {"connector_name": connector_name, "trading_pair": trading_pair, "candle_interval": interval}
+
+    @staticmethod
+    def trades_keys(connector_name: str, trading_pair: str) -> Dict[str, str]:
+        return {"connector_name": connector_name, "trading_pair": trading_pair}
+
+    @staticmethod
+    def keys_filter(keys: Dict[str, Any], first_param: int) -> Tuple[str, List[Any]]:
+        """Build an ' AND column = $n' fragment for the given keys, numbering parameters from first_param."""
+        clause = "".join(f" AND {column} = ${first_param + i}" for i, column in enumerate(keys))
+        return clause, list(keys.values())
+
     @property
     def metrics_table_name(self):
         return "summary_metrics"
@@ -61,23 +129,76 @@ class TimescaleClient:
     def screener_table_name(self):
         return "screener_metrics"
 
-    async def create_candles_table(self, table_name: str):
+    @property
+    def screener_state_table_name(self):
+        return "screener_state"
+
+    async def create_candles_table(self, table_name: str, chunk_time_interval: timedelta = timedelta(days=7)):
+        if self.consolidated:
+            await self.create_consolidated_candles_table(chunk_time_interval)
+            return
         async with self.pool.acquire() as conn:
             await conn.execute(f'''
                 CREATE TABLE IF NOT EXISTS {table_name} (
                     timestamp TIMESTAMPTZ NOT NULL,
-                    open NUMERIC NOT NULL,
-                    high NUMERIC NOT NULL,
-                    low NUMERIC NOT NULL,
-                    close NUMERIC NOT NULL,
-                    volume NUMERIC NOT NULL,
-                    quote_asset_volume NUMERIC NOT NULL,
+                    open DOUBLE PRECISION NOT NULL,
+                    high DOUBLE PRECISION NOT NULL,
+                    low DOUBLE PRECISION NOT NULL,
+                    close DOUBLE PRECISION NOT NULL,
+                    volume DOUBLE PRECISION NOT NULL,
+                    quote_asset_volume DOUBLE PRECISION NOT NULL,
                     n_trades INTEGER NOT NULL,
-                    taker_buy_base_volume NUMERIC NOT NULL,
-                    taker_buy_quote_volume NUMERIC NOT NULL,
+                    taker_buy_base_volume DOUBLE PRECISION NOT NULL,
+                    taker_buy_quote_volume DOUBLE PRECISION NOT NULL,
                     PRIMARY KEY (timestamp)
                 )
             ''')
+        if not await self.is_hypertable(table_name):
+            await self.migrate_candles_table(table_name, chunk_time_interval)
+
+    async def create_consolidated_candles_table(self, chunk_time_interval: timedelta = timedelta(days=7)):
+        if self.candles_table_name in self._hypertables:
+            return
+        async with self.pool.acquire() as conn:
+            await conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {self.candles_table_name} (
+                    connector_name TEXT NOT NULL,
+                    trading_pair TEXT NOT NULL,
+                    candle_interval TEXT NOT NULL,
+                    timestamp TIMESTAMPTZ NOT NULL,
+                    open DOUBLE PRECISION NOT NULL,
+                    high DOUBLE PRECISION NOT NULL,
+                    low DOUBLE PRECISION NOT NULL,
+                    close DOUBLE PRECISION NOT NULL,
+                    volume DOUBLE PRECISION NOT NULL,
+                    quote_asset_volume DOUBLE PRECISION,
+                    n_trades INTEGER,
+                    taker_buy_base_volume DOUBLE PRECISION,
+                    taker_buy_quote_volume DOUBLE PRECISION,
+                    PRIMARY KEY (connector_name, trading_pair, candle_interval, timestamp)
+                )
+            ''')
+        await self.ensure_hypertable(self.candles_table_name, chunk_time_interval,
+                                     segment_by=["connector_name", "trading_pair", "candle_interval"])
+
+    async def create_catalog_table(self):
+        if self._catalog_ready:
+            return
+        async with self.pool.acquire() as conn:
+            await conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {self.catalog_table_name} (
+                    data_type TEXT NOT NULL,
+                    connector_name TEXT NOT NULL,
+                    trading_pair TEXT NOT NULL,
+                    candle_interval TEXT NOT NULL DEFAULT '',
+                    start_time TIMESTAMPTZ,
+                    end_time TIMESTAMPTZ,
+                    row_count BIGINT NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (data_type, connector_name, trading_pair, candle_interval)
+                );
+            ''')
+        self._catalog_ready = True
 
     async def create_screener_table(self):
         async with self.pool.acquire() as conn:
@@ -99,6 +220,55 @@ class TimescaleClient:
                 );
             ''')
 
+    async def create_screener_state_table(self):
+        async with self.pool.acquire() as conn:
+            await conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {self.screener_state_table_name} (
+                    connector_name TEXT NOT NULL,
+                    trading_pair TEXT NOT NULL,
+                    state_key TEXT NOT NULL,
+                    last_timestamp DOUBLE PRECISION NOT NULL,
+                    state BYTEA NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (connector_name, trading_pair, state_key)
+                );
+            ''')
+
+    async def get_screener_states(self, connector_name: str,
+                                  trading_pairs: List[str]) -> Dict[Tuple[str, str], Tuple[float, bytes]]:
+        """Return the persisted screener snapshots as {(trading_pair, state_key): (last_timestamp, state)}."""
+        await self.create_screener_state_table()
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(f'''
+                SELECT trading_pair, state_key, last_timestamp, state
+                FROM {self.screener_state_table_name}
+                WHERE connector_name = $1 AND trading_pair = ANY($2::TEXT[])
+            ''', connector_name, list(trading_pairs))
+        return {(row["trading_pair"], row["state_key"]): (row["last_timestamp"], row["state"]) for row in rows}
+
+    async def upsert_screener_states(self, states: List[Tuple[str, str, str, float, bytes]]):
+        """Upsert (connector_name, trading_pair, state_key, last_timestamp, state) snapshots in one statement."""
+        if not states:
+            return
+        await self.create_screener_state_table()
+        connector_names, trading_pairs, state_keys, last_timestamps, blobs = (list(column) for column in zip(*states))
+        async with self.pool.acquire() as conn:
+            await conn.execute(f'''
+                INSERT INTO {self.screener_state_table_name}
+                    (connector_name, trading_pair, state_key, last_timestamp, state, updated_at)
+                SELECT *, NOW() FROM unnest($1::TEXT[], $2::TEXT[], $3::TEXT[], $4::DOUBLE PRECISION[], $5::BYTEA[])
+                ON CONFLICT (connector_name, trading_pair, state_key) DO UPDATE SET
+                    last_timestamp = EXCLUDED.last_timestamp,
+                    state = EXCLUDED.state,
+                    updated_at = NOW()
+            ''', connector_names, trading_pairs, state_keys, last_timestamps, blobs)
+
+    async def delete_screener_states(self, connector_name: Optional[str] = None):
+        await self.create_screener_state_table()
+        async with self.pool.acquire() as conn:
+            await conn.execute(f"DELETE FROM {self.screener_state_table_name} WHERE $1::TEXT IS NULL OR connector_name = $1",
+                               connector_name)
+
     async def create_metrics_table(self):
         async with self.pool.acquire() as conn:
             await conn.execute(f'''
@@ -116,48 +286,147 @@ class TimescaleClient:
                 );
             ''')
 
-    async def create_trades_table(self, table_name: str):
+    async def create_trades_table(self, table_name: str, chunk_time_interval: timedelta = timedelta(days=1)):
+        if table_name in self._hypertables:
+            return
         async with self.pool.acquire() as conn:
             await conn.execute(f'''
                 CREATE TABLE IF NOT EXISTS {table_name} (
-                    id SERIAL PRIMARY KEY,
                     trade_id BIGINT NOT NULL,
                     connector_name TEXT NOT NULL,
                     trading_pair TEXT NOT NULL,
                     timestamp TIMESTAMPTZ NOT NULL,
-                    price NUMERIC NOT NULL,
-                    volume NUMERIC NOT NULL,
+                    price DOUBLE PRECISION NOT NULL,
+                    volume DOUBLE PRECISION NOT NULL,
                     sell_taker BOOLEAN NOT NULL,
-                    UNIQUE (connector_name, trading_pair, trade_id)
+                    UNIQUE (connector_name, trading_pair, trade_id, timestamp)
                 );
             ''')
+        if table_name == self.trades_table_name:
+            await self.ensure_hypertable(table_name, chunk_time_interval, segment_by=["connector_name", "trading_pair"])
+        elif not await self.is_hypertable(table_name):
+            await self.migrate_trades_table(table_name, chunk_time_interval)
+
+    async def ensure_hypertable(self, table_name: str, chunk_time_interval: timedelta,
+                                compress_after: Optional[timedelta] = None, segment_by: Optional[List[str]] = None):
+        """
+        Convert a table partitioned by timestamp into a hypertable with a compression policy. The result is cached
+        so the per-append create_*_table calls don't hit the catalog again.
+        """
+        if await self.is_hypertable(table_name):
+            return
+        compress_after = compress_after or 2 * chunk_time_interval
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("SELECT create_hypertable($1::regclass, 'timestamp', "
+                                   "chunk_time_interval => $2::interval, if_not_exists => TRUE, migrate_data => TRUE)",
+                                   table_name, chunk_time_interval)
+                segment_by_option = f", timescaledb.compress_segmentby = '{', '.join(segment_by)}'" if segment_by else ""
+                await conn.execute(f"ALTER TABLE {table_name} SET (timescaledb.compress, "
+                                   f"timescaledb.compress_orderby = 'timestamp'{segment_by_option})")
+                await conn.execute("SELECT add_compression_policy($1::regclass, $2::interval, if_not_exists => TRUE)",
+                                   table_name, compress_after)
+        self._hypertables.add(table_name)
+
+    async def is_hypertable(self, table_name: str) -> bool:
+        if table_name in self._hypertables:
+            return True
+        async with self.pool.acquire() as conn:
+            result = await conn.fetchval('''
+                SELECT EXISTS (SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = $1)
+            ''', table_name)
+        if result:
+            self._hypertables.add(table_name)
+        return result
+
+    async def migrate_candles_table(self, table_name: str, chunk_time_interval: timedelta = timedelta(days=7)):
+        """
+        Migrate a legacy NUMERIC candles or OHLC table to DOUBLE PRECISION columns and a hypertable. Called by
+        create_candles_table on first use, so existing databases are upgraded in place.
+        """
+        async with self.pool.acquire() as conn:
+            columns = await conn.fetch('''
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = $1 AND data_type = 'numeric'
+            ''', table_name)
+            if columns:
+                alter_columns = ", ".join(f"ALTER COLUMN {row['column_name']} TYPE DOUBLE PRECISION" for row in columns)
+                await conn.execute(f"ALTER TABLE {table_name} {alter_columns}")
+        await self.ensure_hypertable(table_name, chunk_time_interval)
+
+    async def migrate_trades_table(self, table_name: str, chunk_time_interval: timedelta = timedelta(days=1)):
+        """
+        Migrate a legacy trades table: NUMERIC columns become DOUBLE PRECISION, the serial id is dropped and the
+        unique key gains the timestamp, which hypertables require on every unique index.
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(f'''
+                    ALTER TABLE {table_name}
+                        DROP COLUMN IF EXISTS id,
+                        ALTER COLUMN price TYPE DOUBLE PRECISION,
+                        ALTER COLUMN volume TYPE DOUBLE PRECISION
+                ''')
+                constraints = await conn.fetch('''
+                    SELECT constraint_name FROM information_schema.table_constraints
+                    WHERE table_schema = 'public' AND table_name = $1 AND constraint_type = 'UNIQUE'
+                ''', table_name)
+                for row in constraints:
+                    await conn.execute(f'ALTER TABLE {table_name} DROP CONSTRAINT "{row["constraint_name"]}"')
+                await conn.execute(f'''
+                    ALTER TABLE {table_name} ADD UNIQUE (connector_name, trading_pair, trade_id, timestamp)
+                ''')
+        await self.ensure_hypertable(table_name, chunk_time_interval)
+
+    async def migrate_all_tables(self):
+        for connector_name, trading_pair in await self.get_available_pairs():
+            table_name = self.get_trades_table_name(connector_name, trading_pair)
+            if not await self.is_hypertable(table_name):
+                await self.migrate_trades_table(table_name)
+        for connector_name, trading_pair, interval in await self.get_available_candles():
+            table_name = self.get_ohlc_table_name(connector_name, trading_pair, interval)
+            if not await self.is_hypertable(table_name):
+                await self.migrate_candles_table(table_name)
+
+    async def _delete_before(self, conn, table_name: str, cutoff: datetime, keys: Optional[Dict[str, Any]] = None):
+        """
+        Apply retention by dropping whole chunks on hypertables and falling back to DELETE on plain tables. Keyed
+        deletes are used on the consolidated tables, where a chunk holds series with different retention.
+        """
+        if keys:
+            keys_clause, keys_params = self.keys_filter(keys, 2)
+            await conn.execute(f"DELETE FROM {table_name} WHERE timestamp < $1{keys_clause}", cutoff, *keys_params)
+        elif await self.is_hypertable(table_name):
+            await conn.execute("SELECT drop_chunks($1::regclass, older_than => $2::timestamptz)", table_name, cutoff)
+        else:
+            await conn.execute(f"DELETE FROM {table_name} WHERE timestamp < $1", cutoff)
 
     async def drop_trades_table(self):
         async with self.pool.acquire() as conn:
             await conn.execute('DROP TABLE IF EXISTS Trades')
 
     async def delete_trades(self, connector_name: str, trading_pair: str, timestamp: Optional[float] = None):
-        table_name = self.get_trades_table_name(connector_name, trading_pair)
+        table_name = self.resolve_trades_table(connector_name, trading_pair)
+        keys = self.trades_keys(connector_name, trading_pair) if self.consolidated else {}
         async with self.pool.acquire() as conn:
-            query = f"DELETE FROM {table_name}"
-            params = []
-
-            if timestamp is not None:
-                query += " WHERE timestamp < $1"
-                params.append(datetime.fromtimestamp(timestamp))
-            await conn.execute(query, *params)
+            if timestamp is None:
+                keys_clause, keys_params = self.keys_filter(keys, 1)
+                await conn.execute(f"DELETE FROM {table_name} WHERE TRUE{keys_clause}", *keys_params)
+            else:
+                await self._delete_before(conn, table_name, datetime.fromtimestamp(timestamp), keys)
+        await self.refresh_catalog_entry("trades", connector_name, trading_pair)
 
     async def delete_candles(self, connector_name: str, trading_pair: str, interval: str,
                              timestamp: Optional[float] = None):
-        table_name = self.get_ohlc_table_name(connector_name, trading_pair, interval)
+        table_name = self.resolve_candles_table(connector_name, trading_pair, interval)
+        keys = self.candles_keys(connector_name, trading_pair, interval)
         async with self.pool.acquire() as conn:
-            query = f"DELETE FROM {table_name}"
-            params = []
-
-            if timestamp is not None:
-                query += " WHERE timestamp < $1"
-                params.append(datetime.fromtimestamp(timestamp))
-            await conn.execute(query, *params)
+            if timestamp is None:
+                keys_clause, keys_params = self.keys_filter(keys, 1)
+                await conn.execute(f"DELETE FROM {table_name} WHERE TRUE{keys_clause}", *keys_params)
+            else:
+                await self._delete_before(conn, table_name, datetime.fromtimestamp(timestamp), keys)
+        await self.refresh_catalog_entry("candles", connector_name, trading_pair, interval)
 
     async def append_trades(self, table_name: str, trades: List[Tuple[int, str, str, float, float, float, bool]]):
         async with self.pool.acquire() as conn:
@@ -165,7 +434,7 @@ class TimescaleClient:
             await conn.executemany(f'''
                 INSERT INTO {table_name} (trade_id, connector_name, trading_pair, timestamp, price, volume, sell_taker)
                 VALUES ($1, $2, $3, to_timestamp($4), $5, $6, $7)
-                ON CONFLICT (connector_name, trading_pair, trade_id) DO NOTHING
+                ON CONFLICT (connector_name, trading_pair, trade_id, timestamp) DO NOTHING
             ''', trades)
 
     async def append_candles(self, table_name: str, candles: List[Tuple[float, float, float, float, float]]):
@@ -178,52 +447,189 @@ class TimescaleClient:
                 ON CONFLICT (timestamp) DO NOTHING
             ''', candles)
 
-    async def append_screener_metrics(self, screener_metrics: Dict[str, Any]):
+    async def store_trades(self, connector_name: str, trading_pair: str,
+                           trades: List[Tuple[int, str, str, float, float, float, bool]]) -> int:
+        """
+        Insert trades in the configured layout with a single unnest statement and record them in the catalog.
+        Rows follow the append_trades tuple layout. Returns the number of new rows.
+        """
+        if not trades:
+            return 0
+        table_name = self.resolve_trades_table(connector_name, trading_pair)
+        await self.create_trades_table(table_name)
+        trade_ids, _, _, timestamps, prices, volumes, sell_takers = (list(column) for column in zip(*trades))
         async with self.pool.acquire() as conn:
-            await self.create_screener_table()
-            delete_query = f"""
-                        DELETE FROM {self.screener_table_name}
-                        WHERE connector_name = '{screener_metrics["connector_name"]}' AND trading_pair = '{screener_metrics["trading_pair"]}';
-                        """
-            query = f"""
-                        INSERT INTO {self.screener_table_name} (
-                            connector_name,
-                            trading_pair,
-                            price,
-                            volume_24h,
-                            price_cbo,
-                            volume_cbo,
-                            one_min,
-                            three_min,
-                            five_min,
-                            fifteen_min,
-                            one_hour,
-                            start_time,
-                            end_time
-                        )
-                        VALUES (
-                            $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13
-                        );
-                    """
-            async with self.pool.acquire() as conn:
-                await self.create_screener_table()
-                await conn.execute(delete_query)
-                await conn.execute(
-                    query,
-                    screener_metrics["connector_name"],
-                    screener_metrics["trading_pair"],
-                    screener_metrics["price"],
-                    screener_metrics["volume_24h"],
-                    screener_metrics["price_cbo"],
-                    screener_metrics["volume_cbo"],
-                    screener_metrics["one_min"],
-                    screener_metrics["three_min"],
-                    screener_metrics["five_min"],
-                    screener_metrics["fifteen_min"],
-                    screener_metrics["one_hour"],
-                    screener_metrics["start_time"],
-                    screener_metrics["end_time"],
+            status = await conn.execute(f'''
+                INSERT INTO {table_name} (trade_id, connector_name, trading_pair, timestamp, price, volume, sell_taker)
+                SELECT t.trade_id, $1, $2, to_timestamp(t.ts), t.price, t.volume, t.sell_taker
+                FROM unnest($3::BIGINT[], $4::DOUBLE PRECISION[], $5::DOUBLE PRECISION[], $6::DOUBLE PRECISION[],
+                            $7::BOOLEAN[]) AS t(trade_id, ts, price, volume, sell_taker)
+                ON CONFLICT (connector_name, trading_pair, trade_id, timestamp) DO NOTHING
+            ''', connector_name, trading_pair, [int(trade_id) for trade_id in trade_ids],
+                [float(ts) for ts in timestamps], [float(price) for price in prices],
+                [float(volume) for volume in volumes], [bool(sell_taker) for sell_taker in sell_takers])
+            inserted = int(status.split()[-1])
+            await self._record_catalog(conn, "trades", connector_name, trading_pair, "",
+                                       min(timestamps), max(timestamps), inserted)
+        metrics.count("rows_written", inserted, table="trades")
+        return inserted
+
+    async def store_candles(self, connector_name: str, trading_pair: str, interval: str,
+                            candles: List[Tuple[float, ...]]) -> int:
+        """
+        Insert candles in the configured layout with a single unnest statement and record them in the catalog.
+        Rows follow the CANDLES_COLUMNS order with the timestamp in seconds. Returns the number of new rows.
+        """
+        if not candles:
+            return 0
+        table_name = self.resolve_candles_table(connector_name, trading_pair, interval)
+        await self.create_candles_table(table_name)
+        keys = self.candles_keys(connector_name, trading_pair, interval)
+        columns = [[float(value) for value in column] for column in zip(*candles)]
+        key_columns = "".join(f"{column}, " for column in keys)
+        key_values = "".join(f"${i + 1}, " for i in range(len(keys)))
+        first = len(keys) + 1
+        arrays = ", ".join(f"${first + i}::DOUBLE PRECISION[]" for i in range(len(CANDLES_COLUMNS)))
+        async with self.pool.acquire() as conn:
+            status = await conn.execute(f'''
+                INSERT INTO {table_name} ({key_columns}timestamp, open, high, low, close, volume, quote_asset_volume,
+                    n_trades, taker_buy_base_volume, taker_buy_quote_volume)
+                SELECT {key_values}to_timestamp(c.ts), c.open, c.high, c.low, c.close, c.volume, c.quote_asset_volume,
+                    c.n_trades::INTEGER, c.taker_buy_base_volume, c.taker_buy_quote_volume
+                FROM unnest({arrays}) AS c(ts, open, high, low, close, volume, quote_asset_volume, n_trades,
+                    taker_buy_base_volume, taker_buy_quote_volume)
+                ON CONFLICT ({key_columns}timestamp) DO NOTHING
+            ''', *keys.values(), *columns)
+            inserted = int(status.split()[-1])
+            await self._record_catalog(conn, "candles", connector_name, trading_pair, interval,
+                                       min(columns[0]), max(columns[0]), inserted)
+        metrics.count("rows_written", inserted, table="candles")
+        return inserted
+
+    async def _record_catalog(self, conn, data_type: str, connector_name: str, trading_pair: str, interval: str,
+                              start_timestamp: float, end_timestamp: float, n_rows: int):
+        await self.create_catalog_table()
+        await conn.execute(f'''
+            INSERT INTO {self.catalog_table_name} AS catalog
+                (data_type, connector_name, trading_pair, candle_interval, start_time, end_time, row_count, updated_at)
+            VALUES ($1, $2, $3, $4, to_timestamp($5), to_timestamp($6), $7, NOW())
+            ON CONFLICT (data_type, connector_name, trading_pair, candle_interval) DO UPDATE SET
+                start_time = LEAST(catalog.start_time, EXCLUDED.start_time),
+                end_time = GREATEST(catalog.end_time, EXCLUDED.end_time),
+                row_count = catalog.row_count + EXCLUDED.row_count,
+                updated_at = NOW()
+        ''', data_type, connector_name, trading_pair, interval, float(start_timestamp), float(end_timestamp), n_rows)
+
+    async def refresh_catalog_entry(self, data_type: str, connector_name: str, trading_pair: str, interval: str = ""):
+        """
+        Recompute the exact range and row count of one series, used after retention removed rows. Both layouts
+        refresh it, since the screener trims its snapshots to the catalog start.
+        """
+        if data_type == "trades":
+            table_name = self.resolve_trades_table(connector_name, trading_pair)
+            keys = self.trades_keys(connector_name, trading_pair)
+        else:
+            table_name = self.resolve_candles_table(connector_name, trading_pair, interval)
+            keys = self.candles_keys(connector_name, trading_pair, interval)
+        keys_clause, keys_params = self.keys_filter(keys, 5)
+        await self.create_catalog_table()
+        async with self.pool.acquire() as conn:
+            await conn.execute(f'''
+                INSERT INTO {self.catalog_table_name}
+                    (data_type, connector_name, trading_pair, candle_interval, start_time, end_time, row_count, updated_at)
+                SELECT $1, $2, $3, $4, MIN(timestamp), MAX(timestamp), COUNT(*), NOW()
+                FROM {table_name} WHERE TRUE{keys_clause}
+                ON CONFLICT (data_type, connector_name, trading_pair, candle_interval) DO UPDATE SET
+                    start_time = EXCLUDED.start_time,
+                    end_time = EXCLUDED.end_time,
+                    row_count = EXCLUDED.row_count,
+                    updated_at = NOW()
+            ''', data_type, connector_name, trading_pair, interval, *keys_params)
 
+    async def rebuild_catalog(self):
+        """Rebuild the catalog of the consolidated tables with one grouped scan per table."""
+        await self.create_catalog_table()
+        await self.create_consolidated_candles_table()
+        await self.create_trades_table(self.trades_table_name)
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(f"DELETE FROM {self.catalog_table_name}")
+                for data_type, table_name, interval_column in [("trades", self.trades_table_name, "''"),
+                                                               ("candles", self.candles_table_name, "candle_interval")]:
+                    await conn.execute(f'''
+                        INSERT INTO {self.catalog_table_name}
+                            (data_type, connector_name, trading_pair, candle_interval, start_time, end_time, row_count)
+                        SELECT '{data_type}', connector_name, trading_pair, {interval_column}, MIN(timestamp),
+                               MAX(timestamp), COUNT(*)
+                        FROM {table_name}
+                        GROUP BY connector_name, trading_pair, {interval_column}
+                    ''')
+
+    async def get_catalog(self, data_type: Optional[str] = None) -> pd.DataFrame:
+        await self.create_catalog_table()
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(f'''
+                SELECT data_type, connector_name, trading_pair, candle_interval, start_time, end_time, row_count
+                FROM {self.catalog_table_name}
+                WHERE $1::TEXT IS NULL OR data_type = $1
+                ORDER BY data_type, connector_name, trading_pair, candle_interval
+            ''', data_type)
+        return pd.DataFrame(rows, columns=["data_type", "connector_name", "trading_pair", "candle_interval",
+                                           "start_time", "end_time", "row_count"])
+
+    async def append_screener_metrics(self, screener_metrics: Dict[str, Any]):
+        await self.append_screener_metrics_batch([screener_metrics])
+
+    async def append_screener_metrics_batch(self, screener_metrics_list: List[Dict[str, Any]]):
+        """Replace the screener rows of every pair in the batch with one delete and one unnest insert."""
+        if not screener_metrics_list:
+            return
+        await self.create_screener_table()
+        json_columns = ["price", "price_cbo", "volume_cbo", "one_min", "three_min", "five_min", "fifteen_min",
+                        "one_hour"]
+        values = {column: [metrics[column] for metrics in screener_metrics_list]
+                  for column in ["connector_name", "trading_pair", "volume_24h", "start_time", "end_time"] + json_columns}
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(f"""
+                    DELETE FROM {self.screener_table_name} AS s
+                    USING unnest($1::TEXT[], $2::TEXT[]) AS p(connector_name, trading_pair)
+                    WHERE s.connector_name = p.connector_name AND s.trading_pair = p.trading_pair
+                """, values["connector_name"], values["trading_pair"])
+                await conn.execute(f"""
+                    INSERT INTO {self.screener_table_name} (
+                        connector_name,
+                        trading_pair,
+                        price,
+                        volume_24h,
+                        price_cbo,
+                        volume_cbo,
+                        one_min,
+                        three_min,
+                        five_min,
+                        fifteen_min,
+                        one_hour,
+                        start_time,
+                        end_time
+                    )
+                    SELECT * FROM unnest(
+                        $1::TEXT[], $2::TEXT[], $3::JSONB[], $4::REAL[], $5::JSONB[], $6::JSONB[], $7::JSONB[],
+                        $8::JSONB[], $9::JSONB[], $10::JSONB[], $11::JSONB[], $12::TIMESTAMPTZ[], $13::TIMESTAMPTZ[]
+                    )
+                """,
+                    values["connector_name"],
+                    values["trading_pair"],
+                    values["price"],
+                    values["volume_24h"],
+                    values["price_cbo"],
+                    values["volume_cbo"],
+                    values["one_min"],
+                    values["three_min"],
+                    values["five_min"],
+                    values["fifteen_min"],
+                    values["one_hour"],
+                    values["start_time"],
+                    values["end_time"],
                 )
 
     async def get_last_trade_id(self, connector_name: str, trading_pair: str, table_name: str) -> int:
@@ -236,13 +642,48 @@ class TimescaleClient:
             return result
 
     async def get_last_candle_timestamp(self, connector_name: str, trading_pair: str, interval: str) -> Optional[float]:
-        table_name = self.get_ohlc_table_name(connector_name, trading_pair, interval)
+        table_name = self.resolve_candles_table(connector_name, trading_pair, interval)
+        keys_clause, keys_params = self.keys_filter(self.candles_keys(connector_name, trading_pair, interval), 1)
         async with self.pool.acquire() as conn:
             result = await conn.fetchval(f'''
-                SELECT MAX(timestamp) FROM {table_name}
-            ''')
+                SELECT MAX(timestamp) FROM {table_name} WHERE TRUE{keys_clause}
+            ''', *keys_params)
             return result.timestamp() if result else None
 
+    async def get_last_candle_timestamps(self, connector_name: str, trading_pairs: List[str],
+                                         intervals: List[str]) -> Dict[Tuple[str, str], float]:
+        """
+        Last stored candle timestamp of every (trading_pair, interval) in one round trip: a grouped MAX over the
+        consolidated table, or a UNION ALL over the per-pair tables that exist. Series without data are omitted.
+        """
+        async with self.pool.acquire() as conn:
+            if self.consolidated:
+                if not await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", self.candles_table_name):
+                    return {}
+                rows = await conn.fetch(f'''
+                    SELECT trading_pair, candle_interval, MAX(timestamp) AS last_timestamp
+                    FROM {self.candles_table_name}
+                    WHERE connector_name = $1 AND trading_pair = ANY($2::TEXT[]) AND candle_interval = ANY($3::TEXT[])
+                    GROUP BY trading_pair, candle_interval
+                ''', connector_name, trading_pairs, intervals)
+            else:
+                series = {self.get_ohlc_table_name(connector_name, trading_pair, interval): (trading_pair, interval)
+                          for trading_pair in trading_pairs for interval in intervals}
+                existing = await conn.fetch('''
+                    SELECT table_name FROM information_schema.tables
+                    WHERE table_schema = 'public' AND table_name = ANY($1::TEXT[])
+                ''', list(series))
+                if not existing:
+                    return {}
+                union = " UNION ALL ".join(
+                    f"SELECT '{series[row['table_name']][0]}' AS trading_pair, "
+                    f"'{series[row['table_name']][1]}' AS candle_interval, MAX(timestamp) AS last_timestamp "
+                    f"FROM {row['table_name']}"
+                    for row in existing)
+                rows = await conn.fetch(union)
+        return {(row["trading_pair"], row["candle_interval"]): row["last_timestamp"].timestamp()
+                for row in rows if row["last_timestamp"] is not None}
+
     async def close(self):
         if self.pool:
             await self.pool.close()
@@ -254,6 +695,15 @@ class TimescaleClient:
                 ''')
             return start_time.timestamp()
 
+    async def get_candles_start(self, connector_name: str, trading_pair: str, interval: str) -> Optional[float]:
+        """Oldest retained candle of one series, for the series the catalog does not cover."""
+        table_name = self.resolve_candles_table(connector_name, trading_pair, interval)
+        keys_clause, keys_params = self.keys_filter(self.candles_keys(connector_name, trading_pair, interval), 1)
+        async with self.pool.acquire() as conn:
+            start_time = await conn.fetchval(f"SELECT MIN(timestamp) FROM {table_name} WHERE TRUE{keys_clause}",
+                                             *keys_params)
+        return start_time.timestamp() if start_time is not None else None
+
     async def get_max_timestamp(self, table_name):
         async with self.pool.acquire() as conn:
             end_timestamp = await conn.fetchval(f'''
@@ -262,85 +712,186 @@ class TimescaleClient:
             return end_timestamp.timestamp()
 
     async def get_trades(self, connector_name: str, trading_pair: str, start_time: Optional[float],
-                         end_time: Optional[float] = None, chunk_size: timedelta = timedelta(hours=6)) -> pd.DataFrame:
-        table_name = self.get_trades_table_name(connector_name, trading_pair)
+                         end_time: Optional[float] = None, chunk_size: timedelta = timedelta(hours=6),
+                         max_concurrency: int = 4) -> pd.DataFrame:
+        """
+        Fetch trades in time chunks with bounded concurrency. The non-empty chunks are found first, then each one
+        decodes straight into NumPy columns sized from its fetched rows, and a single frame is built at the end.
+        """
+        table_name = self.resolve_trades_table(connector_name, trading_pair)
         if end_time is None:
             end_time = datetime.now().timestamp()
         if start_time is None:
-            start_time = await self.get_min_timestamp(table_name)
+            async with self.pool.acquire() as conn:
+                min_timestamp = await conn.fetchval(f'''
+                    SELECT MIN(timestamp) FROM {table_name} WHERE connector_name = $1 AND trading_pair = $2
+                ''', connector_name, trading_pair)
+            start_time = min_timestamp.timestamp()
 
         start_dt = datetime.fromtimestamp(start_time)
-        end_dt = datetime.fromtimestamp(end_time)
+        # Chunks are half-open, so the end is shifted to keep the requested range inclusive.
+        end_dt = datetime.fromtimestamp(end_time) + timedelta(microseconds=1)
+        chunk_seconds = chunk_size.total_seconds()
 
-        async def fetch_chunk(chunk_start: datetime, chunk_end: datetime) -> pd.DataFrame:
-            async with self.pool.acquire() as conn:
+        async with self.pool.acquire() as conn:
+            chunks = await conn.fetch(f'''
+                SELECT DISTINCT FLOOR(EXTRACT(EPOCH FROM (timestamp - $3::timestamptz)) / $5)::BIGINT AS chunk
+                FROM {table_name}
+                WHERE connector_name = $1 AND trading_pair = $2
+                AND timestamp >= $3 AND timestamp < $4
+                ORDER BY chunk
+            ''', connector_name, trading_pair, start_dt, end_dt, chunk_seconds)
+        dtypes = [np.int64, np.int64, np.float64, np.float64, bool]
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_chunk(chunk: int):
+            chunk_start = start_dt + timedelta(seconds=chunk * chunk_seconds)
+            chunk_end = min(chunk_start + chunk_size, end_dt)
+            async with semaphore, self.pool.acquire() as conn:
                 rows = await conn.fetch(f'''
-                    SELECT trade_id, timestamp, price, volume, sell_taker
+                    SELECT trade_id,
+                           (EXTRACT(EPOCH FROM timestamp) * 1000000)::BIGINT AS timestamp_us,
+                           price::DOUBLE PRECISION AS price,
+                           volume::DOUBLE PRECISION AS volume,
+                           sell_taker
                     FROM {table_name}
                     WHERE connector_name = $1 AND trading_pair = $2
-                    AND timestamp BETWEEN $3 AND $4
+                    AND timestamp >= $3 AND timestamp < $4
                     ORDER BY timestamp
                 ''', connector_name, trading_pair, chunk_start, chunk_end)
+            n_rows = len(rows)
+            return [np.fromiter((r[i] for r in rows), dtype=dtype, count=n_rows)
+                    for i, dtype in enumerate(dtypes)]
 
-            df = pd.DataFrame(rows, columns=["trade_id", 'timestamp', 'price', 'volume', 'sell_taker'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit="s")
-            df["price"] = df["price"].astype(float)
-            df["volume"] = df["volume"].astype(float)
-            return df
+        # Chunks come back in time order, so concatenating them keeps the trades sorted
+        fetched = await asyncio.gather(*[fetch_chunk(row["chunk"]) for row in chunks])
+        trade_ids, timestamps, prices, volumes, sell_takers = (
+            np.concatenate([chunk[i] for chunk in fetched]) if fetched else np.empty(0, dtype=dtype)
+            for i, dtype in enumerate(dtypes))
 
-        chunks = []
-        current_start = start_dt
-        while current_start < end_dt:
-            current_end = min(current_start + chunk_size, end_dt)
-            chunks.append(fetch_chunk(current_start, current_end))
-            current_start = current_end
-
-        results = await asyncio.gather(*chunks)
-
-        df = pd.concat(results, ignore_index=True)
-        df.set_index('timestamp', inplace=True)
+        df = pd.DataFrame({
+            "trade_id": trade_ids,
+            "price": prices,
+            "volume": volumes,
+            "sell_taker": sell_takers,
+        }, index=pd.DatetimeIndex(pd.to_datetime(timestamps, unit="us", utc=True), name="timestamp"))
+        metrics.count("rows_read", len(df), table="trades")
         return df
 
-    async def compute_resampled_ohlc(self, connector_name: str, trading_pair: str, interval: str):
-        candles = await self.get_candles(connector_name, trading_pair, interval, from_trades=True)
-        ohlc_table_name = self.get_ohlc_table_name(connector_name, trading_pair, interval)
+    async def create_ohlc_table(self, table_name: str, chunk_time_interval: timedelta = timedelta(days=7)):
+        if self.consolidated:
+            await self.create_consolidated_candles_table(chunk_time_interval)
+            return
         async with self.pool.acquire() as conn:
-            # Drop the existing OHLC table if it exists
-            await conn.execute(f'DROP TABLE IF EXISTS {ohlc_table_name}')
-            # Create a new OHLC table
             await conn.execute(f'''
-                CREATE TABLE {ohlc_table_name} (
+                CREATE TABLE IF NOT EXISTS {table_name} (
                     timestamp TIMESTAMPTZ NOT NULL,
-                    open NUMERIC NOT NULL,
-                    high NUMERIC NOT NULL,
-                    low NUMERIC NOT NULL,
-                    close NUMERIC NOT NULL,
-                    volume NUMERIC NOT NULL,
+                    open DOUBLE PRECISION NOT NULL,
+                    high DOUBLE PRECISION NOT NULL,
+                    low DOUBLE PRECISION NOT NULL,
+                    close DOUBLE PRECISION NOT NULL,
+                    volume DOUBLE PRECISION NOT NULL,
                     PRIMARY KEY (timestamp)
                 )
             ''')
-            # Insert the resampled candles into the new table
-            await conn.executemany(f'''
-                INSERT INTO {ohlc_table_name} (timestamp, open, high, low, close, volume)
-                VALUES ($1, $2, $3, $4, $5, $6)
-            ''', [
-                (
-                    datetime.fromtimestamp(row["timestamp"]),
-                    row['open'],
-                    row['high'],
-                    row['low'],
-                    row['close'],
-                    row['volume']
-                )
-                for i, row in candles.data.iterrows()
-            ])
+        if not await self.is_hypertable(table_name):
+            await self.migrate_candles_table(table_name, chunk_time_interval)
+
+    async def compute_resampled_ohlc(self, connector_name: str, trading_pair: str, interval: str):
+        await self.compute_resampled_ohlcs(connector_name, trading_pair, [interval])
+
+    async def compute_resampled_ohlcs(self, connector_name: str, trading_pair: str, intervals: List[str]):
+        """
+        Incrementally refresh the OHLC tables of several intervals inside the database with time_bucket_gapfill.
+        Each table is recomputed only from its last (possibly partial) bucket onwards. The finest interval is
+        aggregated from the trades table and coarser ones are rolled up from the closest finer table they divide,
+        so the trades are scanned once per call. Empty buckets are forward filled with zero volume, as the
+        pandas resample used to do, and buckets older than the retained trades are dropped.
+        """
+        trades_table_name = self.resolve_trades_table(connector_name, trading_pair)
+        sorted_intervals = sorted(set(intervals), key=lambda interval: INTERVAL_SECONDS[interval])
+        for interval in sorted_intervals:
+            await self.create_ohlc_table(self.resolve_candles_table(connector_name, trading_pair, interval))
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                bounds = await conn.fetchrow(f'''
+                    SELECT MIN(timestamp) AS start_time, MAX(timestamp) AS end_time FROM {trades_table_name}
+                    WHERE connector_name = $1 AND trading_pair = $2
+                ''', connector_name, trading_pair)
+                if bounds["start_time"] is None:
+                    return
+                refreshed = []
+                for interval in sorted_intervals:
+                    ohlc_table_name = self.resolve_candles_table(connector_name, trading_pair, interval)
+                    keys = self.candles_keys(connector_name, trading_pair, interval)
+                    keys_params = list(keys.values())
+                    key_columns = "".join(f"{column}, " for column in keys)
+                    key_values = "".join(f"${4 + i}, " for i in range(len(keys)))
+                    bucket_width = timedelta(seconds=INTERVAL_SECONDS[interval])
+                    source_interval = next((finer for finer in reversed(refreshed)
+                                            if INTERVAL_SECONDS[interval] % INTERVAL_SECONDS[finer] == 0), None)
+                    if source_interval is None:
+                        source_params = [connector_name, trading_pair]
+                        source_query = f'''
+                            SELECT time_bucket_gapfill($1::interval, timestamp, $2::timestamptz, $3::timestamptz) AS bucket,
+                                   locf(first(price, timestamp)) AS open,
+                                   locf(max(price)) AS high,
+                                   locf(min(price)) AS low,
+                                   locf(last(price, timestamp)) AS close,
+                                   COALESCE(SUM(volume), 0) AS volume
+                            FROM {trades_table_name}
+                            WHERE timestamp >= $2 AND timestamp < $3
+                            AND connector_name = ${4 + len(keys)} AND trading_pair = ${5 + len(keys)}
+                            GROUP BY bucket
+                        '''
+                    else:
+                        source_table_name = self.resolve_candles_table(connector_name, trading_pair, source_interval)
+                        source_keys_clause, source_params = self.keys_filter(
+                            self.candles_keys(connector_name, trading_pair, source_interval), 4 + len(keys))
+                        # Forward filled rows carry zero volume and are skipped so they don't widen high/low.
+                        source_query = f'''
+                            SELECT time_bucket_gapfill($1::interval, timestamp, $2::timestamptz, $3::timestamptz) AS bucket,
+                                   locf(first(open, timestamp)) AS open,
+                                   locf(max(high)) AS high,
+                                   locf(min(low)) AS low,
+                                   locf(last(close, timestamp)) AS close,
+                                   COALESCE(SUM(volume), 0) AS volume
+                            FROM {source_table_name}
+                            WHERE timestamp >= $2 AND timestamp < $3 AND volume > 0{source_keys_clause}
+                            GROUP BY bucket
+                        '''
+                    refresh_start = await conn.fetchval(f'''
+                        SELECT GREATEST(MAX(timestamp), time_bucket($1::interval, $2::timestamptz))
+                        FROM {ohlc_table_name} WHERE TRUE{self.keys_filter(keys, 3)[0]}
+                    ''', bucket_width, bounds["start_time"], *keys_params)
+                    refresh_end = await conn.fetchval("SELECT time_bucket($1::interval, $2::timestamptz) + $1::interval",
+                                                      bucket_width, bounds["end_time"])
+                    await conn.execute(f'''
+                        INSERT INTO {ohlc_table_name} ({key_columns}timestamp, open, high, low, close, volume)
+                        SELECT {key_values}bucket, open, high, low, close, volume
+                        FROM ({source_query}) AS filled
+                        WHERE close IS NOT NULL
+                        ON CONFLICT ({key_columns}timestamp) DO UPDATE SET
+                            open = EXCLUDED.open,
+                            high = EXCLUDED.high,
+                            low = EXCLUDED.low,
+                            close = EXCLUDED.close,
+                            volume = EXCLUDED.volume
+                    ''', bucket_width, refresh_start, refresh_end, *keys_params, *source_params)
+                    retention_start = await conn.fetchval("SELECT time_bucket($1::interval, $2::timestamptz)",
+                                                          bucket_width, bounds["start_time"])
+                    await self._delete_before(conn, ohlc_table_name, retention_start, keys)
+                    refreshed.append(interval)
+        for interval in sorted_intervals:
+            await self.refresh_catalog_entry("candles", connector_name, trading_pair, interval)
 
     async def execute_query(self, query: str):
         async with self.pool.acquire() as connection:
             return await connection.fetch(query)
 
     def metrics_query_str(self, connector_name, trading_pair):
-        table_name = self.get_trades_table_name(connector_name, trading_pair)
+        table_name = self.resolve_trades_table(connector_name, trading_pair)
         return f'''
             SELECT COUNT(*) AS trade_amount,
                    AVG(price) AS price_avg,
@@ -351,6 +902,7 @@ class TimescaleClient:
                    MAX(timestamp) AS to_timestamp,
                    SUM(price * volume) AS volume_usd
             FROM {table_name}
+            WHERE connector_name = '{connector_name}' AND trading_pair = '{trading_pair}'
         '''
 
     async def get_screener_df(self):
@@ -457,26 +1009,71 @@ class TimescaleClient:
                 candles_df.columns = candles_df.columns.droplevel(0)
                 candles_df["timestamp"] = pd.to_numeric(candles_df.index) // 1e9
         else:
-            table_name = self.get_ohlc_table_name(connector_name, trading_pair, interval)
-            async with self.pool.acquire() as conn:
-                query = f'''
-                    SELECT timestamp, open, high, low, close, volume
-                    FROM {table_name}
-                    WHERE timestamp BETWEEN $1 AND $2
-                    ORDER BY timestamp
-                '''
-                start_dt = datetime.fromtimestamp(start_time) if start_time else datetime.min
-                end_dt = datetime.fromtimestamp(end_time) if end_time else datetime.max
-                rows = await conn.fetch(query, start_dt, end_dt)
-            candles_df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            # candles_df.set_index('timestamp', inplace=True)
-            candles_df['timestamp'] = candles_df['timestamp'].apply(lambda x: x.timestamp())
-            candles_df = candles_df.astype(
-                {'open': float, 'high': float, 'low': float, 'close': float, 'volume': float})
+            candles_by_pair = await self.get_candles_batch(connector_name, [trading_pair], interval, start_time, end_time,
+                                                           skip_missing=False)
+            return candles_by_pair[trading_pair]
 
         return Candles(candles_df=candles_df, connector_name=connector_name, trading_pair=trading_pair,
                        interval=interval)
 
+    async def get_candles_batch(self, connector_name: str, trading_pairs: List[str], interval: str,
+                                start_time: Optional[float] = None, end_time: Optional[float] = None,
+                                columns: Optional[List[str]] = None, max_concurrency: int = 8,
+                                skip_missing: bool = True) -> Dict[str, Candles]:
+        """
+        Fetch the candles of many pairs for one interval. The consolidated layout serves them with a single indexed
+        query; the per-pair layout falls back to one query per table under a semaphore.
+        :param skip_missing: leave out the pairs whose per-pair table doesn't exist instead of failing the batch.
+        :param columns: candle columns to fetch, the timestamp is always included and returned in seconds.
+        """
+        columns = [column for column in (columns or CANDLES_COLUMNS[:6]) if column != "timestamp"]
+        select_columns = ", ".join(["timestamp"] + columns)
+        start_dt = datetime.fromtimestamp(start_time) if start_time else datetime.min
+        end_dt = datetime.fromtimestamp(end_time) if end_time else datetime.max
+
+        def to_candles(trading_pair: str, rows) -> Candles:
+            candles_df = pd.DataFrame(rows, columns=["timestamp"] + columns)
+            candles_df["timestamp"] = candles_df["timestamp"].apply(lambda x: x.timestamp())
+            candles_df = candles_df.astype({column: float for column in columns})
+            return Candles(candles_df=candles_df, connector_name=connector_name, trading_pair=trading_pair,
+                           interval=interval)
+
+        if self.consolidated:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(f'''
+                    SELECT trading_pair, {select_columns}
+                    FROM {self.candles_table_name}
+                    WHERE connector_name = $1 AND candle_interval = $2 AND trading_pair = ANY($3::TEXT[])
+                    AND timestamp BETWEEN $4 AND $5
+                    ORDER BY trading_pair, timestamp
+                ''', connector_name, interval, list(trading_pairs), start_dt, end_dt)
+            rows_by_pair = {trading_pair: [] for trading_pair in trading_pairs}
+            for row in rows:
+                rows_by_pair[row["trading_pair"]].append(tuple(row)[1:])
+            return {trading_pair: to_candles(trading_pair, pair_rows) for trading_pair, pair_rows in rows_by_pair.items()}
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_pair(trading_pair: str) -> Optional[Candles]:
+            table_name = self.get_ohlc_table_name(connector_name, trading_pair, interval)
+            try:
+                async with semaphore, self.pool.acquire() as conn:
+                    rows = await conn.fetch(f'''
+                        SELECT {select_columns}
+                        FROM {table_name}
+                        WHERE timestamp BETWEEN $1 AND $2
+                        ORDER BY timestamp
+                    ''', start_dt, end_dt)
+            except asyncpg.UndefinedTableError:
+                if not skip_missing:
+                    raise
+                logging.warning(f"No candles table {table_name}, skipping {trading_pair}")
+                return None
+            return to_candles(trading_pair, rows)
+
+        results = await asyncio.gather(*[fetch_pair(trading_pair) for trading_pair in trading_pairs])
+        return {trading_pair: candles for trading_pair, candles in zip(trading_pairs, results) if candles is not None}
+
     async def get_candles_last_days(self,
                                     connector_name: str,
                                     trading_pair: str,
@@ -487,19 +1084,26 @@ class TimescaleClient:
         return await self.get_candles(connector_name, trading_pair, interval, start_time, end_time)
 
     async def get_available_pairs(self) -> List[Tuple[str, str]]:
+        if self.consolidated:
+            catalog = await self.get_catalog("trades")
+            return list(catalog[["connector_name", "trading_pair"]].itertuples(index=False, name=None))
         async with self.pool.acquire() as conn:
             rows = await conn.fetch('''
                 SELECT table_name
                 FROM information_schema.tables
                 WHERE table_schema = 'public'
                 AND table_name LIKE '%_trades'
+                AND table_name <> ALL($1::TEXT[])
                 ORDER BY table_name
-            ''')
+            ''', [self.trades_table_name, self.candles_table_name, self.catalog_table_name])
 
         available_pairs = []
         for row in rows:
             table_name = row['table_name']
             parts = table_name.split('_')
+            # Per-pair tables are named {connector}_{base}_{quote}_trades
+            if len(parts) < 4:
+                continue
             base = parts[-3].upper()
             quote = parts[-2].upper()
             trading_pair = f"{base}-{quote}"
@@ -511,6 +1115,9 @@ class TimescaleClient:
         return available_pairs
 
     async def get_available_candles(self) -> List[Tuple[str, str, str]]:
+        if self.consolidated:
+            catalog = await self.get_catalog("candles")
+            return list(catalog[["connector_name", "trading_pair", "candle_interval"]].itertuples(index=False, name=None))
         async with self.pool.acquire() as conn:
             # TODO: fix regex to match intervals
             timeframe_regex = r'_(\d+[smhdw])'
@@ -538,12 +1145,13 @@ class TimescaleClient:
         return available_candles
 
     async def get_all_candles(self, connector_name: str, trading_pair: str, interval: str) -> Candles:
-        table_name = self.get_ohlc_table_name(connector_name, trading_pair, interval)
+        table_name = self.resolve_candles_table(connector_name, trading_pair, interval)
+        keys_clause, keys_params = self.keys_filter(self.candles_keys(connector_name, trading_pair, interval), 1)
         query = f'''
-            SELECT * FROM {table_name}
+            SELECT {", ".join(CANDLES_COLUMNS)} FROM {table_name} WHERE TRUE{keys_clause}
         '''
         async with self.pool.acquire() as conn:
-            rows = await conn.fetch(query)
+            rows = await conn.fetch(query, *keys_params)
         return Candles(
             candles_df=pd.DataFrame(rows, columns=["timestamp", "open", "high", "low", "close", "volume", "quote_asset_volume",
                                         "n_trades", "taker_buy_base_volume", "taker_buy_quote_volume"]),
@@ -555,18 +1163,19 @@ class TimescaleClient:
         if not connector_name or not trading_pair:
             return {"error": "Both connector_name and trading_pair must be provided"}
 
-        table_name = self.get_trades_table_name(connector_name, trading_pair)
+        table_name = self.resolve_trades_table(connector_name, trading_pair)
 
         query = f'''
         SELECT
         MIN(timestamp) as start_time,
         MAX(timestamp) as end_time
         FROM {table_name}
+        WHERE connector_name = $1 AND trading_pair = $2
         '''
 
         async with self.pool.acquire() as conn:
             try:
-                row = await conn.fetchrow(query)
+                row = await conn.fetchrow(query, connector_name, trading_pair)
             except asyncpg.UndefinedTableError:
                 return {"error": f"Table for {connector_name} and {trading_pair} does not exist"}
 
@@ -579,6 +1188,10 @@ class TimescaleClient:
         }
 
     async def get_all_data_ranges(self) -> Dict[Tuple[str, str], Dict[str, datetime]]:
+        if self.consolidated:
+            catalog = await self.get_catalog("trades")
+            return {(row.connector_name, row.trading_pair): {"start_time": row.start_time, "end_time": row.end_time}
+                    for row in catalog.itertuples()}
         available_pairs = await self.get_available_pairs()
         data_ranges = {}
         for connector_name, trading_pair in available_pairs:
@@ -1,16 +1,85 @@
 import asyncio
+import atexit
+import heapq
+import random
 import time
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
-from typing import Any, Dict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
 import logging
 import pandas as pd
 
+from core.instrumentation import current_task, metrics
+from core.services.http_transport import close_transport
+from core.task_profiler import RunProfiler
+from core.task_triggers import DataTrigger
+from core.task_workers import PLACEMENTS, create_worker
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class CronSchedule:
+    """
+    Minimal five-field cron expression (minute hour day-of-month month day-of-week) evaluated in UTC.
+    Fields accept *, lists, ranges and steps (e.g. "*/15 0-6,18-23 * * 1-5"). Day-of-week 0 and 7 are Sunday.
+    """
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self.parse_field(field, low, high) for field, (low, high) in zip(fields, self.FIELD_RANGES)]
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def parse_field(field: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for part in field.split(","):
+            value_range, _, step = part.partition("/")
+            if value_range == "*":
+                start, end = low, high
+            elif "-" in value_range:
+                start, end = map(int, value_range.split("-"))
+            else:
+                start = end = int(value_range)
+                if step:
+                    end = high
+            if start < low or end > high:
+                raise ValueError(f"Cron field {field} out of range {low}-{high}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def matches_day(self, moment: datetime) -> bool:
+        day_match = moment.day in self.days
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def next_after(self, timestamp: float) -> float:
+        moment = datetime.fromtimestamp(timestamp, tz=timezone.utc).replace(second=0, microsecond=0) + \
+            timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self.matches_day(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"Cron expression {self.expression} never matches")
+
+
 class BaseTask(ABC):
     def __init__(self, name: str, frequency: timedelta, config: Dict[str, Any]):
         self.name = name
@@ -18,12 +87,21 @@ class BaseTask(ABC):
         self.config = config
         self.last_run = None
         self.logs = []
+        self.cron: Optional[CronSchedule] = None
+        self.jitter = 0.0
+        self.placement = "loop"
+        self.after: List[str] = []
+        self.trigger: Optional[DataTrigger] = None
+        self.profile_config: Optional[Dict[str, Any]] = None
+        self.profiler: Optional[RunProfiler] = None
+        self.run_metrics = {"runs": 0, "failures": 0, "skipped": 0, "last_duration": None, "total_duration": 0.0,
+                            "max_duration": 0.0, "last_lateness": None, "max_lateness": 0.0}
         self.metadata = {
             "name": self.name,
             "timestamp": self.now(),
             "server": "localhost",
             "owner": "admin",
-            "frequency": self.frequency.seconds,
+            "frequency": self.frequency.total_seconds(),
             "config": self.config,
             "logs": self.logs,
         }
@@ -32,27 +110,98 @@ class BaseTask(ABC):
     async def execute(self):
         pass
 
+    async def run_instrumented(self):
+        """
+        Execute with the task set as the label of every span and counter recorded during the run, sampling its stack
+        when profiling is configured.
+        """
+        token = current_task.set(self.name)
+        started = time.time()
+        start = time.perf_counter()
+        sampler = self.profiler.start(type(self).execute.__code__) if self.profiler is not None else None
+        status = "ok"
+        try:
+            await self.execute()
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            if self.profiler is not None:
+                self.profiler.finish(sampler, started, duration)
+            metrics.observe("task_run", duration, status=status)
+            metrics.count("task_runs", status=status)
+            current_task.reset(token)
+
+    @staticmethod
+    def count(name: str, value: float = 1, **labels: str):
+        """Count task-specific work (rows processed, API calls...) in the exported metrics."""
+        metrics.count(name, value, **labels)
+
     def reset_metadata(self):
         self.metadata = {
             "name": self.name,
             "timestamp": self.now(),
             "server": "localhost",
             "owner": "admin",
-            "frequency": self.frequency.seconds,
+            "frequency": self.frequency.total_seconds(),
             "config": self.config,
             "logs": self.logs,
         }
 
+    def set_schedule(self, cron: Optional[str] = None, jitter: float = 0.0):
+        """Run on a cron expression instead of every `frequency`, and delay each run by up to `jitter` seconds."""
+        self.cron = CronSchedule(cron) if cron else None
+        self.jitter = jitter
+
+    def set_placement(self, placement: str):
+        """Execute in the orchestrator loop, in a dedicated thread, or in a dedicated subprocess."""
+        if placement not in PLACEMENTS:
+            raise ValueError(f"Unknown placement {placement}, expected one of {PLACEMENTS}")
+        self.placement = placement
+
+    def set_dependencies(self, after: Optional[List[str]] = None, trigger: Optional[DataTrigger] = None):
+        """Run after every completion of the `after` tasks, or when `trigger` reports new data."""
+        self.after = list(after or [])
+        self.trigger = trigger
+
+    def set_profiling(self, profile_config: Optional[Dict[str, Any]]):
+        """Attach a sampling profiler to the runs, see RunProfiler for the options."""
+        self.profile_config = profile_config
+        self.profiler = RunProfiler(self.name, profile_config) if profile_config else None
+
+    @property
+    def task_class_path(self) -> str:
+        """Import path used to rebuild the task in a subprocess."""
+        return f"{type(self).__module__}.{type(self).__qualname__}"
+
+    def next_run_time(self, previous: Optional[float], now: float) -> float:
+        """
+        Next scheduled start, without jitter. Fixed-rate runs stay aligned to the first start, so a slow run does
+        not stretch the schedule; slots already missed are skipped instead of run back to back.
+        """
+        if self.cron is not None and self.trigger is None:
+            return self.cron.next_after(max(previous or now, now))
+        if previous is None:
+            return now
+        period = self.trigger.check_seconds if self.trigger is not None else self.frequency.total_seconds()
+        missed = max(0, int((now - previous) // period))
+        return previous + (missed + 1) * period
+
+    def record_run(self, duration: float, lateness: float, failed: bool):
+        self.run_metrics["runs"] += 1
+        self.run_metrics["failures"] += int(failed)
+        self.run_metrics["last_duration"] = duration
+        self.run_metrics["total_duration"] += duration
+        self.run_metrics["max_duration"] = max(self.run_metrics["max_duration"], duration)
+        self.run_metrics["last_lateness"] = lateness
+        self.run_metrics["max_lateness"] = max(self.run_metrics["max_lateness"], lateness)
+
     async def run_with_frequency(self):
-        while True:
-            now = datetime.now()
-            if self.last_run is None or (now - self.last_run) >= self.frequency:
-                try:
-                    self.last_run = now
-                    await self.execute()
-                except Exception as e:
-                    logger.info(f" Error executing task {self.name}: {e}")
-            await asyncio.sleep(1)  # Check every second
+        """Run the task alone on its schedule. TaskOrchestrator schedules many tasks together."""
+        orchestrator = TaskOrchestrator()
+        orchestrator.add_task(self)
+        await orchestrator.run()
 
     @staticmethod
     def now():
@@ -60,12 +209,162 @@ class BaseTask(ABC):
 
 
 class TaskOrchestrator:
-    def __init__(self):
-        self.tasks = []
+    """
+    Runs tasks from a min-heap of next start times: the loop sleeps until the earliest start instead of polling.
+    A task never overlaps itself (a start that comes while it is still running is skipped), and at most
+    `max_concurrency` tasks execute at once. Each task runs through the worker of its placement.
+    Tasks with `after` dependencies are not timed: they run once each time all their upstream tasks have completed
+    successfully since their last run. Tasks with a data trigger run on its check interval only if it has new data.
+    """
+    def __init__(self, max_concurrency: Optional[int] = None, metrics_config: Optional[Dict[str, str]] = None):
+        """
+        :param metrics_config: {"format": "prometheus" | "sqlite", "path": ...} to export the metrics after each run.
+        """
+        self.tasks: List[BaseTask] = []
+        self.max_concurrency = max_concurrency
+        self.metrics_config = metrics_config
+        self._running: Dict[str, asyncio.Task] = {}
+        self._workers: Dict[str, Any] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._completed_upstreams: Dict[str, Set[str]] = {}
+        self._queued: Set[str] = set()
 
     def add_task(self, task: BaseTask):
         self.tasks.append(task)
 
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Run count, failures, skipped starts, durations and lateness (start delay past schedule) per task."""
+        return {task.name: {**task.run_metrics,
+                            "avg_duration": task.run_metrics["total_duration"] / task.run_metrics["runs"]
+                            if task.run_metrics["runs"] else None}
+                for task in self.tasks}
+
+    def publish_metrics(self):
+        """Publish the scheduling metrics of every task as task_schedule_* gauges of the metrics registry."""
+        for name, task_metrics in self.get_metrics().items():
+            for key, value in task_metrics.items():
+                if value is not None:
+                    metrics.set_gauge(f"task_schedule_{key}", value, task=name)
+
+    def export_metrics(self):
+        self.publish_metrics()
+        if not self.metrics_config:
+            return
+        try:
+            metrics.export(self.metrics_config.get("format", "prometheus"), self.metrics_config["path"])
+        except Exception as e:
+            logger.info(f" Error exporting metrics: {e}")
+
+    def validate_dependencies(self):
+        """Check that every upstream exists and that the dependency graph has no cycle."""
+        names = {task.name for task in self.tasks}
+        upstreams = {task.name: set(task.after) for task in self.tasks}
+        for name, after in upstreams.items():
+            missing = after - names
+            if missing:
+                raise ValueError(f"Task {name} depends on unknown or disabled tasks {sorted(missing)}")
+        resolved: Set[str] = set()
+        while len(resolved) < len(upstreams):
+            ready = {name for name, after in upstreams.items() if name not in resolved and after <= resolved}
+            if not ready:
+                raise ValueError(f"Dependency cycle between tasks {sorted(set(upstreams) - resolved)}")
+            resolved |= ready
+
     async def run(self):
-        task_coroutines = [task.run_with_frequency() for task in self.tasks]
-        await asyncio.gather(*task_coroutines)
+        try:
+            await self.schedule()
+        finally:
+            self.close()
+            await close_transport()
+
+    def close(self):
+        """Stop the workers, also registered at exit so subprocess workers never outlive the orchestrator."""
+        atexit.unregister(self.close)
+        workers, self._workers = self._workers, {}
+        for worker in workers.values():
+            worker.close()
+
+    async def schedule(self):
+        self.validate_dependencies()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        atexit.register(self.close)
+        for task in self.tasks:
+            self._workers[task.name] = create_worker(task)
+            self._completed_upstreams[task.name] = set()
+        now = time.time()
+        heap = []
+        for i, task in enumerate(self.tasks):
+            if task.after:
+                continue
+            scheduled = task.next_run_time(None, now)
+            heapq.heappush(heap, (scheduled + random.uniform(0, task.jitter), scheduled, i))
+
+        while heap:
+            start_at, scheduled, i = heapq.heappop(heap)
+            task = self.tasks[i]
+            delay = start_at - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if not self.launch(task, start_at) and task.trigger is None:
+                task.run_metrics["skipped"] += 1
+                metrics.count("task_skipped_starts", task=task.name)
+                logger.info(f"Skipping {task.name} start, previous run still in progress")
+            next_scheduled = task.next_run_time(scheduled, time.time())
+            heapq.heappush(heap, (next_scheduled + random.uniform(0, task.jitter), next_scheduled, i))
+
+    def launch(self, task: BaseTask, start_at: float) -> bool:
+        running = self._running.get(task.name)
+        if running is not None and not running.done():
+            return False
+        self._running[task.name] = asyncio.create_task(self.run_task(task, start_at))
+        return True
+
+    def notify_completion(self, upstream: BaseTask):
+        """Start, or queue behind their current run, the dependents whose upstreams have all completed."""
+        for task in self.tasks:
+            if upstream.name not in task.after:
+                continue
+            completed = self._completed_upstreams[task.name]
+            completed.add(upstream.name)
+            if completed >= set(task.after):
+                completed.clear()
+                if not self.launch(task, time.time()):
+                    self._queued.add(task.name)
+
+    async def run_task(self, task: BaseTask, start_at: float):
+        marker = None
+        if task.trigger is not None:
+            try:
+                marker = await task.trigger.get_marker()
+            except Exception as e:
+                logger.info(f" Error checking trigger of task {task.name}: {e}")
+                return
+            if marker is None or marker == task.trigger.last_marker:
+                return
+        if self._semaphore is not None:
+            await self._semaphore.acquire()
+        try:
+            start = time.time()
+            task.last_run = datetime.now()
+            failed = False
+            try:
+                await self._workers[task.name].run()
+            except Exception as e:
+                failed = True
+                logger.info(f" Error executing task {task.name}: {e}")
+            duration = time.time() - start
+            lateness = max(0.0, start - start_at)
+            task.record_run(duration, lateness, failed)
+            metrics.observe("task_lateness", lateness, task=task.name)
+            logger.info(f"Task {task.name} finished in {duration:.2f}s, started {start - start_at:.2f}s late")
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+        self.export_metrics()
+        if not failed:
+            if task.trigger is not None:
+                task.trigger.last_marker = marker
+            self.notify_completion(task)
+        if task.name in self._queued:
+            self._queued.discard(task.name)
+            self._running[task.name] = asyncio.create_task(self.run_task(task, time.time()))
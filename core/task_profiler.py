@@ -0,0 +1,116 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread from a background thread and aggregates it as folded stacks, the input format
+    of flamegraph.pl and speedscope. Sampling starts after `delay` seconds, so a run can be profiled only once it
+    is slower than expected. With `code` set, only stacks inside that function are kept: in a shared event loop
+    this drops the samples taken while other tasks' coroutines were running.
+    """
+    def __init__(self, thread_id: int, interval: float = 0.01, delay: float = 0.0, code: Optional[CodeType] = None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.delay = delay
+        self.code = code
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="task-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        if self._stop.wait(self.delay):
+            return
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            keep = self.code is None
+            while frame is not None:
+                code = frame.f_code
+                keep = keep or code is self.code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack and keep:
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class RunProfiler:
+    """
+    Per-task profiling policy, configured by the task's `profile` section:
+    mode "always" samples every run; mode "threshold" (default) starts sampling once a run lasts longer than
+    `threshold_seconds`, or `threshold_factor` times the average duration of the previous runs.
+    Folded stacks are written to `directory`/<task>/<start time>-<run>.folded, keeping the newest `keep` files and
+    none older than `max_age_days`.
+    """
+    def __init__(self, task_name: str, config: Dict[str, Any]):
+        self.task_name = task_name
+        self.mode = config.get("mode", "threshold")
+        self.interval = config.get("interval_ms", 10) / 1000
+        self.threshold_seconds = config.get("threshold_seconds")
+        self.threshold_factor = config.get("threshold_factor", 3.0)
+        self.directory = os.path.join(config.get("directory", os.path.join("logs", "profiles")), task_name)
+        self.keep = config.get("keep", 50)
+        self.max_age_days = config.get("max_age_days", 7)
+        self._runs = 0
+        self._average_duration = 0.0
+
+    def delay(self) -> Optional[float]:
+        """Seconds into the run before sampling starts, None to skip this run."""
+        if self.mode == "always":
+            return 0.0
+        if self.threshold_seconds is not None:
+            return self.threshold_seconds
+        if self._runs == 0:
+            return None
+        return self.threshold_factor * self._average_duration
+
+    def start(self, code: Optional[CodeType] = None) -> Optional[SamplingProfiler]:
+        delay = self.delay()
+        if delay is None:
+            return None
+        sampler = SamplingProfiler(threading.get_ident(), self.interval, delay, code)
+        sampler.start()
+        return sampler
+
+    def finish(self, sampler: Optional[SamplingProfiler], started: float, duration: float) -> Optional[str]:
+        self._runs += 1
+        self._average_duration += (duration - self._average_duration) / self._runs
+        if sampler is None:
+            return None
+        samples = sampler.stop()
+        if not samples:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        # Milliseconds and the run number keep runs started within the same second from overwriting each other.
+        file_name = f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime(started))}-{int(started % 1 * 1000):03d}-{self._runs}"
+        path = os.path.join(self.directory, file_name + ".folded")
+        with open(path, "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in samples.most_common())
+        logger.info(f"Profile of {self.task_name} ({duration:.2f}s, {sum(samples.values())} samples) "
+                    f"written to {path}")
+        self.apply_retention()
+        return path
+
+    def apply_retention(self):
+        profiles = sorted((entry for entry in os.scandir(self.directory) if entry.name.endswith(".folded")),
+                          key=lambda entry: entry.stat().st_mtime, reverse=True)
+        cutoff = time.time() - self.max_age_days * 24 * 60 * 60
+        for i, entry in enumerate(profiles):
+            if i >= self.keep or entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
@@ -1,23 +1,30 @@
 import importlib
 import logging
 import os
+import subprocess
+import sys
+import time
 from datetime import timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 
 import yaml
 from dotenv import load_dotenv
 
 from core.task_base import TaskOrchestrator, BaseTask
+from core.task_triggers import create_trigger
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class TaskRunner:
-    def __init__(self, config_path: str = "config/tasks.yml"):
+    def __init__(self, config_path: str = "config/tasks.yml", profile_startup: bool = False):
         load_dotenv()
         self.config_path = config_path
-        self.orchestrator = TaskOrchestrator()
+        self.profile_startup = profile_startup
+        self.startup_timings: List[Dict[str, Any]] = []
         self.tasks_config = self.load_config()
+        self.orchestrator = TaskOrchestrator(max_concurrency=self.tasks_config.get("max_concurrency"),
+                                             metrics_config=self.tasks_config.get("metrics"))
 
     def load_config(self) -> Dict[str, Any]:
         """Load task configuration from YAML file"""
@@ -42,7 +49,8 @@ class TaskRunner:
                 "port": int(os.getenv("TIMESCALE_PORT", "5432")),
                 "user": os.getenv("TIMESCALE_USER", "admin"),
                 "password": os.getenv("TIMESCALE_PASSWORD", "admin"),
-                "database": os.getenv("TIMESCALE_DB", "timescaledb")
+                "database": os.getenv("TIMESCALE_DB", "timescaledb"),
+                "consolidated": os.getenv("TIMESCALE_CONSOLIDATED", "false").lower() == "true"
             },
             "mongo_config": {
                 "uri": os.getenv("MONGO_URI"),
@@ -62,19 +70,32 @@ class TaskRunner:
 
             try:
                 # Import task class
+                import_start = time.perf_counter()
                 task_class = self.import_task_class(task_config["task_class"])
+                import_time = time.perf_counter() - import_start
                 
                 # Merge common config with task-specific config
                 config = {**common_config, **task_config.get("config", {})}
                 
                 # Create task instance
+                init_start = time.perf_counter()
                 task = task_class(
                     name=task_name,
-                    frequency=timedelta(hours=task_config["frequency_hours"]),
+                    frequency=timedelta(hours=task_config.get("frequency_hours", 1)),
                     config=config
                 )
+                task.set_schedule(cron=task_config.get("schedule"), jitter=task_config.get("jitter_seconds", 0.0))
+                task.set_placement(task_config.get("placement", "loop"))
+                task.set_profiling(task_config.get("profile"))
+                trigger_config = task_config.get("trigger")
+                task.set_dependencies(
+                    after=task_config.get("after"),
+                    trigger=create_trigger(trigger_config, common_config) if trigger_config else None)
+                init_time = time.perf_counter() - init_start
                 tasks.append(task)
-                logger.info(f"Initialized task: {task_name}")
+                self.startup_timings.append({"task": task_name, "task_class": task_config["task_class"],
+                                             "import_seconds": import_time, "init_seconds": init_time})
+                logger.info(f"Initialized task: {task_name} (import {import_time:.2f}s, init {init_time:.2f}s)")
 
             except Exception as e:
                 logger.error(f"Error initializing task {task_name}: {e}")
@@ -82,10 +103,42 @@ class TaskRunner:
 
         return tasks
 
+    @staticmethod
+    def profile_module_imports(module_path: str, top: int = 15) -> List[Tuple[str, float, float]]:
+        """
+        Import a module in a fresh interpreter with -X importtime and return its most expensive imports
+        as (module, self seconds, cumulative seconds), sorted by cumulative time.
+        """
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_path}"],
+                                capture_output=True, text=True)
+        timings = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            self_us, cumulative_us, module = line[len("import time:"):].split("|")
+            timings.append((module.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+        return sorted(timings, key=lambda timing: timing[2], reverse=True)[:top]
+
+    def report_startup(self, top: int = 15):
+        """Log the import and init time of every task and the heaviest imports of each task module."""
+        for timing in self.startup_timings:
+            module_path = timing["task_class"].rsplit(".", 1)[0]
+            lines = [f"{module:<60} {self_time:>8.3f} {cumulative:>8.3f}"
+                     for module, self_time, cumulative in self.profile_module_imports(module_path, top)]
+            logger.info(f"Startup of {timing['task']}: import {timing['import_seconds']:.3f}s, "
+                        f"init {timing['init_seconds']:.3f}s\n"
+                        f"Heaviest imports of {module_path} in a fresh interpreter (self s, cumulative s):\n"
+                        + "\n".join(lines))
+        total = sum(timing["import_seconds"] + timing["init_seconds"] for timing in self.startup_timings)
+        logger.info(f"Total startup: {total:.3f}s for {len(self.startup_timings)} tasks")
+
     async def run(self):
         """Run all configured tasks"""
         try:
             tasks = self.initialize_tasks()
+            if self.profile_startup:
+                self.report_startup()
+                return
             for task in tasks:
                 self.orchestrator.add_task(task)
             
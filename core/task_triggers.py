@@ -0,0 +1,75 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+
+class DataTrigger(ABC):
+    """
+    Data-availability condition of a task: a marker (latest timestamp, latest document...) checked every
+    `check_seconds`. The task runs only when the marker differs from the one seen by its last successful run.
+    """
+    def __init__(self, check_seconds: float = 60):
+        self.check_seconds = check_seconds
+        self.last_marker = None
+
+    @abstractmethod
+    async def get_marker(self) -> Optional[Any]:
+        ...
+
+
+class TimescaleTrigger(DataTrigger):
+    """Fires on a new MAX(column) of a Timescale table, e.g. the end_time of market_data_catalog."""
+    def __init__(self, timescale_config: Dict[str, Any], table: str, column: str = "timestamp",
+                 where: Optional[str] = None, check_seconds: float = 60):
+        super().__init__(check_seconds)
+        self.timescale_config = timescale_config
+        self.table = table
+        self.column = column
+        self.where = where
+        self.client = None
+
+    async def get_marker(self) -> Optional[Any]:
+        if self.client is None:
+            from core.services.timescale_client import TimescaleClient
+            client = TimescaleClient(**self.timescale_config)
+            await client.connect()
+            self.client = client
+        async with self.client.pool.acquire() as conn:
+            return await conn.fetchval(f'''
+                SELECT MAX({self.column}) FROM {self.table}{f" WHERE {self.where}" if self.where else ""}
+            ''')
+
+
+class MongoTrigger(DataTrigger):
+    """Fires on a new latest value of a field in a Mongo collection, e.g. the timestamp of cointegration_results."""
+    def __init__(self, mongo_config: Dict[str, Any], collection: str, field: str = "timestamp",
+                 query: Optional[Dict[str, Any]] = None, db_name: Optional[str] = None, check_seconds: float = 60):
+        super().__init__(check_seconds)
+        self.mongo_config = mongo_config
+        self.collection = collection
+        self.field = field
+        self.query = query
+        self.db_name = db_name
+        self.client = None
+
+    async def get_marker(self) -> Optional[Any]:
+        if self.client is None:
+            from core.services.mongodb_client import MongoClient
+            client = MongoClient(uri=self.mongo_config["uri"], database=self.mongo_config.get("db") or "mongodb")
+            await client.connect()
+            self.client = client
+        return await self.client.get_latest_value(self.collection, field=self.field, query=self.query,
+                                                  db_name=self.db_name)
+
+
+def create_trigger(trigger_config: Dict[str, Any], common_config: Dict[str, Any]) -> DataTrigger:
+    """Build a trigger from a task's `trigger` YAML section, using the common Timescale/Mongo connection settings."""
+    trigger_config = dict(trigger_config)
+    trigger_type = trigger_config.pop("type")
+    if trigger_type == "timescale":
+        timescale_config = {key: common_config["timescale_config"][key]
+                            for key in ["host", "port", "user", "password", "database", "consolidated"]
+                            if key in common_config["timescale_config"]}
+        return TimescaleTrigger(timescale_config, **trigger_config)
+    if trigger_type == "mongo":
+        return MongoTrigger(common_config["mongo_config"], **trigger_config)
+    raise ValueError(f"Unknown trigger type {trigger_type}, expected timescale or mongo")
@@ -0,0 +1,149 @@
+import asyncio
+import importlib
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import threading
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from core.instrumentation import metrics
+from core.services.http_transport import close_transport
+
+logger = logging.getLogger(__name__)
+
+PLACEMENTS = ["loop", "thread", "process"]
+
+
+class LoopWorker:
+    """Runs the task in the orchestrator event loop."""
+    def __init__(self, task):
+        self.task = task
+
+    async def run(self):
+        await self.task.run_instrumented()
+
+    def close(self):
+        pass
+
+
+class ThreadWorker:
+    """
+    Runs the task in its own thread and event loop, so CPU-bound code does not block the orchestrator loop.
+    The loop persists across runs, keeping clients created by the task bound to it.
+    """
+    def __init__(self, task):
+        self.task = task
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name=f"task-{task.name}", daemon=True)
+        self.thread.start()
+
+    async def run(self):
+        await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self.task.run_instrumented(), self.loop))
+
+    def close(self):
+        try:
+            asyncio.run_coroutine_threadsafe(close_transport(), self.loop).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"Error closing HTTP sessions of task {self.task.name}: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def _process_main(task_class_path: str, name: str, frequency: timedelta, config: Dict[str, Any],
+                  profile_config: Optional[Dict[str, Any]], commands: multiprocessing.Queue,
+                  events: multiprocessing.Queue):
+    """Subprocess entry point: build the task, then execute it on every run command, reporting back over events."""
+    root_logger = logging.getLogger()
+    root_logger.handlers = [logging.handlers.QueueHandler(events)]
+    root_logger.setLevel(logging.INFO)
+    module_path, class_name = task_class_path.rsplit(".", 1)
+    task = getattr(importlib.import_module(module_path), class_name)(name=name, frequency=frequency, config=config)
+    task.set_profiling(profile_config)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    parent = multiprocessing.parent_process()
+    while True:
+        try:
+            command = commands.get(timeout=5)
+        except queue.Empty:
+            # Not a daemon process, so exit on our own if the orchestrator died without closing us
+            if parent is not None and not parent.is_alive():
+                break
+            continue
+        if command is None:
+            break
+        error = None
+        try:
+            loop.run_until_complete(task.run_instrumented())
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        events.put(("result", error, metrics.snapshot(reset=True)))
+    loop.run_until_complete(close_transport())
+
+
+class ProcessWorker:
+    """
+    Runs the task in a dedicated subprocess that rebuilds it from its class path and config. Run results, metrics
+    and log records come back over a queue; a subprocess that dies is restarted and the run in progress counts
+    as failed. The subprocess is not a daemon so the task can use its own process pools; it stops on close()
+    or when the orchestrator process exits.
+    """
+    context = multiprocessing.get_context("spawn")
+
+    def __init__(self, task):
+        self.task = task
+        self.process = None
+        self.start()
+
+    def start(self):
+        self.commands = self.context.Queue()
+        self.events = self.context.Queue()
+        self.process = self.context.Process(
+            target=_process_main, name=f"task-{self.task.name}", daemon=False,
+            args=(self.task.task_class_path, self.task.name, self.task.frequency, self.task.config,
+                  self.task.profile_config, self.commands, self.events))
+        self.process.start()
+        logger.info(f"Started process {self.process.pid} for task {self.task.name}")
+
+    async def run(self):
+        if not self.process.is_alive():
+            logger.warning(f"Process of task {self.task.name} exited with code {self.process.exitcode}, restarting")
+            self.start()
+        self.commands.put(True)
+        error = await asyncio.get_running_loop().run_in_executor(None, self.wait_result)
+        if error is not None:
+            raise RuntimeError(error)
+
+    def wait_result(self):
+        """Forward the subprocess log records until its run result arrives or the process dies."""
+        while True:
+            try:
+                event = self.events.get(timeout=1)
+            except queue.Empty:
+                if not self.process.is_alive():
+                    exitcode = self.process.exitcode
+                    self.start()
+                    return f"process exited with code {exitcode}"
+                continue
+            if isinstance(event, logging.LogRecord):
+                logging.getLogger(event.name).handle(event)
+            else:
+                _, error, snapshot = event
+                metrics.merge(snapshot)
+                return error
+
+    def close(self):
+        if self.process.is_alive():
+            self.commands.put(None)
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+
+
+def create_worker(task):
+    if task.placement == "thread":
+        return ThreadWorker(task)
+    if task.placement == "process":
+        return ProcessWorker(task)
+    return LoopWorker(task)
@@ -118,6 +118,9 @@ class StatArbPerformanceReport(PerformanceReport):
 
     async def build_trading_sessions(self) -> List[StatArbTradingSession]:
         trading_sessions = []
+        performance_df = self.update_performance_fields()
+        performance_by_group = self.pnl_engine.groups()
+        empty_df = performance_df.iloc[0:0]
         for controller in self.all_controllers:
             controller_id = controller["id"]
             session_id = controller["session_id"]
@@ -125,12 +128,8 @@ class StatArbPerformanceReport(PerformanceReport):
             try:
                 controller_config = controller["config"]
                 controller_config["id"] = controller_id
-                long_df = self.calculate_performance_fields(trades_df=self.all_trades_df,
-                                                            controller_id=controller_id,
-                                                            side=1)
-                short_df = self.calculate_performance_fields(trades_df=self.all_trades_df,
-                                                             controller_id=controller_id,
-                                                             side=2)
+                long_df = performance_by_group.get((controller_id, 1), empty_df)
+                short_df = performance_by_group.get((controller_id, 2), empty_df)
 
                 if len(long_df) > 0:
                     long_metrics = self.summarize_performance_metrics(long_df, controller_config, side=1)
@@ -190,14 +189,12 @@ class StatArbPerformanceReport(PerformanceReport):
                 "end_timestamp": end_timestamp,
                 "owner": self.owner,
                 "controller_name": self.controller_name,
-                "trading_session": session.to_serializable_dict(),
+                "trading_session": session.dict(),
                 "status": status
             }
             trading_sessions.append(session_dict)
         try:
-            await self.mongo_client.insert_documents(collection_name="trading_sessions",
-                                                     documents=trading_sessions,
-                                                     db_name="quants_lab")
+            await self.session_store.save(trading_sessions)
         except Exception as e:
             logging.error(f"Couldn't upload documents: {e}")
 
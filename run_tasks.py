@@ -7,11 +7,14 @@ def parse_args():
     parser.add_argument('--config', 
                        default='config/tasks.yml',
                        help='Path to tasks configuration file')
+    parser.add_argument('--profile-startup',
+                       action='store_true',
+                       help='Report per-task import and init time and the heaviest imports, then exit')
     return parser.parse_args()
 
 async def main():
     args = parse_args()
-    runner = TaskRunner(config_path=args.config)
+    runner = TaskRunner(config_path=args.config, profile_startup=args.profile_startup)
     await runner.run()
 
 if __name__ == "__main__":
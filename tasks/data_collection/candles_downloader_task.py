@@ -1,16 +1,18 @@
 import asyncio
 import logging
+import math
 import os
 import time
+from collections import deque
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Any, Dict
+from typing import Any, Deque, Dict, List, Tuple
 
 import pandas as pd
 from dotenv import load_dotenv
 
 from core.data_sources import CLOBDataSource
-from core.services.timescale_client import TimescaleClient
+from core.services.timescale_client import INTERVAL_SECONDS, TimescaleClient
 from core.task_base import BaseTask
 
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +20,101 @@ logging.getLogger("asyncio").setLevel(logging.CRITICAL)
 load_dotenv()
 
 
+class RequestWeightBudget:
+    """Sliding window of request weight shared by concurrent downloads, to stay under the exchange rate limit."""
+    def __init__(self, limit: float, time_interval: float):
+        self.limit = limit
+        self.time_interval = time_interval
+        self._spent: Deque[Tuple[float, float]] = deque()
+        self._used = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, weight: float):
+        weight = min(weight, self.limit)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._spent and self._spent[0][0] <= now - self.time_interval:
+                    self._used -= self._spent.popleft()[1]
+                if self._used + weight <= self.limit:
+                    self._spent.append((now, weight))
+                    self._used += weight
+                    return
+                await asyncio.sleep(self._spent[0][0] + self.time_interval - now)
+
+
+async def download_candles(clob: CLOBDataSource, timescale_client: TimescaleClient, connector_name: str,
+                           trading_pairs: List[str], intervals: List[str], start_time: float, end_time: float,
+                           days_data_retention: int, max_concurrency: int = 10, rate_limit_share: float = 0.8,
+                           writers: int = 2) -> Dict[str, int]:
+    """
+    Download and store the candles of every pair and interval. The last stored timestamps are read with one
+    batched query, downloads run concurrently within the candles endpoint's request weight budget and hand their
+    results to a few writers through a bounded queue, so inserts overlap with the next downloads.
+    """
+    try:
+        rate_limit = clob.get_candles_rate_limit(connector_name, intervals[0])
+    except Exception as e:
+        logging.warning(f"Rate limits of {connector_name} candles not available, using a conservative budget: {e}")
+        rate_limit = {"limit": 1200, "time_interval": 60, "weight": 1, "max_results_per_request": 500}
+    budget = RequestWeightBudget(rate_limit["limit"] * rate_limit_share, rate_limit["time_interval"])
+    last_timestamps = await timescale_client.get_last_candle_timestamps(connector_name, trading_pairs, intervals)
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    cutoff_timestamp = (today_start - timedelta(days=days_data_retention)).timestamp()
+    if timescale_client.consolidated:
+        await timescale_client.create_candles_table(timescale_client.candles_table_name)
+
+    stats = {"series": 0, "empty": 0, "errors": 0, "candles": 0}
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_concurrency * 2)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def download(trading_pair: str, interval: str):
+        series_start = last_timestamps.get((trading_pair, interval), start_time)
+        n_candles = (end_time - series_start) / INTERVAL_SECONDS.get(interval, 60)
+        n_requests = max(1, math.ceil(n_candles / rate_limit["max_results_per_request"]))
+        async with semaphore:
+            await budget.acquire(n_requests * rate_limit["weight"])
+            try:
+                candles = await clob.get_candles(connector_name, trading_pair, interval, int(series_start),
+                                                 int(end_time))
+            except Exception as e:
+                stats["errors"] += 1
+                logging.error(f"Error fetching candles for {trading_pair} {interval}:\n {e}")
+                return
+        if candles.data.empty:
+            stats["empty"] += 1
+            logging.info(f"No new candles for {trading_pair} {interval}")
+            return
+        await queue.put((trading_pair, interval, candles.data.values.tolist()))
+
+    async def write():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            trading_pair, interval, candles = item
+            try:
+                if not timescale_client.consolidated:
+                    await timescale_client.create_candles_table(
+                        timescale_client.get_ohlc_table_name(connector_name, trading_pair, interval))
+                stats["candles"] += await timescale_client.store_candles(connector_name, trading_pair, interval,
+                                                                         candles)
+                await timescale_client.delete_candles(connector_name=connector_name, trading_pair=trading_pair,
+                                                      interval=interval, timestamp=cutoff_timestamp)
+                stats["series"] += 1
+            except Exception as e:
+                stats["errors"] += 1
+                logging.exception(f"An error occurred storing candles for {trading_pair} {interval}:\n {e}")
+
+    writer_tasks = [asyncio.create_task(write()) for _ in range(writers)]
+    await asyncio.gather(*[download(trading_pair, interval)
+                           for trading_pair in trading_pairs for interval in intervals])
+    for _ in writer_tasks:
+        await queue.put(None)
+    await asyncio.gather(*writer_tasks)
+    return stats
+
+
 class CandlesDownloaderTask(BaseTask):
     def __init__(self, name: str, frequency: timedelta, config: Dict[str, Any]):
         super().__init__(name, frequency, config)
@@ -26,6 +123,8 @@ class CandlesDownloaderTask(BaseTask):
         self.intervals = config.get("intervals", ["1m"])
         self.quote_asset = config.get("quote_asset", "USDT")
         self.min_notional_size = Decimal(str(config.get("min_notional_size", 10.0)))
+        self.max_concurrency = config.get("max_concurrency", 10)
+        self.rate_limit_share = config.get("rate_limit_share", 0.8)
         self.clob = CLOBDataSource()
 
     async def execute(self):
@@ -43,47 +142,19 @@ class CandlesDownloaderTask(BaseTask):
             port=self.config["timescale_config"].get("db_port", 5432),
             user=self.config["timescale_config"].get("db_user", "admin"),
             password=self.config["timescale_config"].get("db_password", "admin"),
-            database=self.config["timescale_config"].get("db_name", "timescaledb")
+            database=self.config["timescale_config"].get("db_name", "timescaledb"),
+            consolidated=self.config["timescale_config"].get("consolidated", False)
         )
         await timescale_client.connect()
 
         trading_rules = await self.clob.get_trading_rules(self.connector_name)
         trading_pairs = trading_rules.get_all_trading_pairs()
-        for i, trading_pair in enumerate(trading_pairs):
-            for interval in self.intervals:
-                logging.info(f"{now} - Fetching candles for {trading_pair} [{i} from {len(trading_pairs)}]")
-                try:
-                    table_name = timescale_client.get_ohlc_table_name(self.connector_name, trading_pair, interval)
-                    await timescale_client.create_candles_table(table_name)
-                    last_candle_timestamp = await timescale_client.get_last_candle_timestamp(
-                        connector_name=self.connector_name,
-                        trading_pair=trading_pair,
-                        interval=interval)
-                    start_time = last_candle_timestamp if last_candle_timestamp else start_time
-                    candles = await self.clob.get_candles(
-                        self.connector_name,
-                        trading_pair,
-                        interval,
-                        int(start_time),
-                        int(end_time.timestamp()),
-                    )
-
-                    if candles.data.empty:
-                        logging.info(f"{now} - No new trades for {trading_pair}")
-                        continue
-
-                    await timescale_client.append_candles(table_name=table_name,
-                                                          candles=candles.data.values.tolist())
-                    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-                    cutoff_timestamp = (today_start - timedelta(days=self.days_data_retention)).timestamp()
-                    await timescale_client.delete_candles(connector_name=self.connector_name, trading_pair=trading_pair,
-                                                          interval=interval,
-                                                          timestamp=cutoff_timestamp)
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    logging.exception(
-                        f"{now} - An error occurred during the data load for trading pair {trading_pair}:\n {e}")
-                    continue
+        download_start = time.perf_counter()
+        stats = await download_candles(self.clob, timescale_client, self.connector_name, trading_pairs,
+                                       self.intervals, start_time, end_time.timestamp(), self.days_data_retention,
+                                       self.max_concurrency, self.rate_limit_share)
+        logging.info(f"{now} - Downloaded {len(trading_pairs)} pairs x {len(self.intervals)} intervals in "
+                     f"{time.perf_counter() - download_start:.2f}s: {stats}")
 
         await timescale_client.close()
 
@@ -2,13 +2,13 @@ import asyncio
 import logging
 import os
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import pandas as pd
 from dotenv import load_dotenv
 from pathlib import Path
 
-from core.services.timescale_client import TimescaleClient
+from core.services.timescale_client import CANDLES_COLUMNS, TimescaleClient
 from core.task_base import BaseTask
 
 logging.basicConfig(level=logging.INFO)
@@ -29,48 +29,58 @@ class LocalCacheExportTask(BaseTask):
             port=self.config["timescale_config"].get("port", 5432),
             user=self.config["timescale_config"].get("user", "admin"),
             password=self.config["timescale_config"].get("password", "admin"),
-            database=self.config["timescale_config"].get("database", "timescaledb")
+            database=self.config["timescale_config"].get("database", "timescaledb"),
+            consolidated=self.config["timescale_config"].get("consolidated", False)
         )
         await timescale_client.connect()
 
         available_candles = await timescale_client.get_available_candles()
+        pairs_by_interval: Dict[str, List[str]] = {}
         for connector_name, trading_pair, interval in available_candles:
             if connector_name != self.config["connector_name"] or trading_pair not in self.config["selected_pairs"]:
                 continue
+            pairs_by_interval.setdefault(interval, []).append(trading_pair)
+
+        for interval, trading_pairs in pairs_by_interval.items():
             now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f UTC")
-            logging.info(f"{now} - Exporting candles for {trading_pair} - {interval}")
+            logging.info(f"{now} - Exporting candles for {len(trading_pairs)} pairs - {interval}")
             try:
-                # Get all candles from the database
-                candles = await timescale_client.get_all_candles(
+                # Get all candles of the interval from the database at once
+                candles_by_pair = await timescale_client.get_candles_batch(
                     connector_name=self.config["connector_name"],
-                    trading_pair=trading_pair,
-                    interval=interval
-                )
-                candles_df: pd.DataFrame = candles.data
-                candles_df["timestamp"] = candles_df["timestamp"].apply(lambda x: x.timestamp())
-                candles_df.sort_values("timestamp", inplace=True)
-                if candles_df.empty:
-                    logging.info(f"{now} - No data found for {trading_pair} - {interval}")
-                    continue
-                filename = f"{self.config['connector_name']}|{trading_pair}|{interval}.parquet"
-
-                # Save to parquet with trading pair and interval in filename
-                filepath = self.output_dir / filename
-
-                # Save with compression
-                candles_df.to_parquet(
-                    filepath,
-                    engine='pyarrow',
-                    compression='snappy',
-                    index=True
+                    trading_pairs=trading_pairs,
+                    interval=interval,
+                    columns=CANDLES_COLUMNS
                 )
-
-                logging.info(f"{now} - Saved {len(candles_df)} candles to {filepath}")
-
             except Exception as e:
-                logging.exception(f"{now} - Error exporting {trading_pair} - {interval}: {e}")
+                logging.exception(f"{now} - Error exporting candles for {interval}: {e}")
                 continue
 
+            for trading_pair, candles in candles_by_pair.items():
+                try:
+                    candles_df: pd.DataFrame = candles.data
+                    if candles_df.empty:
+                        logging.info(f"{now} - No data found for {trading_pair} - {interval}")
+                        continue
+                    filename = f"{self.config['connector_name']}|{trading_pair}|{interval}.parquet"
+
+                    # Save to parquet with trading pair and interval in filename
+                    filepath = self.output_dir / filename
+
+                    # Save with compression
+                    candles_df.to_parquet(
+                        filepath,
+                        engine='pyarrow',
+                        compression='snappy',
+                        index=True
+                    )
+
+                    logging.info(f"{now} - Saved {len(candles_df)} candles to {filepath}")
+
+                except Exception as e:
+                    logging.exception(f"{now} - Error exporting {trading_pair} - {interval}: {e}")
+                    continue
+
         await timescale_client.close()
 
 
@@ -1,10 +1,14 @@
 import asyncio
+import io
 import json
 import logging
-from typing import Dict, Any
+import time
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
 import os
 from dotenv import load_dotenv
 from datetime import timedelta, datetime, timezone
@@ -16,11 +20,330 @@ logging.basicConfig(level=logging.INFO)
 load_dotenv()
 
 
+ATR_LENGTHS = {"24h": 24, "1w": 7 * 24}
+BB_WINDOWS = [50, 100, 200]
+GLOBAL_STATE_KEY = "global"
+STATE_VERSION = 2
+DAY = 24 * 60 * 60
+# Quantiles come from log-binned counts, within this relative error of the exact ones
+QUANTILE_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + QUANTILE_ACCURACY) / (1 - QUANTILE_ACCURACY)
+ZERO_BIN = np.iinfo(np.int64).min
+MOMENT_AGGREGATIONS = {"count": "sum", "sum": "sum", "sq": "sum", "min": "min", "max": "max"}
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray, prev_close: float) -> np.ndarray:
+    """True range as pandas_ta computes it: NaN for the first candle, which has no previous close."""
+    previous_close = np.concatenate([[prev_close], close[:-1]])
+    return np.maximum(high - low, np.maximum(np.abs(high - previous_close), np.abs(low - previous_close)))
+
+
+def _bb_width(closes: np.ndarray, window: int) -> np.ndarray:
+    """Bollinger bandwidth with 2 std bands, 100 * (upper - lower) / mid, as pandas_ta bbands computes it."""
+    rolling = pd.Series(closes).rolling(window)
+    return (100 * 4 * rolling.std(ddof=0) / rolling.mean()).to_numpy()
+
+
+def _extend_rma(rma: np.ndarray, true_range: np.ndarray, length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extend a Wilder moving average (ewm with alpha=1/length, as pandas_ta atr) kept as its weighted sum, sum of
+    weights and number of observations. Returns the ATR of each new candle and the new [sum, weights, observations].
+    """
+    weighted_sum, weights, observations = rma
+    alpha = 1 / length
+    decay = (1 - alpha) ** np.arange(1, len(true_range) + 1)
+    valid = ~np.isnan(true_range)
+    sums = weighted_sum * decay + np.nan_to_num(pd.Series(true_range).ewm(alpha=alpha).sum().to_numpy())
+    weight_sums = weights * decay + pd.Series(valid.astype(float)).ewm(alpha=alpha).sum().to_numpy()
+    observation_counts = observations + np.cumsum(valid)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        atr = np.where(observation_counts >= length, sums / weight_sums, np.nan)
+    return atr, np.array([sums[-1], weight_sums[-1], observation_counts[-1]], dtype=float)
+
+
+def _moment_columns(name: str, values: np.ndarray, shift: float) -> Dict[str, np.ndarray]:
+    """Per-candle columns whose daily aggregates give count, mean and std (shifted sums keep the std accurate)."""
+    valid = ~np.isnan(values)
+    shifted = np.where(valid, values - shift, 0.0)
+    return {f"{name}_count": valid.astype(np.int64), f"{name}_sum": shifted, f"{name}_sq": shifted ** 2,
+            f"{name}_min": values, f"{name}_max": values}
+
+
+def _moment_aggregations(name: str) -> Dict[str, str]:
+    return {f"{name}_{field}": aggregation for field, aggregation in MOMENT_AGGREGATIONS.items()}
+
+
+def _sketch(days: np.ndarray, values: np.ndarray) -> pd.DataFrame:
+    """Count of the values of each day per logarithmic bin, the mergeable summary the quantiles are read from."""
+    valid = ~np.isnan(values)
+    values = values[valid]
+    bins = np.full(len(values), ZERO_BIN, dtype=np.int64)
+    positive = values > 0
+    bins[positive] = np.ceil(np.log(values[positive]) / np.log(SKETCH_GAMMA)).astype(np.int64)
+    return pd.DataFrame({"day": days[valid], "bin": bins}).groupby(["day", "bin"], as_index=False).size() \
+        .rename(columns={"size": "count"})
+
+
+def _merge_daily(old: pd.DataFrame, new: pd.DataFrame, keys: List[str], aggregations: Dict[str, str]) -> pd.DataFrame:
+    """Append daily rows, combining the last stored day with the new rows of that same day."""
+    if old.empty:
+        return new.reset_index(drop=True)
+    overlap = old["day"] >= new["day"].min()
+    merged = pd.concat([old[overlap], new]).groupby(keys, as_index=False).agg(aggregations)
+    return pd.concat([old[~overlap], merged], ignore_index=True)
+
+
+def _empty_daily(aggregations: Dict[str, str]) -> pd.DataFrame:
+    return pd.DataFrame({"day": np.array([], dtype=np.int64),
+                         **{column: np.array([], dtype=float) for column in aggregations}})
+
+
+def _empty_sketch() -> pd.DataFrame:
+    return pd.DataFrame({column: np.array([], dtype=np.int64) for column in ["day", "bin", "count"]})
+
+
+def _describe(days: pd.DataFrame, sketch: pd.DataFrame, name: str, shift: float) -> Dict[str, float]:
+    """Series.describe() of a metric from its daily moments and binned counts."""
+    count = days[f"{name}_count"].sum()
+    stats = {"count": float(count), "mean": np.nan, "std": np.nan, "min": np.nan,
+             "25%": np.nan, "50%": np.nan, "75%": np.nan, "max": np.nan}
+    if not count:
+        return stats
+    shifted_sum = days[f"{name}_sum"].sum()
+    stats["mean"] = float(shift + shifted_sum / count)
+    if count > 1:
+        variance = (days[f"{name}_sq"].sum() - shifted_sum ** 2 / count) / (count - 1)
+        stats["std"] = float(np.sqrt(max(variance, 0.0)))
+    stats["min"] = float(days[f"{name}_min"].min())
+    stats["max"] = float(days[f"{name}_max"].max())
+    counts = sketch.groupby("bin")["count"].sum()
+    bins = counts.index.to_numpy()
+    is_zero = bins == ZERO_BIN
+    values = np.where(is_zero, 0.0, 2 * SKETCH_GAMMA ** np.where(is_zero, 0, bins) / (SKETCH_GAMMA + 1))
+    values = np.clip(values, stats["min"], stats["max"])
+    cumulative = np.cumsum(counts.to_numpy())
+    for quantile in (0.25, 0.5, 0.75):
+        # Linear interpolation between the order statistics around the rank, as pandas does
+        rank = (count - 1) * quantile
+        lower, upper = values[np.searchsorted(cumulative, [np.floor(rank), np.ceil(rank)], side="right")]
+        stats[f"{quantile:.0%}"] = float(lower + (rank - np.floor(rank)) * (upper - lower))
+    return stats
+
+
+def interval_aggregations() -> Dict[str, str]:
+    aggregations = {"first_timestamp": "min", "last_timestamp": "max"}
+    for name in ATR_LENGTHS:
+        aggregations.update(_moment_aggregations(f"natr_{name}"))
+    for window in BB_WINDOWS:
+        aggregations.update({f"bbb_{window}_sum": "sum", f"bbb_{window}_count": "sum"})
+    return aggregations
+
+
+def new_interval_state() -> Dict[str, Any]:
+    state = {
+        "prev_close": np.nan,
+        "close_tail": np.array([], dtype=float),
+        "days": _empty_daily(interval_aggregations()),
+    }
+    for name in ATR_LENGTHS:
+        state[f"rma_{name}"] = np.zeros(3)
+        state[f"natr_{name}_shift"] = np.nan
+        state[f"natr_{name}_sketch"] = _empty_sketch()
+    return state
+
+
+def update_interval_state(state: Dict[str, Any], candles_df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Extend the state of one pair and interval with candles newer than the ones it holds. The state is bounded:
+    the ATR moving averages, the closes the Bollinger windows need and, per day, the aggregates the NATR
+    statistics and the mean bandwidths are read from.
+    """
+    if candles_df.empty:
+        return state
+    timestamps = candles_df["timestamp"].to_numpy(dtype=float)
+    high, low, close = (candles_df[column].to_numpy(dtype=float) for column in ["high", "low", "close"])
+    days = (timestamps // DAY).astype(np.int64)
+    true_range = _true_range(high, low, close, state["prev_close"])
+    columns = {"day": days, "first_timestamp": timestamps, "last_timestamp": timestamps}
+    for name, length in ATR_LENGTHS.items():
+        atr, state[f"rma_{name}"] = _extend_rma(state[f"rma_{name}"], true_range, length)
+        natr = 100 * atr / close
+        if np.isnan(state[f"natr_{name}_shift"]) and (~np.isnan(natr)).any():
+            state[f"natr_{name}_shift"] = natr[~np.isnan(natr)][0]
+        columns.update(_moment_columns(f"natr_{name}", natr, state[f"natr_{name}_shift"]))
+        state[f"natr_{name}_sketch"] = _merge_daily(state[f"natr_{name}_sketch"], _sketch(days, natr),
+                                                    ["day", "bin"], {"count": "sum"})
+    extended_closes = np.concatenate([state["close_tail"], close])
+    for window in BB_WINDOWS:
+        bb_width = _bb_width(extended_closes, window)[-len(close):]
+        columns[f"bbb_{window}_sum"] = np.nan_to_num(bb_width)
+        columns[f"bbb_{window}_count"] = (~np.isnan(bb_width)).astype(np.int64)
+    aggregations = interval_aggregations()
+    state["days"] = _merge_daily(state["days"], pd.DataFrame(columns).groupby("day", as_index=False).agg(aggregations),
+                                 ["day"], aggregations)
+    state["prev_close"] = close[-1]
+    state["close_tail"] = extended_closes[-(max(BB_WINDOWS) - 1):]
+    return state
+
+
+def build_interval_state(candles_df: pd.DataFrame) -> Dict[str, Any]:
+    return update_interval_state(new_interval_state(), candles_df)
+
+
+GLOBAL_AGGREGATIONS = {"first_timestamp": "min", "last_timestamp": "max", "close_last": "last", "volume_sum": "sum",
+                       **_moment_aggregations("close")}
+
+
+def new_global_state() -> Dict[str, Any]:
+    return {
+        "close_shift": np.nan,
+        "days": _empty_daily(GLOBAL_AGGREGATIONS),
+        "close_sketch": _empty_sketch(),
+        "tail_timestamp": np.array([], dtype=float),
+        "tail_volume": np.array([], dtype=float),
+    }
+
+
+def update_global_state(state: Dict[str, Any], candles_df: pd.DataFrame) -> Dict[str, Any]:
+    """Extend the hourly state of a pair: daily close and volume aggregates plus the volume of the last 24h."""
+    if candles_df.empty:
+        return state
+    timestamps, close, volume = (candles_df[column].to_numpy(dtype=float)
+                                 for column in ["timestamp", "close", "volume"])
+    days = (timestamps // DAY).astype(np.int64)
+    if np.isnan(state["close_shift"]) and (~np.isnan(close)).any():
+        state["close_shift"] = close[~np.isnan(close)][0]
+    daily = pd.DataFrame({"day": days, "first_timestamp": timestamps, "last_timestamp": timestamps,
+                          "close_last": close, "volume_sum": volume,
+                          **_moment_columns("close", close, state["close_shift"])})
+    state["days"] = _merge_daily(state["days"], daily.groupby("day", as_index=False).agg(GLOBAL_AGGREGATIONS),
+                                 ["day"], GLOBAL_AGGREGATIONS)
+    state["close_sketch"] = _merge_daily(state["close_sketch"], _sketch(days, close), ["day", "bin"],
+                                         {"count": "sum"})
+    tail_timestamp = np.concatenate([state["tail_timestamp"], timestamps])
+    keep = tail_timestamp >= tail_timestamp[-1] - DAY
+    state["tail_timestamp"] = tail_timestamp[keep]
+    state["tail_volume"] = np.concatenate([state["tail_volume"], volume])[keep]
+    return state
+
+
+def build_global_state(candles_df: pd.DataFrame) -> Dict[str, Any]:
+    return update_global_state(new_global_state(), candles_df)
+
+
+def trim_state(state: Dict[str, Any], history_start: Optional[float]) -> Dict[str, Any]:
+    """
+    Drop the days older than the retained history, mirroring the database retention. Whole days are dropped, so
+    the statistics can include the part of the first day the database no longer holds.
+    """
+    if history_start is None:
+        return state
+    first_day = history_start // DAY
+    return {key: value[value["day"] >= first_day].reset_index(drop=True) if isinstance(value, pd.DataFrame) else value
+            for key, value in state.items()}
+
+
+def last_state_timestamp(state: Dict[str, Any]) -> Optional[float]:
+    return float(state["days"]["last_timestamp"].max()) if not state["days"].empty else None
+
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    """Serialize a state as typed numpy arrays (one per scalar, array and frame column) in an npz archive."""
+    arrays = {"version": np.array(STATE_VERSION)}
+    for key, value in state.items():
+        if isinstance(value, pd.DataFrame):
+            arrays[f"{key}.columns"] = np.array(value.columns, dtype=str)
+            arrays.update({f"{key}.{column}": value[column].to_numpy() for column in value.columns})
+        else:
+            arrays[key] = np.asarray(value)
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def decode_state(blob: bytes) -> Optional[Dict[str, Any]]:
+    """Load a state written by `encode_state`; None for unreadable or older snapshots, which are rebuilt."""
+    try:
+        with np.load(io.BytesIO(blob), allow_pickle=False) as archive:
+            arrays = {key: archive[key] for key in archive.files}
+    except (ValueError, OSError, zipfile.BadZipFile):
+        return None
+    if arrays.pop("version", None) != STATE_VERSION:
+        return None
+    frames = [key[:-len(".columns")] for key in arrays if key.endswith(".columns")]
+    state = {}
+    for frame in frames:
+        columns = arrays.pop(f"{frame}.columns")
+        state[frame] = pd.DataFrame({column: arrays.pop(f"{frame}.{column}") for column in columns})
+    for key, value in arrays.items():
+        state[key] = value.item() if value.ndim == 0 else value
+    return state
+
+
+def compute_pair_screener_metrics(connector_name: str, trading_pair: str, candles: Dict[str, pd.DataFrame],
+                                  states: Dict[str, Optional[Tuple[float, Dict[str, Any]]]],
+                                  history_starts: Dict[str, float], intervals: List[str],
+                                  interval_mapping: Dict[str, str]):
+    """
+    Compute all the screener metrics of one pair, updating each rolling state with the candles newer than its
+    snapshot or building it when there is none. Module level so it can run in a worker process.
+    Returns the screener row and the new (state_key, last_timestamp, encoded state) snapshots.
+    """
+    new_states = []
+    for state_key, interval in [(GLOBAL_STATE_KEY, "1h")] + [(interval, interval) for interval in intervals]:
+        candles_df = candles.get(interval)
+        snapshot = states.get(state_key)
+        if candles_df is None:
+            if snapshot is None:
+                continue
+            candles_df = pd.DataFrame(columns=["timestamp", "open", "high", "low", "close", "volume"])
+        if snapshot is None:
+            state = build_global_state(candles_df) if state_key == GLOBAL_STATE_KEY \
+                else build_interval_state(candles_df)
+        else:
+            last_timestamp, state = snapshot
+            new_candles = candles_df[candles_df["timestamp"] > last_timestamp]
+            state = update_global_state(state, new_candles) if state_key == GLOBAL_STATE_KEY \
+                else update_interval_state(state, new_candles)
+        state = trim_state(state, history_starts.get(interval))
+        last_timestamp = last_state_timestamp(state)
+        if last_timestamp is not None:
+            new_states.append((state_key, last_timestamp, state))
+
+    states_by_key = {state_key: state for state_key, _, state in new_states}
+    screener_metrics = MarketScreenerTask.global_metrics_from_state(
+        state=states_by_key[GLOBAL_STATE_KEY],
+        connector_name=connector_name,
+        trading_pair=trading_pair
+    )
+    for mapped_interval in interval_mapping.values():
+        screener_metrics[mapped_interval] = {}
+    for selected_interval in intervals:
+        if selected_interval in states_by_key:
+            screener_metrics[interval_mapping[selected_interval]] = \
+                MarketScreenerTask.interval_metrics_from_state(states_by_key[selected_interval])
+    screener_metrics = {key: json.dumps(value) if isinstance(value, dict) else value
+                        for key, value in screener_metrics.items()}
+    snapshots = [(state_key, last_timestamp, encode_state(state)) for state_key, last_timestamp, state in new_states]
+    return screener_metrics, snapshots
+
+
 class MarketScreenerTask(BaseTask):
     def __init__(self, name: str, frequency: timedelta, config: Dict[str, Any], ts_client: TimescaleClient = None):
         super().__init__(name, frequency, config)
-        self.ts_client = ts_client or TimescaleClient(os.getenv("TIMESCALE_HOST", "localhost"))
+        timescale_config = self.config.get("timescale_config", {})
+        self.ts_client = ts_client or TimescaleClient(
+            host=timescale_config.get("db_host", os.getenv("TIMESCALE_HOST", "localhost")),
+            port=timescale_config.get("db_port", 5432),
+            user=timescale_config.get("db_user", "admin"),
+            password=timescale_config.get("db_password", "admin"),
+            database=timescale_config.get("db_name", "timescaledb"),
+            consolidated=timescale_config.get("consolidated", False)
+        )
         self.intervals = self.config["intervals"]
+        self.batch_size = self.config.get("batch_size", 50)
+        self.max_workers = self.config.get("max_workers", os.cpu_count())
+        self.full_rebuild = self.config.get("full_rebuild", False)
         self.interval_mapping = {
             "1m": "one_min",
             "3m": "three_min",
@@ -33,101 +356,171 @@ class MarketScreenerTask(BaseTask):
         try:
             await self.ts_client.connect()
             available_pairs = await self.ts_client.get_available_pairs()
-
+            pairs_by_connector: Dict[str, List[str]] = {}
             for connector_name, trading_pair in available_pairs:
-                await self.process_pair(connector_name, trading_pair)
+                pairs_by_connector.setdefault(connector_name, []).append(trading_pair)
+            catalog = await self.ts_client.get_catalog("candles")
+            history_starts = {(row.connector_name, row.trading_pair, row.candle_interval): row.start_time.timestamp()
+                              for row in catalog.itertuples() if row.start_time is not None}
+
+            start = time.perf_counter()
+            screener_metrics = []
+            snapshots = []
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                for connector_name, trading_pairs in pairs_by_connector.items():
+                    for i in range(0, len(trading_pairs), self.batch_size):
+                        batch = trading_pairs[i:i + self.batch_size]
+                        batch_metrics, batch_snapshots = await self.process_pairs(executor, connector_name, batch,
+                                                                                  history_starts)
+                        screener_metrics.extend(batch_metrics)
+                        snapshots.extend(batch_snapshots)
+
+            await self.ts_client.append_screener_metrics_batch(screener_metrics)
+            await self.ts_client.upsert_screener_states(snapshots)
+            elapsed = time.perf_counter() - start
+            logging.info(f"{self.now()} - Screened {len(screener_metrics)} of {len(available_pairs)} pairs in "
+                         f"{elapsed:.2f}s ({len(available_pairs) / elapsed if elapsed else 0:.2f} pairs/sec)"
+                         f"{' with a full rebuild' if self.full_rebuild else ''}")
+            self.full_rebuild = self.config.get("full_rebuild", False)
 
         except ConnectionError as e:
             logging.exception(f"{self.now()} - Database connection failed\n {e}")
         except Exception as e:
             logging.exception(f"{self.now()} - Unexpected error during execution\n {e}")
 
-    async def process_pair(self, connector_name, trading_pair):
-        """Process metrics for a single trading pair."""
-        try:
-            candles = await self.ts_client.get_candles(connector_name, trading_pair, interval="1h")
-            screener_metrics = self.calculate_global_screener_metrics(
-                candles_df=candles.data,
-                connector_name=connector_name,
-                trading_pair=trading_pair
-            )
-
-            interval_screener_metrics = await self.calculate_interval_metrics(connector_name, trading_pair)
-            screener_metrics.update(interval_screener_metrics)
-            screener_metrics = {key: json.dumps(value) if isinstance(value, dict) else value for key, value in screener_metrics.items()}
+    async def rebuild(self):
+        """Recompute every metric and snapshot from the full history on the next run."""
+        self.full_rebuild = True
+        await self.execute()
 
-            await self.ts_client.append_screener_metrics(screener_metrics)
-
-        except (ValueError, TypeError) as e:
-            logging.exception(f"{self.now()} - Error calculating metrics for {trading_pair}\n {e}")
-        except Exception as e:
-            logging.exception(f"{self.now()} - Unexpected error processing pair {trading_pair}\n {e}")
-
-    async def calculate_interval_metrics(self, connector_name, trading_pair):
-        """Calculate metrics for each selected interval."""
-        interval_screener_metrics = {}
+    async def process_pairs(self, executor: Executor, connector_name: str, trading_pairs: List[str],
+                            history_starts: Dict[Tuple[str, str, str], float]):
+        """
+        Load only the candles newer than each pair's snapshots (the full history for pairs without one), in one
+        bulk query per interval, and update the metrics in the worker pool.
+        """
+        states = {}
+        if not self.full_rebuild:
+            for key, (last_timestamp, blob) in (await self.ts_client.get_screener_states(connector_name,
+                                                                                          trading_pairs)).items():
+                state = decode_state(blob)
+                if state is not None:
+                    states[key] = (last_timestamp, state)
+        state_keys_by_interval = {"1h": [GLOBAL_STATE_KEY]}
         for selected_interval in self.intervals:
-            mapped_interval = self.interval_mapping[selected_interval]
+            state_keys_by_interval.setdefault(selected_interval, []).append(selected_interval)
+
+        candles: Dict[str, Dict[str, pd.DataFrame]] = {trading_pair: {} for trading_pair in trading_pairs}
+        for interval, state_keys in state_keys_by_interval.items():
+            last_timestamps = {
+                trading_pair: min((states[(trading_pair, key)][0] if (trading_pair, key) in states else None
+                                   for key in state_keys), key=lambda value: -1 if value is None else value)
+                for trading_pair in trading_pairs
+            }
+            full_pairs = [pair for pair, last_timestamp in last_timestamps.items() if last_timestamp is None]
+            incremental_pairs = [pair for pair, last_timestamp in last_timestamps.items() if last_timestamp is not None]
             try:
-                candles = await self.ts_client.get_candles(connector_name, trading_pair, interval=selected_interval)
-                interval_screener_metrics[mapped_interval] = self.calculate_interval_screener_metrics(candles.data)
+                if full_pairs:
+                    for trading_pair, pair_candles in (await self.ts_client.get_candles_batch(
+                            connector_name, full_pairs, interval=interval)).items():
+                        candles[trading_pair][interval] = pair_candles.data
+                if incremental_pairs:
+                    # Snapshots are trimmed to the retained history, so series outside the catalog look it up.
+                    for trading_pair in incremental_pairs:
+                        if (connector_name, trading_pair, interval) not in history_starts:
+                            history_start = await self.ts_client.get_candles_start(connector_name, trading_pair,
+                                                                                   interval)
+                            if history_start is not None:
+                                history_starts[(connector_name, trading_pair, interval)] = history_start
+                    start_time = min(last_timestamps[pair] for pair in incremental_pairs)
+                    for trading_pair, pair_candles in (await self.ts_client.get_candles_batch(
+                            connector_name, incremental_pairs, interval=interval, start_time=start_time)).items():
+                        candles[trading_pair][interval] = pair_candles.data
             except Exception as e:
-                logging.exception(
-                    f"{self.now()} - Error processing interval {selected_interval} for {trading_pair}\n {e}")
-                interval_screener_metrics[mapped_interval] = {}
-        return interval_screener_metrics
+                logging.exception(f"{self.now()} - Error loading interval {interval} for {connector_name}\n {e}")
 
-    def calculate_global_screener_metrics(self, candles_df: pd.DataFrame, connector_name: str, trading_pair: str):
-        df = candles_df.copy()
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s")
-        df = df.set_index("timestamp")
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(
+                executor, compute_pair_screener_metrics, connector_name, trading_pair, candles[trading_pair],
+                {key: states.get((trading_pair, key)) for key in [GLOBAL_STATE_KEY] + self.intervals},
+                {interval: history_starts.get((connector_name, trading_pair, interval))
+                 for interval in state_keys_by_interval},
+                self.intervals, self.interval_mapping)
+            for trading_pair in trading_pairs
+        ]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        screener_metrics = []
+        snapshots = []
+        for trading_pair, result in zip(trading_pairs, results):
+            if isinstance(result, Exception):
+                logging.error(f"{self.now()} - Error calculating metrics for {trading_pair}\n {result}")
+                continue
+            pair_metrics, pair_snapshots = result
+            screener_metrics.append(pair_metrics)
+            snapshots.extend((connector_name, trading_pair, state_key, last_timestamp, blob)
+                             for state_key, last_timestamp, blob in pair_snapshots)
+        return screener_metrics, snapshots
+
+    @staticmethod
+    def calculate_global_screener_metrics(candles_df: pd.DataFrame, connector_name: str, trading_pair: str):
+        return MarketScreenerTask.global_metrics_from_state(build_global_state(candles_df), connector_name,
+                                                            trading_pair)
+
+    @staticmethod
+    def global_metrics_from_state(state: Dict[str, Any], connector_name: str, trading_pair: str):
+        days = state["days"]
 
         # 1. Price Analysis
         # Describe price statistics
         global_metrics = {
             "connector_name": connector_name,
             "trading_pair": trading_pair,
-            "start_time": df.index.min().tz_localize("UTC"),  # or your desired timezone
-            "end_time": df.index.max().tz_localize("UTC"),
-            "price": df["close"].describe().to_dict()}
+            "start_time": pd.Timestamp(days["first_timestamp"].min(), unit="s", tz="UTC"),
+            "end_time": pd.Timestamp(days["last_timestamp"].max(), unit="s", tz="UTC"),
+            "price": _describe(days, state["close_sketch"], "close", state["close_shift"])}
 
         # Price Change Over Periods (% CBO 24h, 1w, 1m)
-        price_resampled = df['close'].resample('1d').last()  # Daily resampling for consistent periods
+        # Daily series over every calendar day, like a 1d resample of the candles
+        calendar = pd.RangeIndex(days["day"].min(), days["day"].max() + 1)
+        daily = days.set_index("day")
+        price_resampled = daily["close_last"].reindex(calendar)
         global_metrics['price_cbo'] = {
-            '24h': self.percent_change(price_resampled, 1),
-            '1w': self.percent_change(price_resampled, 7),
-            '1m': self.percent_change(price_resampled, 28)
+            '24h': MarketScreenerTask.percent_change(price_resampled, 1),
+            '1w': MarketScreenerTask.percent_change(price_resampled, 7),
+            '1m': MarketScreenerTask.percent_change(price_resampled, 28)
         }
 
         # 2. Volume Analysis
         # 24h Volume USD
-        last_24h = df.loc[df.index >= (df.index[-1] - timedelta(hours=24)), 'volume'].sum()
-        global_metrics['volume_24h'] = last_24h
+        global_metrics['volume_24h'] = state["tail_volume"].sum()
 
         # Volume % CBO for Different Periods
-        volume_resampled = df['volume'].resample('1d').sum()
+        volume_resampled = daily["volume_sum"].reindex(calendar, fill_value=0)
         global_metrics['volume_cbo'] = {
-            '24h': self.percent_change(volume_resampled, 1),
-            '1w': self.percent_change(volume_resampled, 7),
-            '1m': self.percent_change(volume_resampled, 30)
+            '24h': MarketScreenerTask.percent_change(volume_resampled, 1),
+            '1w': MarketScreenerTask.percent_change(volume_resampled, 7),
+            '1m': MarketScreenerTask.percent_change(volume_resampled, 30)
         }
         return global_metrics
 
     @staticmethod
     def calculate_interval_screener_metrics(candles_df: pd.DataFrame):
-        interval_metrics = {}
+        return MarketScreenerTask.interval_metrics_from_state(build_interval_state(candles_df))
 
-        df = candles_df.copy()
-        df['atr_24h'] = ta.atr(df['high'], df['low'], df['close'], length=24)
-        df['atr_1w'] = ta.atr(df['high'], df['low'], df['close'], length=7 * 24)
-        df['natr_24h'] = ta.natr(df['high'], df['low'], df['close'], length=24)
-        df['natr_1w'] = ta.natr(df['high'], df['low'], df['close'], length=7 * 24)
-        interval_metrics['natr'] = df[['natr_24h', 'natr_1w']].describe().to_dict()
+    @staticmethod
+    def interval_metrics_from_state(state: Dict[str, Any]):
+        interval_metrics = {}
+        days = state["days"]
+        interval_metrics['natr'] = {
+            f"natr_{name}": _describe(days, state[f"natr_{name}_sketch"], f"natr_{name}", state[f"natr_{name}_shift"])
+            for name in ATR_LENGTHS
+        }
 
         # Bollinger Bands Width (50, 100, 200 / 2.0)
-        for window in [50, 100, 200]:
-            bb = ta.bbands(df['close'], length=window, std=2)
-            interval_metrics[f'bb_width_{window}'] = bb[f'BBB_{window}_2.0'].mean() / 200
+        for window in BB_WINDOWS:
+            count = days[f"bbb_{window}_count"].sum()
+            interval_metrics[f'bb_width_{window}'] = days[f"bbb_{window}_sum"].sum() / count / 200 if count else np.nan
         return interval_metrics
 
     @staticmethod
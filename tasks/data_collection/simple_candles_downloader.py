@@ -3,7 +3,6 @@ import logging
 import os
 import time
 from datetime import datetime, timedelta, timezone
-from decimal import Decimal
 from typing import Any, Dict
 
 import pandas as pd
@@ -12,6 +11,7 @@ from dotenv import load_dotenv
 from core.data_sources import CLOBDataSource
 from core.services.timescale_client import TimescaleClient
 from core.task_base import BaseTask
+from tasks.data_collection.candles_downloader_task import download_candles
 
 logging.basicConfig(level=logging.INFO)
 logging.getLogger("asyncio").setLevel(logging.CRITICAL)
@@ -25,12 +25,15 @@ class SimpleCandlesDownloader(BaseTask):
         self.days_data_retention = config.get("days_data_retention", 7)
         self.intervals = config.get("intervals", ["1m"])
         self.trading_pairs = config.get("trading_pairs", ["BTC-USDT"])
+        self.max_concurrency = config.get("max_concurrency", 10)
+        self.rate_limit_share = config.get("rate_limit_share", 0.8)
         self.timescale_client = TimescaleClient(
             host=self.config["timescale_config"].get("db_host", "localhost"),
             port=self.config["timescale_config"].get("db_port", 5432),
             user=self.config["timescale_config"].get("db_user", "admin"),
             password=self.config["timescale_config"].get("db_password", "admin"),
-            database=self.config["timescale_config"].get("db_name", "timescaledb")
+            database=self.config["timescale_config"].get("db_name", "timescaledb"),
+            consolidated=self.config["timescale_config"].get("consolidated", False)
         )
 
     async def execute(self):
@@ -44,48 +47,12 @@ class SimpleCandlesDownloader(BaseTask):
 
 
         await self.timescale_client.connect()
-
-        for i, trading_pair in enumerate(self.trading_pairs):
-            for interval in self.intervals:
-                logging.info(f"{now} - Fetching candles for {trading_pair} [{i} from {len(self.trading_pairs)}]")
-                try:
-                    table_name = self.timescale_client.get_ohlc_table_name(self.connector_name, trading_pair, interval)
-                    await self.timescale_client.create_candles_table(table_name)
-                    last_candle_timestamp = await self.timescale_client.get_last_candle_timestamp(
-                        connector_name=self.connector_name,
-                        trading_pair=trading_pair,
-                        interval=interval)
-                    start_time = last_candle_timestamp if last_candle_timestamp else start_time
-                    try:
-                        candles = await clob.get_candles(
-                            self.connector_name,
-                            trading_pair,
-                            interval,
-                            int(start_time),
-                            int(end_time.timestamp()),
-                        )
-                    except KeyError as e:
-                        logging.error(f"{now} - Error fetching candles for {trading_pair}:\n {e}")
-                        continue
-
-                    if candles.data.empty:
-                        logging.info(f"{now} - No new candles for {trading_pair}")
-                        continue
-
-                    await self.timescale_client.append_candles(table_name=table_name,candles=candles.data.values.tolist())
-                    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-                    cutoff_timestamp = (today_start - timedelta(days=self.days_data_retention)).timestamp()
-                    await self.timescale_client.delete_candles(
-                        connector_name=self.connector_name,
-                        trading_pair=trading_pair,
-                        interval=interval,
-                        timestamp=cutoff_timestamp)
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    logging.exception(
-                        f"{now} - An error occurred during the data load for trading pair {trading_pair}:\n {e}")
-                    continue
-
+        download_start = time.perf_counter()
+        stats = await download_candles(clob, self.timescale_client, self.connector_name, self.trading_pairs,
+                                       self.intervals, start_time, end_time.timestamp(), self.days_data_retention,
+                                       self.max_concurrency, self.rate_limit_share)
+        logging.info(f"{now} - Downloaded {len(self.trading_pairs)} pairs x {len(self.intervals)} intervals in "
+                     f"{time.perf_counter() - download_start:.2f}s: {stats}")
         await self.timescale_client.close()
 
 
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from core.services.timescale_client import TimescaleClient
+from core.task_base import BaseTask
+
+logging.basicConfig(level=logging.INFO)
+load_dotenv()
+
+
+class TimescaleMigrationTask(BaseTask):
+    """
+    Migrates the legacy NUMERIC trades and candles tables to DOUBLE PRECISION hypertables and benchmarks
+    a full table read and the retention step before and after the migration.
+    """
+    def __init__(self, name: str, frequency: timedelta, config: Dict[str, Any]):
+        super().__init__(name, frequency, config)
+        self.days_data_retention = config.get("days_data_retention", 7)
+        self.benchmark = config.get("benchmark", True)
+        self.timescale_client = TimescaleClient(
+            host=self.config["timescale_config"]["host"],
+            port=self.config["timescale_config"]["port"],
+            user=self.config["timescale_config"]["user"],
+            password=self.config["timescale_config"]["password"],
+            database=self.config["timescale_config"]["database"]
+        )
+
+    async def execute(self):
+        await self.timescale_client.connect()
+        tables = [(self.timescale_client.get_trades_table_name(connector_name, trading_pair), "trades")
+                  for connector_name, trading_pair in await self.timescale_client.get_available_pairs()]
+        tables += [(self.timescale_client.get_ohlc_table_name(connector_name, trading_pair, interval), "candles")
+                   for connector_name, trading_pair, interval in await self.timescale_client.get_available_candles()]
+        cutoff = datetime.now() - timedelta(days=self.days_data_retention)
+
+        results: List[Dict[str, Any]] = []
+        for table_name, kind in tables:
+            if await self.timescale_client.is_hypertable(table_name):
+                logging.info(f"{self.now()} - {table_name} is already a hypertable, skipping")
+                continue
+            try:
+                result = {"table_name": table_name}
+                if self.benchmark:
+                    result["read_before"], result["retention_before"] = await self.benchmark_table(table_name, cutoff)
+                if kind == "trades":
+                    await self.timescale_client.migrate_trades_table(table_name)
+                else:
+                    await self.timescale_client.migrate_candles_table(table_name)
+                if self.benchmark:
+                    result["read_after"], result["retention_after"] = await self.benchmark_table(table_name, cutoff)
+                results.append(result)
+                logging.info(f"{self.now()} - Migrated {table_name}: {result}")
+            except Exception as e:
+                logging.exception(f"{self.now()} - Error migrating {table_name}: {e}")
+
+        if results and self.benchmark:
+            report = pd.DataFrame(results).set_index("table_name")
+            logging.info(f"{self.now()} - Timings in seconds:\n{report.to_string()}\n"
+                         f"Totals:\n{report.sum().to_string()}")
+        await self.timescale_client.close()
+
+    async def benchmark_table(self, table_name: str, cutoff: datetime):
+        """Time a full read and the retention step. Retention runs in a rolled back transaction."""
+        async with self.timescale_client.pool.acquire() as conn:
+            start = time.perf_counter()
+            await conn.fetch(f"SELECT * FROM {table_name}")
+            read_time = time.perf_counter() - start
+
+            transaction = conn.transaction()
+            await transaction.start()
+            try:
+                start = time.perf_counter()
+                await self.timescale_client._delete_before(conn, table_name, cutoff)
+                retention_time = time.perf_counter() - start
+            finally:
+                await transaction.rollback()
+        return read_time, retention_time
+
+
+if __name__ == "__main__":
+    config = {
+        "days_data_retention": 7,
+        "timescale_config": {
+            "host": "localhost",
+            "port": 5432,
+            "user": "admin",
+            "password": "admin",
+            "database": "timescaledb"
+        }
+    }
+    task = TimescaleMigrationTask("Timescale Migration", timedelta(hours=1), config)
+    asyncio.run(task.execute())
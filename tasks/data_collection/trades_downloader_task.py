@@ -24,6 +24,7 @@ class TradesDownloaderTask(BaseTask):
         self.start_time = time.time() - self.days_data_retention * 24 * 60 * 60
         self.quote_asset = config.get('quote_asset', "USDT")
         self.min_notional_size = Decimal(str(config.get('min_notional_size', 10.0)))
+        self.resample_intervals = config.get("resample_intervals", ["1s"])
         self.clob = CLOBDataSource()
 
     async def execute(self):
@@ -38,7 +39,8 @@ class TradesDownloaderTask(BaseTask):
             port=self.config["timescale_config"]["port"],
             user=self.config["timescale_config"]["user"],
             password=self.config["timescale_config"]["password"],
-            database=self.config["timescale_config"]["database"]
+            database=self.config["timescale_config"]["database"],
+            consolidated=self.config["timescale_config"].get("consolidated", False)
         )
         await timescale_client.connect()
 
@@ -49,7 +51,7 @@ class TradesDownloaderTask(BaseTask):
         for i, trading_pair in enumerate(trading_pairs):
             logging.info(f"{self.now()} - Fetching trades for {trading_pair} [{i} from {len(trading_pairs)}]")
             try:
-                table_name = timescale_client.get_trades_table_name(self.connector_name, trading_pair)
+                table_name = timescale_client.resolve_trades_table(self.connector_name, trading_pair)
                 last_trade_id = await timescale_client.get_last_trade_id(connector_name=self.connector_name,
                                                                          trading_pair=trading_pair,
                                                                          table_name=table_name)
@@ -72,16 +74,15 @@ class TradesDownloaderTask(BaseTask):
                     ["id", "connector_name", "trading_pair", "timestamp", "price", "volume",
                      "sell_taker"]].values.tolist()
 
-                await timescale_client.append_trades(table_name=table_name,
-                                                     trades=trades_data)
+                await timescale_client.store_trades(self.connector_name, trading_pair, trades_data)
                 today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
                 cutoff_timestamp = (today_start - timedelta(days=self.days_data_retention)).timestamp()
                 await timescale_client.delete_trades(connector_name=self.connector_name, trading_pair=trading_pair,
                                                      timestamp=cutoff_timestamp)
                 # TODO: isolate resampling and metrics management in another module
-                # TODO: pass list of intervals to perform better
-                await timescale_client.compute_resampled_ohlc(connector_name=self.connector_name,
-                                                              trading_pair=trading_pair, interval="1s")
+                await timescale_client.compute_resampled_ohlcs(connector_name=self.connector_name,
+                                                               trading_pair=trading_pair,
+                                                               intervals=self.resample_intervals)
 
                 logging.info(f"{self.now()} - Inserted {len(trades_data)} trades for {trading_pair}")
 
@@ -4,8 +4,9 @@ import asyncio
 import re
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, List, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
 
+import pandas as pd
 from dotenv import load_dotenv
 
 from core.task_base import BaseTask
@@ -32,6 +33,10 @@ class DeploymentBaseTask(BaseTask):
     }
     deploy_task_interval = 120.0
     control_task_interval = 3.0
+    idle_status_interval = 30.0
+    near_threshold_ratio = 0.5
+    # Candidate table column -> weight of its z-score in the ranking score, overridable by ranking_params.weights
+    score_weights: Dict[str, float] = {}
     controller_stop_delay = 30.0
 
     def __init__(self, name: str, frequency: timedelta, config: Dict[str, Any]):
@@ -51,6 +56,11 @@ class DeploymentBaseTask(BaseTask):
         self.active_bots: Dict[str, Any] = {}
         self.archived_configs: List[str] = []
         self.archived_bots: Dict[str, Any] = {}
+        self.bots_status: Dict[str, Any] = {}
+        self.bots_status_timestamp = 0.0
+        self._status_updated = asyncio.Event()
+        self._status_lock = asyncio.Lock()
+        self._stop_tasks: Set[asyncio.Task] = set()
 
     async def initialize(self):
         """Initialize connections and resources."""
@@ -65,6 +75,7 @@ class DeploymentBaseTask(BaseTask):
         try:
             await self.initialize()
             tasks = [
+                self._status_poller_task(),
                 self._deploy_task(),
                 self._control_task(),
             ]
@@ -149,9 +160,8 @@ class DeploymentBaseTask(BaseTask):
     async def _available_bot_slots(self):
         """Check if there are available bot slots based on backend response."""
         try:
-            running_bots_data = await self.backend_api_client.get_active_bots_status()
-            active_bots_resp = running_bots_data.get("data", {})
-            active_bots = [bot_name for bot_name, _ in active_bots_resp.items() if bot_name in self.active_bots.keys()]
+            active_bots_resp = await self._get_bots_status(max_age=self.idle_status_interval)
+            active_bots = [bot_name for bot_name in active_bots_resp if bot_name in self.active_bots]
             n_active_bots = len(active_bots)
             max_bots = self.config["deploy_params"].get("max_bots", 1)
             return n_active_bots < max_bots
@@ -179,24 +189,82 @@ class DeploymentBaseTask(BaseTask):
             }
 
     async def _filter_config_candidates(self, config_candidates: List[ConfigCandidate]):
+        """
+        Keep the valid candidates and return them ranked, best first, with at most one candidate per market.
+        Subclasses that build a candidate table can filter it on whole columns; otherwise each candidate is
+        checked with _is_candidate_valid.
+        """
         filter_candidate_params = self.config.get("filter_candidate_params", {})
-        if filter_candidate_params:
-            selected_candidates = []
-            for candidate in config_candidates:
-                try:
-                    config_already_used = candidate.id in self.archived_configs
-                    if config_already_used and not self.config.get("recycle_configs"):
-                        continue
-                    meets_condition = await self._is_candidate_valid(candidate, filter_candidate_params)
-                    if meets_condition:
-                        selected_candidates.append(candidate)
-                except Exception:
-                    continue
-            logging.info(f"Selected {len(selected_candidates)} out of {len(config_candidates)} candidates.")
-            print(f"Selected {len(selected_candidates)} out of {len(config_candidates)} candidates.")
-            return selected_candidates
+        positions = list(range(len(config_candidates)))
+        if not filter_candidate_params:
+            return self._rank_candidates(config_candidates, positions, None)
+        if not self.config.get("recycle_configs"):
+            archived_configs = set(self.archived_configs)
+            positions = [i for i in positions if config_candidates[i].id not in archived_configs]
+        table = self._build_candidate_table(config_candidates)
+        if table is not None:
+            # Malformed candidates are left out of the table, so they are never selected
+            positions = [i for i in positions if i in table.index]
+            valid_table = await self._filter_candidate_table(table.loc[positions], config_candidates,
+                                                             filter_candidate_params)
+            positions = list(valid_table.index)
         else:
-            return config_candidates
+            positions = [i for i in positions
+                         if await self._is_candidate_valid_safe(config_candidates[i], filter_candidate_params)]
+        logging.info(f"Selected {len(positions)} out of {len(config_candidates)} candidates.")
+        return self._rank_candidates(config_candidates, positions, table)
+
+    async def _is_candidate_valid_safe(self, candidate: ConfigCandidate, filter_candidate_params: Dict[str, Any]):
+        try:
+            return await self._is_candidate_valid(candidate, filter_candidate_params)
+        except Exception:
+            return False
+
+    def _build_candidate_table(self, config_candidates: List[ConfigCandidate]) -> Optional[pd.DataFrame]:
+        """
+        One row per candidate, indexed by its position in config_candidates, with the numeric features used to
+        filter and score it. Candidates with missing or invalid fields are left out. Returning None falls back to
+        the per-candidate _is_candidate_valid check.
+        """
+        return None
+
+    async def _filter_candidate_table(self, table: pd.DataFrame, config_candidates: List[ConfigCandidate],
+                                      filter_candidate_params: Dict[str, Any]) -> pd.DataFrame:
+        """Rows of the candidate table that pass the filters, checked one candidate at a time by default."""
+        valid_positions = [i for i in table.index
+                           if await self._is_candidate_valid_safe(config_candidates[i], filter_candidate_params)]
+        return table.loc[valid_positions]
+
+    def _score_candidates(self, table: pd.DataFrame) -> pd.Series:
+        """Weighted sum of the z-scores of the scored columns; higher is better."""
+        weights = {**self.score_weights, **self.config.get("ranking_params", {}).get("weights", {})}
+        score = pd.Series(0.0, index=table.index)
+        for column, weight in weights.items():
+            if column not in table:
+                continue
+            values = pd.to_numeric(table[column], errors="coerce")
+            std = values.std(ddof=0)
+            if std > 0:
+                score += weight * ((values - values.mean()) / std).fillna(0)
+        return score
+
+    def _rank_candidates(self, config_candidates: List[ConfigCandidate], positions: List[int],
+                         table: Optional[pd.DataFrame]) -> List[ConfigCandidate]:
+        """Order the candidates by score and drop those trading a market already taken by a better candidate."""
+        if table is not None and positions:
+            positions = list(self._score_candidates(table.loc[positions]).sort_values(ascending=False,
+                                                                                      kind="stable").index)
+        if not self.config.get("ranking_params", {}).get("dedup_markets", True):
+            return [config_candidates[i] for i in positions]
+        ranked_candidates = []
+        used_markets = set()
+        for i in positions:
+            markets = self._extract_trading_pairs([config_candidates[i]])
+            if markets & used_markets:
+                continue
+            used_markets |= markets
+            ranked_candidates.append(config_candidates[i])
+        return ranked_candidates
 
     async def _is_candidate_valid(self, candidate: ConfigCandidate, filter_candidate_params: Dict[str, Any]) -> bool:
         """
@@ -248,8 +316,7 @@ class DeploymentBaseTask(BaseTask):
         time_to_cash_out = self.config["deploy_params"].get("time_to_cash_out")
         max_controller_configs = min(self.config["deploy_params"].get("max_controller_configs", 2), len(selected_candidates))
 
-        # TODO: sort configs by multidimensional ghetman criteria
-        # TODO: drop duplicate markets
+        # Candidates arrive ranked and with one candidate per market from _filter_config_candidates
         final_candidates = selected_candidates[:max_controller_configs]
         for candidate in final_candidates:
             await self.backend_api_client.add_controller_config(candidate.config)
@@ -276,56 +343,115 @@ class DeploymentBaseTask(BaseTask):
         else:
             logging.error(f"There was an error trying to deploy: {deploy_resp['error']} - {deploy_resp['error']}")
 
+    async def _refresh_bots_status(self) -> Dict[str, Any]:
+        """Fetch the status of the active bots once and publish it to the deploy and control loops."""
+        async with self._status_lock:
+            active_bots_data = await self.backend_api_client.get_active_bots_status()
+            self.bots_status = active_bots_data.get("data") or {}
+            self.bots_status_timestamp = time.time()
+            self._status_updated.set()
+            return self.bots_status
+
+    async def _get_bots_status(self, max_age: float) -> Dict[str, Any]:
+        """Cached bot status, refreshed when older than max_age seconds."""
+        if time.time() - self.bots_status_timestamp > max_age:
+            return await self._refresh_bots_status()
+        return self.bots_status
+
+    async def _status_poller_task(self):
+        while self.running:
+            try:
+                await self._refresh_bots_status()
+            except Exception as e:
+                logging.error(f"Error fetching active bots status: {e}")
+            await asyncio.sleep(self._status_poll_interval())
+
+    def _status_poll_interval(self) -> float:
+        """Poll fast while a tracked controller is close to a stop condition, slowly otherwise."""
+        for controller_info in self._running_controllers():
+            if self._is_near_stop(controller_info):
+                return self.control_task_interval
+        return self.idle_status_interval
+
+    def _running_controllers(self) -> List[Dict[str, Any]]:
+        controllers = []
+        for bot_name, data in self.bots_status.items():
+            if bot_name not in self.active_bots:
+                continue
+            for controller_id, metrics in data["performance"].items():
+                if metrics["status"] == "running":
+                    controller_info = metrics["performance"].copy()
+                    controller_info["start_timestamp"] = self.active_bots[bot_name]["start_timestamp"]
+                    controller_info["bot_name"] = bot_name
+                    controller_info["controller_id"] = controller_id
+                    controllers.append(controller_info)
+        return controllers
+
     async def _control_task(self):
         while self.running:
+            await self._status_updated.wait()
+            self._status_updated.clear()
             try:
-                active_bots_data = await self.backend_api_client.get_active_bots_status()
-                active_bots_resp = active_bots_data["data"] or {}
-                active_bots = {bot_name: data for bot_name, data in active_bots_resp.items()
-                               if bot_name in self.active_bots}
-                if len(active_bots) == 0:
-                    continue
-                for bot_name, data in active_bots.items():
-                    self._control_error_logs(data["error_logs"])
-                    for controller_id, metrics in data["performance"].items():
-                        if metrics["status"] == "running":
-                            controller_info = metrics["performance"].copy()
-                            controller_info["start_timestamp"] = self.active_bots[bot_name]["start_timestamp"]
-                            controller_info["bot_name"] = bot_name
-                            controller_info["controller_id"] = controller_id
-                            self._control_pnl(controller_info)
+                for bot_name, data in self.bots_status.items():
+                    if bot_name in self.active_bots:
+                        self._control_error_logs(data["error_logs"])
+                for controller_info in self._running_controllers():
+                    self._control_pnl(controller_info)
             except Exception as e:
                 logging.error(f"Error during control task: {e}")
-            await asyncio.sleep(self.control_task_interval)
 
     def _control_error_logs(self, bot: Dict[str, Any]):
         pass  # TODO
 
+    def _pnl_bounds(self, bot_duration: float) -> Tuple[float, float]:
+        """Global PnL (as a fraction) at or below which the controller is stopped, and at or above which it is."""
+        control_params = self.config["control_params"]
+        lower = -control_params.get("controller_max_drawdown", 1.0)
+        upper = control_params.get("controller_max_pnl", 99.0)
+        min_early_stop_time = control_params.get("min_early_stop_time", 10e10)
+        max_early_stop_time = control_params.get("max_early_stop_time", 10e11)
+        if min_early_stop_time <= bot_duration <= max_early_stop_time:
+            lower = max(lower, -control_params.get("partial_drawdown", 1.0))
+            upper = min(upper, control_params.get("partial_profit", 1.0))
+        return lower, upper
+
+    def _is_near_stop(self, controller_info: Dict[str, Any]) -> bool:
+        """True when the PnL has covered near_threshold_ratio of the way to a bound or a time limit is close."""
+        global_pnl_pct = controller_info["global_pnl_pct"] / 100
+        bot_duration = time.time() - controller_info["start_timestamp"]
+        lower, upper = self._pnl_bounds(bot_duration)
+        if global_pnl_pct <= lower * self.near_threshold_ratio or global_pnl_pct >= upper * self.near_threshold_ratio:
+            return True
+        time_limits = [self.config.get("global_time_limit", 10e10),
+                       self.config["control_params"].get("min_early_stop_time", 10e10)]
+        return any(0 <= time_limit - bot_duration <= self.idle_status_interval for time_limit in time_limits)
+
     def _control_pnl(self, controller_info: Dict[str, Any]):
         global_pnl_pct = controller_info["global_pnl_pct"] / 100
         bot_name = controller_info["bot_name"]
         controller_id = controller_info["controller_id"]
-        controller_max_drawdown = self.config["control_params"].get("controller_max_drawdown", 1.0)
-        controller_max_pnl = self.config["control_params"].get("controller_max_pnl", 99.0)
-        sl_condition = global_pnl_pct <= - controller_max_drawdown
-        tp_condition = global_pnl_pct >= controller_max_pnl
-
+        controller_status = self.active_bots[bot_name]["controller_status"]
+        if controller_status.get(controller_id, "running") != "running":
+            return
         bot_duration = time.time() - controller_info["start_timestamp"]
+        lower, upper = self._pnl_bounds(bot_duration)
         time_limit_condition = bot_duration >= self.config.get("global_time_limit", 10e10)
-
-        min_early_stop_time = self.config["control_params"].get("min_early_stop_time", 10e10)
-        max_early_stop_time = self.config["control_params"].get("max_early_stop_time", 10e11)
-        early_tp_condition = early_sl_condition = False
-        if min_early_stop_time <= bot_duration <= max_early_stop_time:
-            partial_drawdown = self.config["control_params"].get("partial_drawdown", 1.0)
-            partial_profit = self.config["control_params"].get("partial_profit", 1.0)
-            early_tp_condition = global_pnl_pct >= partial_profit
-            early_sl_condition = global_pnl_pct <= -partial_drawdown
-        if tp_condition or sl_condition or time_limit_condition or early_tp_condition or early_sl_condition:
-            asyncio.ensure_future(self._gracefully_stop_controller(bot_name, controller_id))
+        if global_pnl_pct <= lower or global_pnl_pct >= upper or time_limit_condition:
+            controller_status[controller_id] = "stopping"
+            # Referenced until done, since the event loop only keeps weak references to tasks.
+            stop_task = asyncio.ensure_future(self._gracefully_stop_controller(bot_name, controller_id))
+            self._stop_tasks.add(stop_task)
+            stop_task.add_done_callback(self._stop_tasks.discard)
 
     async def _gracefully_stop_controller(self, bot_name: str, controller_id: str):
-        await self.backend_api_client.stop_controller_from_bot(bot_name=bot_name, controller_id=controller_id)
+        try:
+            await self.backend_api_client.stop_controller_from_bot(bot_name=bot_name, controller_id=controller_id)
+        except Exception as e:
+            # Back to running, so the next status update retries the stop.
+            if bot_name in self.active_bots:
+                self.active_bots[bot_name]["controller_status"][controller_id] = "running"
+            logging.exception(f"Error stopping controller {controller_id} of {bot_name}: {e}")
+            return
         await asyncio.sleep(self.controller_stop_delay)
         self.active_bots[bot_name]["controller_status"][controller_id] = "stopped"
         running_controllers = [
@@ -333,7 +459,10 @@ class DeploymentBaseTask(BaseTask):
             if status == "running"
         ]
         if not running_controllers:
-            await self._gracefully_stop_bot_and_archive(bot_name)
+            try:
+                await self._gracefully_stop_bot_and_archive(bot_name)
+            except Exception as e:
+                logging.exception(f"Error stopping and archiving {bot_name}: {e}")
 
     async def _gracefully_stop_bot_and_archive(self, bot_name: str):
         if bot_name in self.active_bots:
@@ -1,13 +1,27 @@
 import asyncio
+import logging
 import os
 import time
 from datetime import timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
 from research_notebooks.statarb_v2.stat_arb_performance_utils import get_executor_prices
 from tasks.deployment.deployment_base_task import DeploymentBaseTask, ConfigCandidate
 
 
+CANDIDATE_COLUMNS = ["base_trading_pair", "quote_trading_pair", "total_amount_quote", "base_start_price",
+                     "base_end_price", "quote_start_price", "quote_end_price"]
+
+
 class StatArbDeploymentTask(DeploymentBaseTask):
+    score_weights = {
+        "entry_price_distance": -1.0,
+        "grid_range_imbalance": -1.0,
+        "max_step": -0.5,
+    }
 
     async def _fetch_controller_configs(self) -> List[ConfigCandidate]:
         min_timestamp = time.time() - self.config.get("min_config_timestamp", 24 * 60 * 60)
@@ -29,61 +43,91 @@ class StatArbDeploymentTask(DeploymentBaseTask):
             or candidate.config["quote_trading_pair"] in trading_pairs
         ]
 
+    def _build_candidate_table(self, config_candidates: List[ConfigCandidate]) -> pd.DataFrame:
+        rows = {}
+        for i, candidate in enumerate(config_candidates):
+            try:
+                config = candidate.config
+                rows[i] = {
+                    "base_trading_pair": config["base_trading_pair"],
+                    "quote_trading_pair": config["quote_trading_pair"],
+                    "total_amount_quote": float(config["total_amount_quote"]),
+                    "base_start_price": float(config["grid_config_base"]["start_price"]),
+                    "base_end_price": float(config["grid_config_base"]["end_price"]),
+                    "quote_start_price": float(config["grid_config_quote"]["start_price"]),
+                    "quote_end_price": float(config["grid_config_quote"]["end_price"]),
+                }
+            except (KeyError, TypeError, ValueError) as e:
+                logging.warning(f"Skipping malformed config candidate {candidate.id}: {type(e).__name__} {e}")
+        table = pd.DataFrame.from_dict(rows, orient="index", columns=CANDIDATE_COLUMNS)
+        table["base_entry_price"] = pd.to_numeric(table["base_trading_pair"].map(self.last_prices), errors="coerce")
+        table["quote_entry_price"] = pd.to_numeric(table["quote_trading_pair"].map(self.last_prices), errors="coerce")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            table["base_grid_range_pct"] = table["base_end_price"] / table["base_start_price"] - 1
+            table["quote_grid_range_pct"] = table["quote_end_price"] / table["quote_start_price"] - 1
+            table["grid_range_ratio"] = table["base_grid_range_pct"] / table["quote_grid_range_pct"]
+            table["grid_range_imbalance"] = np.log(table["grid_range_ratio"]).abs()
+            table["base_entry_price_distance"] = ((table["base_entry_price"] / table["base_start_price"] - 1) /
+                                                  table["base_grid_range_pct"])
+            table["quote_entry_price_distance"] = 1 - ((table["quote_entry_price"] / table["quote_start_price"] - 1) /
+                                                       table["quote_grid_range_pct"])
+        table["entry_price_distance"] = table[["base_entry_price_distance", "quote_entry_price_distance"]].max(axis=1)
+        return table
+
+    async def _filter_candidate_table(self, table: pd.DataFrame, config_candidates: List[ConfigCandidate],
+                                      filter_params: Dict[str, Any]) -> pd.DataFrame:
+        """Price conditions on whole columns, then grid steps and level sizes for the candidates left."""
+        max_base_step = filter_params.get("max_base_step", 0.001)
+        max_quote_step = filter_params.get("max_quote_step", 0.001)
+        min_grid_range_ratio = filter_params.get("min_grid_range_ratio", 0.5)
+        max_grid_range_ratio = filter_params.get("max_grid_range_ratio", 2.0)
+        max_entry_price_distance = filter_params.get("max_entry_price_distance", 0.4)
+        max_notional_size = filter_params.get("max_notional_size", 20.0)
+
+        prices = table[["base_start_price", "base_end_price", "quote_start_price", "quote_end_price"]]
+        price_mask = (
+            table["base_entry_price"].notna() & table["quote_entry_price"].notna() &
+            (prices > 0).all(axis=1) &
+            (table["base_grid_range_pct"] > 0) & (table["quote_grid_range_pct"] > 0) &
+            table["grid_range_ratio"].between(min_grid_range_ratio, max_grid_range_ratio) &
+            (table["base_entry_price_distance"] < max_entry_price_distance) &
+            (table["quote_entry_price_distance"] < max_entry_price_distance) &
+            (table["base_start_price"] < table["base_entry_price"]) &
+            (table["base_entry_price"] < table["base_end_price"]) &
+            (table["quote_start_price"] < table["quote_entry_price"]) &
+            (table["quote_entry_price"] < table["quote_end_price"])
+        )
+        table = table[price_mask].copy()
+        if table.empty:
+            return table
+
+        # The grid levels depend on the connector trading rules, so they are only computed for the candidates left
+        levels = await asyncio.gather(*[self._grid_levels(config_candidates[i].config) for i in table.index])
+        table[["base_step", "base_levels", "quote_step", "quote_levels"]] = pd.DataFrame(
+            levels, index=table.index, columns=["base_step", "base_levels", "quote_step", "quote_levels"])
+        table["max_step"] = table[["base_step", "quote_step"]].max(axis=1)
+        level_mask = (
+            (table["base_step"] <= max_base_step) & (table["quote_step"] <= max_quote_step) &
+            (table["total_amount_quote"] / table["base_levels"] <= max_notional_size) &
+            (table["total_amount_quote"] / table["quote_levels"] <= max_notional_size)
+        )
+        return table[level_mask]
+
+    async def _grid_levels(self, config: Dict[str, Any]) -> Tuple[float, float, float, float]:
+        """Step and number of levels of the base and quote grids, NaN when they can't be computed."""
+        try:
+            base_executor_prices, base_step = await get_executor_prices(config,
+                                                                        connector_instance=self.connector_instance)
+            quote_executor_prices, quote_step = await get_executor_prices(config, side="short",
+                                                                          connector_instance=self.connector_instance)
+            return base_step, len(base_executor_prices), quote_step, len(quote_executor_prices)
+        except Exception:
+            return np.nan, np.nan, np.nan, np.nan
+
     async def _is_candidate_valid(self, candidate: ConfigCandidate, filter_params: Dict[str, Any]):
-        # Step 1: extract config params from task config
-        base_entry_price = self.last_prices.get(candidate.config["base_trading_pair"])
-        quote_entry_price = self.last_prices.get(candidate.config["quote_trading_pair"])
-        max_base_step = self.config["filter_candidate_params"].get("max_base_step", 0.001)
-        max_quote_step = self.config["filter_candidate_params"].get("max_quote_step", 0.001)
-        min_grid_range_ratio = self.config["filter_candidate_params"].get("min_grid_range_ratio", 0.5)
-        max_grid_range_ratio = self.config["filter_candidate_params"].get("max_grid_range_ratio", 2.0)
-        max_entry_price_distance = self.config["filter_candidate_params"].get("max_entry_price_distance", 0.4)
-        max_notional_size = self.config["filter_candidate_params"].get("max_notional_size", 20.0)
-
-        # [Optional] Step 2: add high level stop conditions
-        if base_entry_price is None or quote_entry_price is None:
-            return False
-
-        # Step 3: Calculate filter conditions
-        config = candidate.config.copy()
-
-        base_start_price = config["grid_config_base"]["start_price"]
-        base_end_price = config["grid_config_base"]["end_price"]
-        base_executor_prices, base_step = await get_executor_prices(config, connector_instance=self.connector_instance)
-        base_level_amount_quote = config["total_amount_quote"] / len(base_executor_prices)
-
-        base_grid_range_pct = base_end_price / base_start_price - 1
-        base_entry_price_distance_from_start = (base_entry_price / base_start_price - 1) / base_grid_range_pct
-
-        quote_start_price = config["grid_config_quote"]["start_price"]
-        quote_end_price = config["grid_config_quote"]["end_price"]
-        quote_executor_prices, quote_step = await get_executor_prices(config, side="short",
-                                                                      connector_instance=self.connector_instance)
-        quote_level_amount_quote = config["total_amount_quote"] / len(quote_executor_prices)
-
-        quote_grid_range_pct = quote_end_price / quote_start_price - 1
-        quote_entry_price_distance_from_start = 1 - (
-                    quote_entry_price / quote_start_price - 1) / quote_grid_range_pct
-
-        # Conditions using the input values
-        base_step_condition = base_step <= max_base_step
-        quote_step_condition = quote_step <= max_quote_step
-        grid_range_gt_zero_condition = base_grid_range_pct > 0 and quote_grid_range_pct > 0
-        grid_range_pct_condition = min_grid_range_ratio <= (
-                base_grid_range_pct / quote_grid_range_pct) <= max_grid_range_ratio
-        base_entry_price_condition = base_entry_price_distance_from_start < max_entry_price_distance
-        quote_entry_price_condition = quote_entry_price_distance_from_start < max_entry_price_distance
-        inside_grid_condition = ((base_start_price < base_entry_price < base_end_price) and
-                                 (quote_start_price < quote_entry_price < quote_end_price))
-        price_non_zero_condition = (base_end_price > 0 and quote_end_price > 0 and base_start_price > 0
-                                    and quote_start_price > 0 and base_end_price > 0 and quote_end_price > 0)
-        # TODO: this should be applied after adjusting config proposals
-        notional_size_condition = ((base_level_amount_quote <= max_notional_size) and
-                                   (quote_level_amount_quote <= max_notional_size))
-        # Step 4: Return boolean value
-        return (base_step_condition and quote_step_condition and grid_range_pct_condition and
-                base_entry_price_condition and inside_grid_condition and price_non_zero_condition and
-                grid_range_gt_zero_condition and quote_entry_price_condition and notional_size_condition)
+        """Single candidate check, through the same rules as the candidate table."""
+        table = self._build_candidate_table([candidate])
+        return not (await self._filter_candidate_table(table, [candidate], filter_params)).empty
 
     def _adjust_config_candidates(self, config_candidates: List[ConfigCandidate]):
         params = self.config["config_adjustment_params"]
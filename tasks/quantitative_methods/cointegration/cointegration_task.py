@@ -9,20 +9,22 @@ import os
 from typing import List, Dict, Any, Tuple
 
 from scipy import stats
-from statsmodels.tsa.stattools import coint, grangercausalitytests
-from pyinform.transferentropy import transfer_entropy
-from dtaidistance import dtw
-from sklearn.linear_model import LinearRegression
 from tqdm import tqdm
 
 from core.data_sources import CLOBDataSource
 from core.data_structures.candles import Candles
+from core.lazy_imports import lazy_import
 from core.services.mongodb_client import MongoClient
 from core.task_base import BaseTask
 
 logging.getLogger("asyncio").setLevel(logging.CRITICAL)
 load_dotenv()
 
+stattools = lazy_import("statsmodels.tsa.stattools")
+transferentropy = lazy_import("pyinform.transferentropy")
+dtw = lazy_import("dtaidistance.dtw")
+linear_model = lazy_import("sklearn.linear_model")
+
 
 class CointegrationTask(BaseTask):
     def __init__(self, name: str, frequency: timedelta, config: Dict[str, Any]):
@@ -393,7 +395,7 @@ class CointegrationTask(BaseTask):
         df.columns = ['Y', 'X']
 
         # Run test
-        test_result = grangercausalitytests(df, maxlag=max_lag, verbose=False)
+        test_result = stattools.grangercausalitytests(df, maxlag=max_lag, verbose=False)
 
         # Extract p-values
         p_values = {
@@ -536,7 +538,7 @@ class CointegrationTask(BaseTask):
 
         # Compute TE from X → Y
         try:
-            te = round(transfer_entropy(x, y, k), 6)
+            te = round(transferentropy.transfer_entropy(x, y, k), 6)
         except Exception as e:
             te = None
 
@@ -663,12 +665,12 @@ class CointegrationTask(BaseTask):
         y, x = y_col.values, x_col.values
 
         # Run Engle-Granger test
-        coint_res: Tuple = coint(y, x)
+        coint_res: Tuple = stattools.coint(y, x)
         p_value = coint_res[1]
 
         # Perform linear regression
         x_reshaped = x.reshape(-1, 1)
-        reg: LinearRegression = LinearRegression().fit(x_reshaped, y)
+        reg = linear_model.LinearRegression().fit(x_reshaped, y)
         alpha = reg.intercept_
         beta = reg.coef_[0]
 
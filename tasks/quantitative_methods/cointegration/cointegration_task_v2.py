@@ -11,12 +11,10 @@ import asyncio
 import os
 from typing import List, Dict, Any, Tuple
 
-from statsmodels.tsa.stattools import coint, grangercausalitytests
-from pyinform.transferentropy import transfer_entropy
-from dtaidistance import dtw
 
 from core.data_sources import CLOBDataSource
 from core.data_structures.candles import Candles
+from core.lazy_imports import lazy_import
 from core.services.mongodb_client import MongoClient
 from core.task_base import BaseTask
 
@@ -25,6 +23,10 @@ logging.getLogger("core.data_sources.clob").setLevel(logging.CRITICAL)
 warnings.simplefilter(action='ignore', category=FutureWarning)
 load_dotenv()
 
+stattools = lazy_import("statsmodels.tsa.stattools")
+transferentropy = lazy_import("pyinform.transferentropy")
+dtw = lazy_import("dtaidistance.dtw")
+
 
 class CointegrationV2Task(BaseTask):
     def __init__(self, name: str, frequency: timedelta, config: Dict[str, Any]):
@@ -312,7 +314,7 @@ class CointegrationV2Task(BaseTask):
         df.columns = ['Y', 'X']
 
         # Run test
-        test_result = grangercausalitytests(df, maxlag=max_lag, verbose=False)
+        test_result = stattools.grangercausalitytests(df, maxlag=max_lag, verbose=False)
 
         # Extract p-values
         p_values = {
@@ -447,7 +449,7 @@ class CointegrationV2Task(BaseTask):
 
         # Compute TE from X → Y
         try:
-            te = round(transfer_entropy(x, y, k), 6)
+            te = round(transferentropy.transfer_entropy(x, y, k), 6)
         except Exception as e:
             te = None
 
@@ -497,7 +499,7 @@ class CointegrationV2Task(BaseTask):
         y, x = y_col.values, x_col.values
 
         # Run Engle-Granger test
-        coint_res: Tuple = coint(y, x)
+        coint_res: Tuple = stattools.coint(y, x)
         p_value = coint_res[1]
 
         return {
@@ -113,14 +113,28 @@ class StatArbConfigGeneratorTask(BaseTask):
         """
         try:
             await self.initialize()
-            funding_rates = await self.mongo_client.get_documents("funding_rates_processed")
+            latest_timestamp = await self.mongo_client.get_latest_value("funding_rates_processed")
+            funding_rates = await self.mongo_client.get_documents(
+                "funding_rates_processed",
+                query={"timestamp": latest_timestamp},
+                projection={"_id": 0, "pair1": 1, "pair2": 1, "rate1": 1, "rate2": 1, "rate_difference": 1},
+                sort=None)
             funding_rates_df = pd.DataFrame(funding_rates)
-            funding_rates_df = funding_rates_df[funding_rates_df["timestamp"] == funding_rates_df["timestamp"].max()]
-            coint_results = await self.mongo_client.get_documents("cointegration_results")
-            coint_results_df = pd.DataFrame(coint_results)
-            results_df_1 = coint_results_df.merge(funding_rates_df, left_on=["quote", "base"], right_on=["pair1", "pair2"], how="inner")
-            results_df_2 = coint_results_df.merge(funding_rates_df, left_on=["base", "quote"], right_on=["pair1", "pair2"], how="inner")
-            df = pd.concat([results_df_1, results_df_2])
+            if funding_rates_df.empty:
+                logging.info("No processed funding rates found")
+                return
+            merged_batches = []
+            async for coint_results_df in self.mongo_client.iter_dataframes(
+                    "cointegration_results",
+                    projection={"_id": 0, "base": 1, "quote": 1, "grid_base": 1, "grid_quote": 1, "coint_value": 1},
+                    batch_size=self.config.get("batch_size", 10000)):
+                results_df_1 = coint_results_df.merge(funding_rates_df, left_on=["quote", "base"], right_on=["pair1", "pair2"], how="inner")
+                results_df_2 = coint_results_df.merge(funding_rates_df, left_on=["base", "quote"], right_on=["pair1", "pair2"], how="inner")
+                merged_batches.extend([results_df_1, results_df_2])
+            if not merged_batches:
+                logging.info("No cointegration results found")
+                return
+            df = pd.concat(merged_batches)
 
             # Explode the grid_base columns
             df = pd.concat([
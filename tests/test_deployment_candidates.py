@@ -0,0 +1,143 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+stat_arb = pytest.importorskip("tasks.deployment.implementation.stat_arb_deployment_task")
+from tasks.deployment.deployment_base_task import DeploymentBaseTask  # noqa: E402
+from tasks.deployment.models import ConfigCandidate  # noqa: E402
+
+GRID_LEVELS = 10
+FILTER_PARAMS = {
+    "max_base_step": 0.02,
+    "max_quote_step": 0.02,
+    "min_grid_range_ratio": 0.5,
+    "max_grid_range_ratio": 2.0,
+    "max_entry_price_distance": 0.4,
+    "max_notional_size": 20.0,
+}
+LAST_PRICES = {"BTC-USDT": 102.0, "ETH-USDT": 54.0, "SOL-USDT": 20.5, "ADA-USDT": 9.8, "DOGE-USDT": 120.0}
+
+
+async def fake_executor_prices(config, side="long", connector_instance=None):
+    """Evenly spaced grid of GRID_LEVELS levels, with the step as a fraction of the start price."""
+    grid = config["grid_config_base"] if side == "long" else config["grid_config_quote"]
+    step = (grid["end_price"] / grid["start_price"] - 1) / GRID_LEVELS
+    return [grid["start_price"] * (1 + step * i) for i in range(GRID_LEVELS)], step
+
+
+def make_candidate(candidate_id, base_pair, base_grid, quote_pair, quote_grid, total_amount_quote=100.0):
+    return ConfigCandidate(id=candidate_id, extra_info={}, config={
+        "base_trading_pair": base_pair,
+        "quote_trading_pair": quote_pair,
+        "total_amount_quote": total_amount_quote,
+        "grid_config_base": {"start_price": base_grid[0], "end_price": base_grid[1]},
+        "grid_config_quote": {"start_price": quote_grid[0], "end_price": quote_grid[1]},
+    })
+
+
+def make_candidates():
+    return [
+        make_candidate("valid", "BTC-USDT", (100.0, 110.0), "ETH-USDT", (50.0, 55.0)),
+        make_candidate("outside_grid", "DOGE-USDT", (100.0, 110.0), "ETH-USDT", (50.0, 55.0)),
+        make_candidate("range_ratio", "BTC-USDT", (100.0, 150.0), "ETH-USDT", (50.0, 55.0)),
+        make_candidate("large_step", "BTC-USDT", (95.0, 123.5), "ETH-USDT", (44.0, 57.2)),
+        make_candidate("large_notional", "BTC-USDT", (100.0, 110.0), "ETH-USDT", (50.0, 55.0), 500.0),
+        make_candidate("no_price", "XRP-USDT", (100.0, 110.0), "ETH-USDT", (50.0, 55.0)),
+        make_candidate("near_start", "SOL-USDT", (20.0, 22.0), "ADA-USDT", (9.0, 10.0)),
+        ConfigCandidate(id="malformed", extra_info={}, config={"base_trading_pair": "BTC-USDT",
+                                                               "quote_trading_pair": "ETH-USDT"}),
+    ]
+
+
+def reference_is_valid(config, last_prices, params):
+    """The per-candidate rules the candidate table replaced, on plain floats."""
+    base_entry_price = last_prices.get(config["base_trading_pair"])
+    quote_entry_price = last_prices.get(config["quote_trading_pair"])
+    if base_entry_price is None or quote_entry_price is None:
+        return False
+    base_start, base_end = config["grid_config_base"]["start_price"], config["grid_config_base"]["end_price"]
+    quote_start, quote_end = config["grid_config_quote"]["start_price"], config["grid_config_quote"]["end_price"]
+    base_step = (base_end / base_start - 1) / GRID_LEVELS
+    quote_step = (quote_end / quote_start - 1) / GRID_LEVELS
+    base_range = base_end / base_start - 1
+    quote_range = quote_end / quote_start - 1
+    return (base_step <= params["max_base_step"] and quote_step <= params["max_quote_step"] and
+            base_range > 0 and quote_range > 0 and
+            params["min_grid_range_ratio"] <= base_range / quote_range <= params["max_grid_range_ratio"] and
+            (base_entry_price / base_start - 1) / base_range < params["max_entry_price_distance"] and
+            1 - (quote_entry_price / quote_start - 1) / quote_range < params["max_entry_price_distance"] and
+            base_start < base_entry_price < base_end and quote_start < quote_entry_price < quote_end and
+            min(base_start, base_end, quote_start, quote_end) > 0 and
+            config["total_amount_quote"] / GRID_LEVELS <= params["max_notional_size"])
+
+
+def make_task(config=None):
+    task = stat_arb.StatArbDeploymentTask.__new__(stat_arb.StatArbDeploymentTask)
+    task.config = {"filter_candidate_params": FILTER_PARAMS, **(config or {})}
+    task.last_prices = LAST_PRICES
+    task.archived_configs = []
+    task.connector_instance = None
+    return task
+
+
+def test_candidate_table_filter_matches_per_candidate_rules(monkeypatch):
+    monkeypatch.setattr(stat_arb, "get_executor_prices", fake_executor_prices)
+    task = make_task()
+    candidates = make_candidates()
+
+    table = task._build_candidate_table(candidates)
+    valid_table = asyncio.run(task._filter_candidate_table(table, candidates, FILTER_PARAMS))
+
+    expected = []
+    for i, candidate in enumerate(candidates):
+        try:
+            valid = reference_is_valid(candidate.config, LAST_PRICES, FILTER_PARAMS)
+        except KeyError:
+            valid = False
+        if valid:
+            expected.append(i)
+        assert asyncio.run(task._is_candidate_valid_safe(candidate, FILTER_PARAMS)) == valid, candidate.id
+    assert [candidates[i].id for i in valid_table.index] == [candidates[i].id for i in expected]
+    assert [candidates[i].id for i in expected] == ["valid", "near_start"]
+
+
+def test_ranking_keeps_the_best_candidate_per_market(monkeypatch):
+    monkeypatch.setattr(stat_arb, "get_executor_prices", fake_executor_prices)
+    candidates = [
+        make_candidate("btc_far", "BTC-USDT", (99.0, 109.0), "ETH-USDT", (50.0, 55.0)),
+        make_candidate("btc_close", "BTC-USDT", (101.0, 111.0), "ETH-USDT", (50.0, 55.0)),
+        make_candidate("sol", "SOL-USDT", (20.0, 22.0), "ADA-USDT", (9.0, 10.0)),
+    ]
+
+    ranked = asyncio.run(make_task()._filter_config_candidates(candidates))
+    assert [candidate.id for candidate in ranked] == ["btc_close", "sol"]
+
+    ranked = asyncio.run(make_task({"ranking_params": {"dedup_markets": False}})._filter_config_candidates(candidates))
+    assert [candidate.id for candidate in ranked] == ["btc_close", "btc_far", "sol"]
+
+
+class TableOnlyTask(DeploymentBaseTask):
+    """Builds a candidate table for ranking but keeps the per-candidate filter."""
+    score_weights = {"score": 1.0}
+
+    def _build_candidate_table(self, config_candidates):
+        return pd.DataFrame({"score": [candidate.config["score"] for candidate in config_candidates]})
+
+    def _extract_trading_pairs(self, config_candidates):
+        return {candidate.config["pair"] for candidate in config_candidates}
+
+    async def _is_candidate_valid(self, candidate, filter_candidate_params):
+        return candidate.config["score"] >= filter_candidate_params["min_score"]
+
+
+def test_table_without_filter_falls_back_to_per_candidate_check():
+    task = TableOnlyTask.__new__(TableOnlyTask)
+    task.config = {"filter_candidate_params": {"min_score": 1}}
+    task.archived_configs = []
+    candidates = [ConfigCandidate(id=str(score), extra_info={}, config={"score": score, "pair": pair})
+                  for score, pair in [(0, "A"), (2, "B"), (3, "B"), (1, "C")]]
+
+    ranked = asyncio.run(task._filter_config_candidates(candidates))
+
+    assert [candidate.id for candidate in ranked] == ["3", "1"]
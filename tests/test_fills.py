@@ -0,0 +1,70 @@
+import pandas as pd
+
+from core.performance.fills import FILL_COLUMNS, extract_fills
+
+
+def make_fill(trade_id, timestamp, price, base_amount, fee):
+    return {
+        "trade_id": trade_id,
+        "client_order_id": "order",
+        "exchange_order_id": "1",
+        "trading_pair": "BTC-USDT",
+        "fill_timestamp": timestamp,
+        "fill_price": str(price),
+        "fill_base_amount": str(base_amount),
+        "fill_quote_amount": str(price * base_amount),
+        "fee": {"fee_type": "DeductedFromReturns", "percent": "0", "percent_token": "USDT",
+                "flat_fees": [{"token": "USDT", "amount": str(fee)}]},
+        "is_taker": True,
+    }
+
+
+def make_order(trade_type, position, order_fills):
+    return {
+        "client_order_id": "order",
+        "exchange_order_id": "1",
+        "trading_pair": "BTC-USDT",
+        "order_type": "LIMIT",
+        "trade_type": trade_type,
+        "price": "100",
+        "amount": "1",
+        "executed_amount_base": "1",
+        "executed_amount_quote": "100",
+        "last_state": "5",
+        "leverage": "1",
+        "position": position,
+        "creation_timestamp": 1700000000.0,
+        "order_fills": {fill["trade_id"]: fill for fill in order_fills},
+    }
+
+
+def test_extract_fills_from_executor_payload():
+    executors_df = pd.DataFrame([
+        {"db_name": "bot.sqlite", "controller_id": "ctrl_1", "config": {"side": 1},
+         "custom_info": {"filled_orders": [
+             make_order("BUY", "OPEN", [make_fill("t1", 1700000000000, 100.0, 0.4, 0.01),
+                                        make_fill("t2", 1700000001000, 101.0, 0.6, 0.02)]),
+             make_order("SELL", "CLOSE", [make_fill("t3", 1700000060, 110.0, 1.0, 0.03)]),
+         ]}},
+        {"db_name": "bot.sqlite", "controller_id": "ctrl_2", "config": {"side": 2},
+         "custom_info": {"filled_orders": [make_order("SELL", "OPEN", [])]}},
+    ])
+
+    fills = extract_fills(executors_df)
+
+    assert list(fills.columns) == FILL_COLUMNS
+    assert len(fills) == 3
+    assert fills["controller_id"].tolist() == ["ctrl_1"] * 3
+    assert fills["side"].tolist() == [1, 1, 1]
+    assert fills["timestamp"].tolist() == [1700000000.0, 1700000001.0, 1700000060.0]
+    assert fills["price"].tolist() == [100.0, 101.0, 110.0]
+    assert fills["base_amount"].tolist() == [0.4, 0.6, 1.0]
+    assert fills["cumulative_fee_paid_quote"].tolist() == [0.01, 0.02, 0.03]
+    assert fills["position_multiplier"].tolist() == [1, 1, 1]
+
+
+def test_extract_fills_without_fills():
+    executors_df = pd.DataFrame([{"db_name": "bot.sqlite", "controller_id": "ctrl_1", "config": {"side": 1},
+                                  "custom_info": {"filled_orders": []}}])
+
+    assert list(extract_fills(executors_df).columns) == FILL_COLUMNS
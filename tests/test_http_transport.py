@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from core.services.http_transport import HttpTransport  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, status, url):
+        self.status = status
+        self.headers = {}
+        self.url = url
+
+    async def read(self):
+        return b"{}"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    """Answers with the given statuses in order and records the requests."""
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url))
+        return FakeResponse(self.statuses.pop(0), url)
+
+
+def make_transport(session):
+    transport = HttpTransport(backoff_base=0.0)
+    transport.session = lambda: session
+    return transport
+
+
+def test_idempotent_request_is_retried_on_retryable_status():
+    session = FakeSession([503, 200])
+    transport = make_transport(session)
+
+    response = asyncio.run(transport.request("GET", "http://backend/status", endpoint="/status"))
+
+    assert response.status == 200
+    assert session.requests == [("GET", "http://backend/status")] * 2
+    assert transport.latency_percentiles()[("none", "GET /status")]["count"] == 2
+
+
+def test_non_idempotent_request_is_not_retried_by_default():
+    session = FakeSession([503, 200])
+    transport = make_transport(session)
+
+    response = asyncio.run(transport.request("POST", "http://backend/deploy", endpoint="/deploy"))
+
+    assert response.status == 503
+    assert session.requests == [("POST", "http://backend/deploy")]
+
+
+def test_non_idempotent_request_is_retried_when_asked():
+    session = FakeSession([503, 200])
+    transport = make_transport(session)
+
+    response = asyncio.run(transport.request("POST", "http://backend/deploy", endpoint="/deploy", retries=1))
+
+    assert response.status == 200
+    assert len(session.requests) == 2
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+okx_dex_api = pytest.importorskip("core.services.okx_dex_api")
+
+TOKENS = [
+    okx_dex_api.Token(decimals="9", tokenContractAddress="SOL", tokenLogoUrl="", tokenName="Solana",
+                      tokenSymbol="SOL"),
+    okx_dex_api.Token(decimals="6", tokenContractAddress="USDC", tokenLogoUrl="", tokenName="USD Coin",
+                      tokenSymbol="USDC"),
+]
+
+
+def make_api(monkeypatch, quote_cache_ttl=2.0, code="0"):
+    api = okx_dex_api.OKXDexAPI(api_key="key", secret_key="secret", passphrase="passphrase",
+                                transport=object(), quote_rate_limit=100, quote_cache_ttl=quote_cache_ttl)
+    api.tokens = TOKENS
+    api.requests = []
+
+    async def fake_get(endpoint, params=None):
+        api.requests.append(params)
+        await asyncio.sleep(0.01)
+        return {"code": code, "msg": "", "data": []}
+
+    monkeypatch.setattr(api, "get", fake_get)
+    return api
+
+
+def test_identical_quotes_share_one_request(monkeypatch):
+    api = make_api(monkeypatch)
+
+    quotes = asyncio.run(api.get_quotes([{"chain_id": "501", "from_token_address": "SOL",
+                                          "to_token_address": "USDC", "amount": "1"}] * 3 +
+                                        [{"chain_id": "501", "from_token_address": "SOL",
+                                          "to_token_address": "USDC", "amount": "2"}]))
+
+    assert len(quotes) == 4
+    assert quotes[0] is quotes[1] is quotes[2]
+    assert [params["amount"] for params in api.requests] == [1_000_000_000, 2_000_000_000]
+
+
+def age_quotes(api, seconds):
+    api._quote_cache = {key: (timestamp - seconds, quote) for key, (timestamp, quote) in api._quote_cache.items()}
+
+
+def test_quotes_are_cached_until_they_expire(monkeypatch):
+    api = make_api(monkeypatch)
+
+    async def run():
+        first = await api.get_quote("501", "SOL", "USDC", "1")
+        assert await api.get_quote("501", "SOL", "USDC", "1") is first
+        age_quotes(api, 3.0)
+        assert await api.get_quote("501", "SOL", "USDC", "1") is not first
+        age_quotes(api, 3.0)
+        await api.get_quote("501", "SOL", "USDC", "2")
+
+    asyncio.run(run())
+
+    assert len(api.requests) == 3
+    # The expired quote of amount 1 is evicted when the quote of amount 2 is stored
+    assert [dict(key)["amount"] for key in api._quote_cache] == [2_000_000_000]
+
+
+def test_failed_quotes_are_not_cached(monkeypatch):
+    api = make_api(monkeypatch, code="50011")
+
+    async def run():
+        await api.get_quote("501", "SOL", "USDC", "1")
+        await api.get_quote("501", "SOL", "USDC", "1")
+
+    asyncio.run(run())
+
+    assert len(api.requests) == 2
+    assert api._quote_cache == {}
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from core.performance.fills import FILL_COLUMNS
+from core.performance.pnl import PnLEngine
+
+
+def make_fills():
+    rows = [
+        ("ctrl_1", 1, 1700000000.0, "OPEN", 100.0, 1.0, 0.1),
+        ("ctrl_1", 1, 1700000060.0, "OPEN", 102.0, 1.0, 0.1),
+        ("ctrl_2", 2, 1700000090.0, "OPEN", 50.0, 2.0, 0.05),
+        ("ctrl_1", 1, 1700000120.0, "CLOSE", 110.0, 1.5, 0.2),
+        ("ctrl_2", 2, 1700000180.0, "CLOSE", 45.0, 2.0, 0.05),
+        ("ctrl_1", 1, 1700000240.0, "CLOSE", 105.0, 0.5, 0.1),
+    ]
+    return pd.DataFrame([{"controller_id": controller_id, "side": side, "timestamp": timestamp,
+                          "position_action": action, "price": price, "base_amount": base_amount,
+                          "cumulative_fee_paid_quote": fee}
+                         for controller_id, side, timestamp, action, price, base_amount, fee in rows])
+
+
+def test_compute_long_and_short_pnl():
+    df = PnLEngine().compute(make_fills()).set_index("timestamp")
+
+    long_close = df.loc[1700000120.0]
+    assert long_close["break_even_open"] == 101.0
+    assert np.isclose(long_close["realized_pnl"], (110.0 - 101.0) * 1.5)
+    assert np.isclose(long_close["unrealized_pnl"], (110.0 - 101.0) * 0.5)
+    assert np.isclose(long_close["global_pnl"], long_close["realized_pnl"] + long_close["unrealized_pnl"] - 0.4)
+    short_close = df.loc[1700000180.0]
+    assert np.isclose(short_close["realized_pnl"], (50.0 - 45.0) * 2.0)
+    assert np.isclose(short_close["unrealized_pnl"], 0.0)
+
+
+def test_incremental_update_matches_full_compute():
+    fills = make_fills()
+    full = PnLEngine().compute(fills)
+
+    engine = PnLEngine()
+    engine.update(fills.iloc[:3])
+    engine.update(fills.iloc[3:])
+
+    columns = ["cum_base_open", "cum_base_close", "cum_fees_quote", "realized_pnl", "unrealized_pnl", "global_pnl"]
+    pd.testing.assert_frame_equal(engine.performance_df[columns].reset_index(drop=True),
+                                  full[columns].reset_index(drop=True))
+    assert set(engine.groups()) == {("ctrl_1", 1), ("ctrl_2", 2)}
+    assert len(engine.groups()[("ctrl_1", 1)]) == 4
+
+
+def test_groups_without_fills():
+    engine = PnLEngine()
+    engine.update(pd.DataFrame(columns=FILL_COLUMNS))
+
+    assert engine.groups() == {}
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+screener = pytest.importorskip("tasks.data_collection.screener_task")
+
+
+def make_candles(n=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = 1_700_000_000 + 3600 * np.arange(n, dtype=float)
+    timestamps = np.delete(timestamps, np.arange(400, 460))  # a gap of missing candles
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(timestamps))))
+    return pd.DataFrame({"timestamp": timestamps, "open": close, "high": close * (1 + rng.uniform(0, 0.01, len(close))),
+                         "low": close * (1 - rng.uniform(0, 0.01, len(close))), "close": close,
+                         "volume": rng.uniform(1, 100, len(close))})
+
+
+def test_extended_rma_matches_pandas_ewm():
+    rng = np.random.default_rng(1)
+    true_range = rng.uniform(0.5, 2.0, 500)
+    true_range[0] = np.nan
+    length = 24
+
+    rma = np.zeros(3)
+    chunks = []
+    for chunk in np.array_split(true_range, 7):
+        atr, rma = screener._extend_rma(rma, chunk, length)
+        chunks.append(atr)
+
+    expected = pd.Series(true_range).ewm(alpha=1 / length, min_periods=length).mean().to_numpy()
+    np.testing.assert_allclose(np.concatenate(chunks), expected, rtol=1e-10, equal_nan=True)
+    assert rma[2] == len(true_range) - 1
+
+
+def test_sketch_quantiles_within_accuracy():
+    values = np.random.default_rng(2).lognormal(0, 1, 5000)
+    days = np.repeat(np.arange(50), 100)
+    columns = screener._moment_columns("value", values, values[0])
+    daily = pd.DataFrame({"day": days, **columns}).groupby("day", as_index=False).agg(
+        screener._moment_aggregations("value"))
+
+    stats = screener._describe(daily, screener._sketch(days, values), "value", values[0])
+
+    expected = pd.Series(values).describe()
+    for key in ["count", "mean", "std", "min", "max"]:
+        assert stats[key] == pytest.approx(expected[key], rel=1e-9)
+    for key in ["25%", "50%", "75%"]:
+        assert stats[key] == pytest.approx(expected[key], rel=screener.QUANTILE_ACCURACY)
+
+
+def test_incremental_state_matches_full_build():
+    candles = make_candles()
+    interval_state, global_state = screener.new_interval_state(), screener.new_global_state()
+    for start in range(0, len(candles), 137):
+        chunk = candles.iloc[start:start + 137]
+        interval_state = screener.decode_state(screener.encode_state(
+            screener.update_interval_state(interval_state, chunk)))
+        global_state = screener.decode_state(screener.encode_state(
+            screener.update_global_state(global_state, chunk)))
+
+    task = screener.MarketScreenerTask
+    incremental = task.interval_metrics_from_state(interval_state)
+    full = task.calculate_interval_screener_metrics(candles)
+    for name in screener.ATR_LENGTHS:
+        for key, value in full["natr"][f"natr_{name}"].items():
+            assert incremental["natr"][f"natr_{name}"][key] == pytest.approx(value, rel=1e-7)
+    for window in screener.BB_WINDOWS:
+        assert incremental[f"bb_width_{window}"] == pytest.approx(full[f"bb_width_{window}"], rel=1e-7)
+    incremental = task.global_metrics_from_state(global_state, "binance", "BTC-USDT")
+    full = task.calculate_global_screener_metrics(candles, "binance", "BTC-USDT")
+    assert incremental["price"] == pytest.approx(full["price"], rel=1e-7)
+    assert incremental["volume_24h"] == pytest.approx(full["volume_24h"])
+    assert incremental["price_cbo"] == pytest.approx(full["price_cbo"])
+
+
+def test_trim_state_drops_days_before_history_start():
+    candles = make_candles()
+    history_start = candles["timestamp"].iloc[1000]
+
+    trimmed = screener.trim_state(screener.build_global_state(candles), history_start)
+
+    first_day = history_start // screener.DAY
+    assert trimmed["days"]["day"].min() == first_day
+    assert trimmed["close_sketch"]["day"].min() == first_day
+    retained = screener.build_global_state(candles[candles["timestamp"] >= first_day * screener.DAY])
+    assert screener._describe(trimmed["days"], trimmed["close_sketch"], "close", trimmed["close_shift"])["count"] == \
+        screener._describe(retained["days"], retained["close_sketch"], "close", retained["close_shift"])["count"]
+
+
+def test_unreadable_snapshots_are_rebuilt():
+    assert screener.decode_state(b"not a snapshot") is None
@@ -0,0 +1,76 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+session_store = pytest.importorskip("core.performance.session_store")
+
+
+class InMemoryMongoClient:
+    """The two MongoClient calls TradingSessionStore uses, on a dict keyed by session id."""
+    def __init__(self):
+        self.documents = {}
+        self.written = []
+
+    async def get_documents(self, collection_name, query=None, db_name=None, projection=None, sort=None):
+        ids = (query or {}).get("id", {}).get("$in")
+        return [dict(document) for session_id, document in self.documents.items() if ids is None or session_id in ids]
+
+    async def upsert_documents(self, collection_name, documents, key_fields, db_name=None, index=()):
+        for document in documents:
+            self.documents[document["id"]] = dict(document)
+        self.written.extend(document["id"] for document in documents)
+
+
+def make_session(session_id="bot_1", pnl=1.5):
+    return {
+        "id": session_id,
+        "metrics": {"global_pnl": np.float64(pnl), "trades": np.int64(3), "pairs": ("BTC-USDT", "ETH-USDT")},
+        "start": pd.Timestamp("2024-01-01 00:00:00", tz="UTC"),
+        "pnl_curve": pd.DataFrame({
+            "timestamp": pd.to_datetime([1700000000, 1700000060], unit="s"),
+            "global_pnl": [0.5, pnl],
+            "fills": np.array([1, 2], dtype=np.int32),
+            "side": ["BUY", "SELL"],
+        }),
+    }
+
+
+def test_encode_decode_round_trip():
+    session = make_session()
+
+    decoded = session_store.decode_value(session_store.encode_value(session))
+
+    pd.testing.assert_frame_equal(decoded["pnl_curve"], session["pnl_curve"])
+    assert decoded["metrics"] == {"global_pnl": 1.5, "trades": 3, "pairs": ["BTC-USDT", "ETH-USDT"]}
+    assert type(decoded["metrics"]["trades"]) is int
+    assert decoded["start"] == session["start"].timestamp()
+
+
+def test_content_hash_ignores_key_order_and_tracks_values():
+    encoded = session_store.encode_value(make_session())
+    reordered = dict(reversed(list(encoded.items())))
+
+    assert session_store.content_hash(reordered) == session_store.content_hash(encoded)
+    assert session_store.content_hash(session_store.encode_value(make_session(pnl=2.0))) != \
+        session_store.content_hash(encoded)
+
+
+def test_save_only_writes_changed_sessions():
+    mongo_client = InMemoryMongoClient()
+    store = session_store.TradingSessionStore(mongo_client)
+
+    async def run():
+        first = await store.save([make_session("bot_1"), make_session("bot_2")])
+        second = await store.save([make_session("bot_1"), make_session("bot_2", pnl=3.0)])
+        return first, second, await store.load()
+
+    first, second, loaded = asyncio.run(run())
+
+    assert first == {"written": 2, "unchanged": 0}
+    assert second == {"written": 1, "unchanged": 1}
+    assert mongo_client.written == ["bot_1", "bot_2", "bot_2"]
+    loaded = {session["id"]: session for session in loaded}
+    assert loaded["bot_2"]["metrics"]["global_pnl"] == 3.0
+    pd.testing.assert_frame_equal(loaded["bot_2"]["pnl_curve"], make_session("bot_2", pnl=3.0)["pnl_curve"])
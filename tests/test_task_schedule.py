@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+task_base = pytest.importorskip("core.task_base")
+CronSchedule = task_base.CronSchedule
+
+
+def utc(*args) -> float:
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def test_cron_parses_lists_ranges_and_steps():
+    cron = CronSchedule("*/15 0-6,18-23 * * 1-5")
+
+    assert cron.minutes == {0, 15, 30, 45}
+    assert cron.hours == set(range(0, 7)) | set(range(18, 24))
+    assert cron.weekdays == {1, 2, 3, 4, 5}
+    assert CronSchedule("0 0 * * 7").weekdays == {0}
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 * *")
+    with pytest.raises(ValueError):
+        CronSchedule("60 0 * * *")
+
+
+def test_cron_next_after():
+    # 2024-01-05 is a Friday
+    assert CronSchedule("*/15 * * * *").next_after(utc(2024, 1, 5, 10, 7, 30)) == utc(2024, 1, 5, 10, 15)
+    assert CronSchedule("*/15 * * * *").next_after(utc(2024, 1, 5, 10, 15)) == utc(2024, 1, 5, 10, 30)
+    assert CronSchedule("30 2 * * 1-5").next_after(utc(2024, 1, 5, 3, 0)) == utc(2024, 1, 8, 2, 30)
+    assert CronSchedule("0 0 1 3 *").next_after(utc(2024, 3, 1, 0, 0)) == utc(2025, 3, 1, 0, 0)
+    # Day of month and day of week both restricted: either one matches
+    assert CronSchedule("0 12 15 * 0").next_after(utc(2024, 1, 5, 0, 0)) == utc(2024, 1, 7, 12, 0)
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(utc(2024, 1, 1))
+
+
+class SleepTask(task_base.BaseTask):
+    def __init__(self, name, frequency, duration):
+        super().__init__(name, frequency, {})
+        self.duration = duration
+        self.starts = []
+        self.active = 0
+        self.max_active = 0
+
+    async def execute(self):
+        self.starts.append(asyncio.get_running_loop().time())
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.duration)
+        self.active -= 1
+
+
+def test_fixed_rate_schedule_skips_missed_slots():
+    task = SleepTask("task", timedelta(seconds=10), 0)
+
+    assert task.next_run_time(None, 100.0) == 100.0
+    assert task.next_run_time(100.0, 103.0) == 110.0
+    assert task.next_run_time(100.0, 125.0) == 130.0
+
+
+def test_orchestrator_runs_tasks_on_their_schedule_without_overlap():
+    fast = SleepTask("fast", timedelta(seconds=0.1), 0.0)
+    slow = SleepTask("slow", timedelta(seconds=0.1), 0.25)
+    orchestrator = task_base.TaskOrchestrator()
+    orchestrator.add_task(fast)
+    orchestrator.add_task(slow)
+
+    async def run():
+        try:
+            await asyncio.wait_for(orchestrator.schedule(), timeout=0.55)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            orchestrator.close()
+
+    asyncio.run(run())
+
+    assert 5 <= len(fast.starts) <= 6
+    assert 2 <= len(slow.starts) <= 3
+    assert slow.max_active == 1
+    assert slow.run_metrics["skipped"] >= 2